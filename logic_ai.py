@@ -0,0 +1,531 @@
+# logic_ai.py
+"""斗地主搜索型AI（无Pygame依赖）：蒙特卡洛确定化采样 + 快速推演，按时间预算随时返回当前最佳出牌"""
+import queue
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Pool
+from logic_game import *
+from logic_solver import EndgameSolver, DEFAULT_ENDGAME_CARDS
+from logic_tracker import CardTracker
+
+# ---------------------- 常量 ----------------------
+DEFAULT_TIME_BUDGET = 0.5   # 每步思考时间（秒）
+ROLLOUT_MAX_MOVES = 200     # 单次推演步数上限（防御性）
+DEFAULT_SOLVER_NODES = 2000 # 残局求解每次评估的节点上限，超出则改用推演
+
+# 叫地主估计
+DEFAULT_BID_THRESHOLD = 0.5        # 估计的地主胜率不低于该值时叫地主
+DEFAULT_LAST_BID_THRESHOLD = 0.35  # 前两家都不叫时最后一家的门槛（少重新发牌）
+DEFAULT_BID_BUDGET = 0.2           # 每次叫地主决定的推演时间（秒）
+DEFAULT_BID_SAMPLES = 400          # 每手牌推演到该局数后直接用缓存
+BID_CACHE_SIZE = 1 << 14           # 缓存的手牌规范键个数上限
+BID_CHUNK = 50                     # 每个推演任务的局数
+
+# 玩家思考期间的预计算
+SPECULATE_PLAYS = 6                # 最多预计算玩家的几种出牌（含过牌）
+
+# 难度等级：每步的时间预算与节点预算（推演采样次数、残局求解节点数），用于按桌限制CPU
+AI_LEVELS = {
+    "easy": {"time_budget": 0.05, "max_samples": 30, "endgame_cards": 0},
+    "normal": {"time_budget": DEFAULT_TIME_BUDGET, "max_samples": None, "solver_nodes": DEFAULT_SOLVER_NODES},
+    "hard": {"time_budget": 1.0, "max_samples": None, "solver_nodes": 10 * DEFAULT_SOLVER_NODES},
+}
+DEFAULT_AI_LEVEL = "normal"
+
+# 每个点数槽位的总张数（大小王各1张）
+_FULL_COUNTS = [4] * 13 + [1, 1]
+_CHAIN_END = RANK_SLOT['2']
+
+# ---------------------- 可见信息与确定化采样 ----------------------
+def visible_unknown_counts(engine, seat):
+    """
+    座位seat视角下未知牌的点数张数，以及必在地主手中的底牌张数
+    :return: (未知牌张数, 地主必有张数)，均为15槽位列表（后者已从前者扣除）
+    """
+    unknown = _FULL_COUNTS.copy()
+    for slot, count in enumerate(engine.hands[seat].counts):
+        unknown[slot] -= count
+    landlord_played = []
+    for player, play in engine.history:
+        if play.is_pass:
+            continue
+        for slot, count in enumerate(rank_count_vector(play.cards)):
+            unknown[slot] -= count
+        if player == engine.landlord:
+            landlord_played.extend(play.cards)
+    forced = [0] * RANK_SLOT_COUNT
+    if seat != engine.landlord and engine.landlord >= 0:
+        # 底牌公开：地主尚未打出的底牌一定还在地主手中
+        played = set(landlord_played)
+        for card in engine.bottom_cards:
+            if card not in played:
+                slot = RANK_SLOT[get_card_rank(card)]
+                forced[slot] += 1
+                unknown[slot] -= 1
+    return unknown, forced
+
+def sample_hidden_hands(engine, seat, rng, unknown=None, forced=None):
+    """按可见信息随机分配其余两家手牌（只关心点数），返回三家点数张数列表"""
+    if unknown is None:
+        unknown, forced = visible_unknown_counts(engine, seat)
+    pool = [slot for slot, count in enumerate(unknown) for _ in range(count)]
+    rng.shuffle(pool)
+    hands = [None] * SEAT_COUNT
+    hands[seat] = engine.hands[seat].counts.copy()
+    start = 0
+    for other in range(SEAT_COUNT):
+        if other == seat:
+            continue
+        counts = forced.copy() if other == engine.landlord else [0] * RANK_SLOT_COUNT
+        need = len(engine.hands[other]) - sum(counts)
+        for slot in pool[start:start + need]:
+            counts[slot] += 1
+        start += need
+        hands[other] = counts
+    return hands
+
+# ---------------------- 快速推演策略 ----------------------
+def _first_beat(counts, last):
+    """压制last（牌型, 优先级, 数量）的最小出牌（同牌型 -> 炸弹 -> 王炸），压不住返回None"""
+    last_type, last_priority, last_count = last
+    if last_type == CARD_TYPE_JOKER_BOMB:
+        return None
+    if last_type == CARD_TYPE_BOMB:
+        move = next(iter_moves_of_type(counts, CARD_TYPE_BOMB, above=last_priority), None)
+    else:
+        move = next(iter_moves_of_type(counts, last_type, last_count, last_priority), None)
+        if move is None:
+            move = next(iter_moves_of_type(counts, CARD_TYPE_BOMB), None)
+    if move is None:
+        move = next(iter_moves_of_type(counts, CARD_TYPE_JOKER_BOMB), None)
+    return move
+
+def _rollout_lead(counts):
+    """首出：从最小点数出发，能连成顺子就出顺子，三张带最小的单张/对子，其余整组打出"""
+    slot = next(slot for slot, count in enumerate(counts) if count)
+    count = counts[slot]
+    pattern = [0] * RANK_SLOT_COUNT
+    if count == 1 and slot + MIN_SEQUENCE_SINGLE_COUNT <= _CHAIN_END:
+        end = slot
+        while end + 1 < _CHAIN_END and counts[end + 1]:
+            end += 1
+        if end - slot + 1 >= MIN_SEQUENCE_SINGLE_COUNT:
+            pattern[slot:end + 1] = [1] * (end - slot + 1)
+            return tuple(pattern), judge_rank_counts(pattern)
+    pattern[slot] = count
+    if count == 3:
+        kicker = next((other for other in range(RANK_SLOT_COUNT) if counts[other] == 1), None)
+        if kicker is None:
+            kicker = next((other for other in range(13) if counts[other] == 2), None)
+        if kicker is not None:
+            pattern[kicker] = counts[kicker]
+    return tuple(pattern), judge_rank_counts(pattern)
+
+def rollout(hands, current, last, last_seat, pass_count, landlord):
+    """
+    按快速策略把局面下完，返回获胜座位（hands会被修改）
+    :param last: 需压制的（牌型, 优先级, 数量），首出为None
+    """
+    for _ in range(ROLLOUT_MAX_MOVES):
+        counts = hands[current]
+        move = None
+        if last is None:
+            move = _rollout_lead(counts)
+        elif current != landlord and last_seat != landlord:
+            move = None  # 不压队友
+        else:
+            move = _first_beat(counts, last)
+        if move is None:
+            pass_count += 1
+            if pass_count == SEAT_COUNT - 1:
+                last = None
+                pass_count = 0
+        else:
+            pattern, result = move
+            for slot, count in enumerate(pattern):
+                if count:
+                    counts[slot] -= count
+            if not any(counts):
+                return current
+            last = result
+            last_seat = current
+            pass_count = 0
+        current = (current + 1) % SEAT_COUNT
+    return -1
+
+def landlord_win_rate(counts, samples, rng=None):
+    """
+    17张手牌当地主的胜率估计：每次随机分配底牌与两家农民手牌，按快速策略推演一局
+    :param counts: 15槽位点数张数（叫地主前的17张）
+    """
+    return landlord_wins(counts, samples, rng) / samples if samples else 0.0
+
+def landlord_wins(counts, samples, rng=None):
+    """同landlord_win_rate，返回地主获胜的局数"""
+    rng = rng or random
+    unknown = [total - have for total, have in zip(_FULL_COUNTS, counts)]
+    pool = [slot for slot, count in enumerate(unknown) for _ in range(count)]
+    wins = 0
+    for _ in range(samples):
+        rng.shuffle(pool)
+        hands = [list(counts), [0] * RANK_SLOT_COUNT, [0] * RANK_SLOT_COUNT]
+        for index, slot in enumerate(pool):
+            if index < BOTTOM_SIZE:
+                hands[0][slot] += 1
+            else:
+                hands[1 if index < BOTTOM_SIZE + HAND_SIZE else 2][slot] += 1
+        if rollout(hands, 0, None, -1, 0, 0) == 0:
+            wins += 1
+    return wins
+
+def _bid_chunk(args):
+    """进程池任务：(规范键, 局数, 种子) -> (规范键, 地主获胜局数, 局数)"""
+    key, samples, seed = args
+    return key, landlord_wins(key, samples, random.Random(seed)), samples
+
+class BidEstimator:
+    """
+    叫地主胜率估计：按手牌规范键缓存累计的（地主获胜局数, 推演局数），
+    不足samples局时在time_budget秒内继续推演（jobs > 1时分块交给进程池并行，进程池首次使用时才创建）；
+    每个进程同时只有一个分块，到时不再提交，已完成的分块全部计入，仍在运行的分块在下次估计时补记到缓存
+    """
+
+    def __init__(self, threshold=DEFAULT_BID_THRESHOLD, last_threshold=DEFAULT_LAST_BID_THRESHOLD,
+                 time_budget=DEFAULT_BID_BUDGET, samples=DEFAULT_BID_SAMPLES, jobs=1, rng=None,
+                 cache_size=BID_CACHE_SIZE):
+        self.threshold = threshold
+        self.last_threshold = last_threshold
+        self.time_budget = time_budget
+        self.samples = samples
+        self.rng = rng if rng is not None else random.Random()
+        self.cache_size = cache_size
+        self._cache = {}  # 规范键 -> (获胜局数, 推演局数)，按最近使用排序
+        self.jobs = jobs
+        self._pool = None
+        self._results = queue.SimpleQueue()  # 进程池回调送回的(规范键, 获胜局数, 局数)
+        self._running = 0                    # 已提交、结果还没取回的分块数
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool = None
+            self._results = queue.SimpleQueue()
+            self._running = 0
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = Pool(self.jobs)
+        return self._pool
+
+    def estimate(self, counts, deadline=None):
+        """17张手牌当地主的胜率（推演到time_budget用完或deadline为止），一局也没推演完时返回None"""
+        key = tuple(counts)
+        wins, done = self._cache.pop(key, (0, 0))
+        if done < self.samples:
+            stop = time.perf_counter() + self.time_budget
+            if deadline is not None:
+                stop = min(stop, deadline)
+            more_wins, more = self._rollouts(key, self.samples - done, stop)
+            wins += more_wins
+            done += more
+        if done:
+            self._cache[key] = (wins, done)
+            if len(self._cache) > self.cache_size:
+                del self._cache[next(iter(self._cache))]
+        return wins / done if done else None
+
+    def _rollouts(self, key, samples, deadline):
+        wins = done = 0
+        if self.jobs <= 1:
+            while samples > 0 and time.perf_counter() < deadline:
+                size = min(BID_CHUNK, samples)
+                wins += _bid_chunk((key, size, self.rng.getrandbits(64)))[1]
+                done += size
+                samples -= size
+            return wins, done
+        pool = self._get_pool()
+        while True:
+            # 空闲的进程各补一个分块，到时后不再提交
+            while samples > 0 and self._running < self.jobs and time.perf_counter() < deadline:
+                size = min(BID_CHUNK, samples)
+                samples -= size
+                self._running += 1
+                pool.apply_async(_bid_chunk, ((key, size, self.rng.getrandbits(64)),),
+                                 callback=self._results.put, error_callback=self._chunk_failed)
+            remaining = deadline - time.perf_counter()
+            if self._running == 0 or remaining <= 0:
+                break
+            try:
+                result = self._results.get(timeout=remaining)
+            except queue.Empty:
+                break
+            wins, done = self._collect(result, key, wins, done)
+        # 到时已完成的结果全部计入
+        while True:
+            try:
+                result = self._results.get_nowait()
+            except queue.Empty:
+                return wins, done
+            wins, done = self._collect(result, key, wins, done)
+
+    def _collect(self, result, key, wins, done):
+        """计入一个分块的结果：属于本次手牌的累加返回，上次到时仍在运行的其他手牌补记到缓存"""
+        self._running -= 1
+        chunk_key, chunk_wins, chunk_done = result
+        if chunk_key == key:
+            return wins + chunk_wins, done + chunk_done
+        if chunk_key is not None:
+            old_wins, old_done = self._cache.get(chunk_key, (0, 0))
+            self._cache[chunk_key] = (old_wins + chunk_wins, old_done + chunk_done)
+        return wins, done
+
+    def _chunk_failed(self, error):
+        self._results.put((None, 0, 0))
+
+    def should_call(self, hand, last_chance=False, deadline=None):
+        """是否叫地主：last_chance为前两家都不叫时（用较低门槛），估计失败时退回should_call规则"""
+        rate = self.estimate(hand.counts, deadline)
+        if rate is None:
+            return should_call(hand)
+        return rate >= (self.last_threshold if last_chance else self.threshold)
+
+# ---------------------- 蒙特卡洛AI ----------------------
+def root_candidates(engine, seat):
+    """
+    根节点候选：同（牌型, 优先级, 数量）只保留带牌最小的一个，贪心出牌排在最前；
+    非首出时附加过牌（None）
+    """
+    hand = engine.hands[seat]
+    counts = hand.counts
+    last_play = engine.last_play
+    candidates = []
+    seen = set()
+    for pattern, result in iter_beating_moves(counts, last_play):
+        if result not in seen:
+            seen.add(result)
+            candidates.append((pattern, result))
+    if last_play.is_lead:
+        greedy = greedy_play(hand, last_play)
+        greedy_result = (greedy.type, greedy.priority, greedy.count)
+        candidates.sort(key=lambda move: move[1] != greedy_result)
+    else:
+        candidates.append(None)
+    return candidates
+
+def _rollout_move(board, seat, move, last_result, last_seat, pass_count, landlord):
+    """走完根节点着法后按快速策略推演，返回获胜座位"""
+    if move is None:
+        pass_count += 1
+        if pass_count == SEAT_COUNT - 1:
+            return rollout(board, (seat + 1) % SEAT_COUNT, None, -1, 0, landlord)
+        return rollout(board, (seat + 1) % SEAT_COUNT, last_result, last_seat, pass_count, landlord)
+    pattern, result = move
+    for slot, count in enumerate(pattern):
+        board[seat][slot] -= count
+    if not any(board[seat]):
+        return seat
+    return rollout(board, (seat + 1) % SEAT_COUNT, result, seat, 0, landlord)
+
+def monte_carlo_play(engine, seat, time_budget=DEFAULT_TIME_BUDGET, max_samples=None, rng=None,
+                     solver=None, endgame_cards=DEFAULT_ENDGAME_CARDS, solver_nodes=DEFAULT_SOLVER_NODES,
+                     sampler=None):
+    """
+    确定化蒙特卡洛出牌：每次采样其余两家手牌，对每个候选出牌各推演一局，
+    时间用尽（或达到采样次数）时返回胜率最高的候选；只有一个候选时直接返回。
+    三家合计不超过endgame_cards张且提供了solver时，每个采样改用残局求解给出精确胜负
+    （超出solver_nodes个节点的评估退回推演）；
+    sampler为记牌器给出的HiddenHandSampler时按其约束采样，否则只按可见信息随机分配
+    :return: Play（过牌为pass_play()）
+    """
+    deadline = time.perf_counter() + time_budget
+    rng = rng or random
+    hand = engine.hands[seat]
+    candidates = root_candidates(engine, seat)
+    if not candidates:
+        return pass_play()
+    wins = [0] * len(candidates)
+    visits = [0] * len(candidates)
+    if len(candidates) > 1:
+        landlord = engine.landlord
+        if sampler is None:
+            unknown, forced = visible_unknown_counts(engine, seat)
+        last = engine.last_play
+        last_result = None if last.is_lead else (last.type, last.priority, last.count)
+        endgame = solver is not None and sum(len(other) for other in engine.hands) <= endgame_cards
+        samples = 0
+        while max_samples is None or samples < max_samples:
+            samples += 1
+            if sampler is None:
+                hands = sample_hidden_hands(engine, seat, rng, unknown, forced)
+            else:
+                hands = sampler.sample(rng)
+            for index, move in enumerate(candidates):
+                if time.perf_counter() >= deadline:
+                    break
+                landlord_won = None
+                if endgame:
+                    landlord_won = solver.solve_move(hands, seat, move, last_result, engine.pass_count,
+                                                     landlord, solver_nodes)
+                if landlord_won is None:
+                    winner = _rollout_move([counts.copy() for counts in hands], seat, move, last_result,
+                                           last.player, engine.pass_count, landlord)
+                    landlord_won = winner == landlord if winner >= 0 else None
+                visits[index] += 1
+                if landlord_won is not None and landlord_won == (seat == landlord):
+                    wins[index] += 1
+            else:
+                continue
+            break
+    best = max(range(len(candidates)),
+               key=lambda index: (wins[index] / visits[index] if visits[index] else -1.0, -index))
+    move = candidates[best]
+    if move is None:
+        return pass_play()
+    pattern, result = move
+    return Play(pattern_to_cards(pattern, hand), *result)
+
+def make_agent(level=DEFAULT_AI_LEVEL, **kwargs):
+    """按难度等级（AI_LEVELS）创建蒙特卡洛代理，kwargs覆盖等级设置或传入book、bidder等"""
+    return MonteCarloAgent(**{**AI_LEVELS[level], **kwargs})
+
+class MonteCarloAgent(Agent):
+    """
+    蒙特卡洛确定化AI：叫地主沿用should_call，出牌在time_budget秒内搜索，残局（不超过endgame_cards张）改用求解器；
+    记牌器跟踪已出的牌和过牌推断的缺牌，按其约束采样；提供开局库时叫地主与地主首出先查库，
+    库中没有时用bidder（BidEstimator）估计胜率决定叫地主
+    """
+
+    def __init__(self, time_budget=DEFAULT_TIME_BUDGET, max_samples=None, rng=None,
+                 endgame_cards=DEFAULT_ENDGAME_CARDS, solver_nodes=DEFAULT_SOLVER_NODES, book=None, bidder=None):
+        self.time_budget = time_budget
+        self.max_samples = max_samples
+        self.rng = rng if rng is not None else random.Random()
+        self.endgame_cards = endgame_cards
+        self.solver_nodes = solver_nodes
+        self.solver = EndgameSolver() if endgame_cards > 0 else None
+        self.book = book
+        self.bidder = bidder
+        self.tracker = CardTracker()
+
+    def bid(self, engine, seat, deadline=None):
+        hand = engine.hands[seat]
+        call = book_call(self.book, hand)
+        if call is not None:
+            return call
+        if self.bidder is not None:
+            return self.bidder.should_call(hand, engine.bids_left == 1, deadline)
+        return should_call(hand)
+
+    def play(self, engine, seat, deadline=None):
+        play = book_opening_play(self.book, engine, seat)
+        if play is not None:
+            return play
+        time_budget = self.time_budget
+        if deadline is not None:
+            time_budget = max(0.0, min(time_budget, deadline - time.perf_counter()))
+        return monte_carlo_play(engine, seat, time_budget, self.max_samples, self.rng,
+                                self.solver, self.endgame_cards, self.solver_nodes,
+                                self.tracker.sampler(engine, seat))
+
+# ---------------------- 玩家思考期间的预计算 ----------------------
+def likely_plays(engine, seat, limit=SPECULATE_PLAYS):
+    """座位seat最可能的出牌：贪心出牌、过牌（非首出时），其余按root_candidates的顺序，最多limit种"""
+    hand = engine.hands[seat]
+    plays = [greedy_play(hand, engine.last_play)]
+    if not engine.last_play.is_lead:
+        plays.append(pass_play())
+    seen = {(play.type, play.priority, play.count) for play in plays}
+    for move in root_candidates(engine, seat):
+        if len(plays) >= limit:
+            break
+        if move is None or move[1] in seen:
+            continue
+        seen.add(move[1])
+        pattern, result = move
+        plays.append(Play(pattern_to_cards(pattern, hand), *result))
+    return plays[:limit]
+
+class SpeculativePlanner:
+    """
+    玩家思考期间的预计算：对玩家最可能的几种出牌各复制一份局面，后台线程依次算出下一家AI的应对，
+    按出牌后的规范键保存；玩家出牌后命中的直接取用（正在算的等它算完），其余全部取消。
+    agents为专用于预计算的代理（不与对局中的代理共享记牌器、置换表等状态）；
+    每个预计算从开始算起最多time_budget秒，不超过AIWorker的截止时长时，取用正在算的预计算不会比重新提交更晚
+    """
+
+    def __init__(self, agents, limit=SPECULATE_PLAYS, time_budget=DEFAULT_TIME_BUDGET):
+        self.agents = list(agents)
+        self.limit = limit
+        self.time_budget = time_budget
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._futures = {}  # 玩家出牌后的规范键 -> Future(AI的出牌)
+        self.hits = 0
+        self.misses = 0
+
+    def start(self, engine, seat):
+        """轮到座位seat（玩家）出牌时调用：排队预计算下一家AI对其各种可能出牌的应对"""
+        self.cancel()
+        next_seat = (seat + 1) % SEAT_COUNT
+        agent = self.agents[next_seat]
+        if agent is None or engine.phase != PHASE_PLAYING or engine.current != seat:
+            return
+        for play in likely_plays(engine, seat, self.limit):
+            branch = engine.clone()
+            is_able, _ = branch.play(seat, play)
+            if not is_able or branch.phase != PHASE_PLAYING:
+                continue
+            key = branch.canonical_key()
+            if key not in self._futures:
+                self._futures[key] = self._executor.submit(self._speculate, agent, branch, next_seat)
+
+    def _speculate(self, agent, engine, seat):
+        # 截止时刻在开始算时才确定，排在后面的预计算同样有完整的time_budget
+        return agent.play(engine, seat, time.perf_counter() + self.time_budget)
+
+    def take(self, engine):
+        """
+        取当前局面下轮到的AI的预计算：已算完或正在算则返回其Future（出牌Play），
+        未命中或尚未开始返回None（由调用方按截止时刻重新提交）；排队中的其余预计算一律取消
+        """
+        speculated = bool(self._futures)
+        future = self._futures.pop(engine.canonical_key(), None)
+        self.cancel()
+        if future is None or future.cancel():
+            self.misses += speculated
+            return None
+        self.hits += 1
+        return future
+
+    def cancel(self):
+        """取消尚未开始的预计算（正在算的一个会在后台算完后丢弃）"""
+        for future in self._futures.values():
+            future.cancel()
+        self._futures.clear()
+
+    def close(self):
+        self.cancel()
+        self._executor.shutdown(wait=False)
+
+# ---------------------- 后台决策 ----------------------
+class AIWorker:
+    """
+    在后台线程中让轮到的代理做决定（叫地主为bool，出牌为Play），立即返回Future；
+    代理在局面副本上计算，调用方可照常读写引擎，取消后正在进行的计算结束时结果被丢弃
+    """
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    def submit(self, engine, deadline=None):
+        """提交当前座位的决策，deadline为截止时刻（到时代理返回目前最好的决定）"""
+        seat = engine.current
+        agent = engine.agents[seat]
+        if agent is None:
+            raise RuntimeError(f"座位{seat}没有代理，需由外部提交操作")
+        branch = engine.clone()
+        decide = agent.bid if engine.phase == PHASE_BIDDING else agent.play
+        return self._executor.submit(decide, branch, seat, deadline)
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
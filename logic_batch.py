@@ -0,0 +1,334 @@
+# logic_batch.py
+"""斗地主批量对局环境（NumPy结构化数组，一次step同步推进成千上万桌；NumPy为可选依赖）"""
+from logic_card import *
+from logic_game import greedy_move
+from logic_card import (_SIGNATURE_TABLE, _JUDGE_SINGLE_RANK, _JUDGE_JOKER_PAIR,
+                        _JUDGE_WITH_KICKER, _JUDGE_CHAIN, _SLOT_2, _JOKER_SLOTS)
+
+try:
+    import numpy as np
+except ImportError:  # 仅批量环境需要NumPy，界面与单局引擎不受影响
+    np = None
+
+BATCH_SEATS = 3
+BATCH_HAND_SIZE = 17
+
+# ---------------------- 牌型整数编码 ----------------------
+# 数组中的牌型列使用整数编码，0表示本轮无需压制（首出）
+BATCH_CARD_TYPES = (
+    "", CARD_TYPE_PASS, CARD_TYPE_INVALID,
+    CARD_TYPE_SINGLE, CARD_TYPE_PAIR, CARD_TYPE_TRIPLE, CARD_TYPE_TRIPLE_ONE, CARD_TYPE_TRIPLE_PAIR,
+    CARD_TYPE_SEQUENCE_SINGLE, CARD_TYPE_SEQUENCE_PAIR, CARD_TYPE_PLANE_NO_WING,
+    CARD_TYPE_PLANE_SINGLE_WING, CARD_TYPE_PLANE_PAIR_WING,
+    CARD_TYPE_FOUR_TWO_SINGLE, CARD_TYPE_FOUR_TWO_PAIR,
+    CARD_TYPE_BOMB, CARD_TYPE_JOKER_BOMB,
+)
+BATCH_TYPE_CODE = {card_type: code for code, card_type in enumerate(BATCH_CARD_TYPES)}
+CODE_LEAD = BATCH_TYPE_CODE[""]
+CODE_PASS = BATCH_TYPE_CODE[CARD_TYPE_PASS]
+CODE_INVALID = BATCH_TYPE_CODE[CARD_TYPE_INVALID]
+CODE_BOMB = BATCH_TYPE_CODE[CARD_TYPE_BOMB]
+CODE_JOKER_BOMB = BATCH_TYPE_CODE[CARD_TYPE_JOKER_BOMB]
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("批量对局环境需要NumPy，请先安装可选依赖：uv sync --extra batch（或pip install numpy）")
+
+# ---------------------- 可复现批量发牌 ----------------------
+# 每副牌消耗固定个数的Philox输出（按计数器对齐），第index副牌可直接跳转生成，批量与单独重放结果一致
+_DEAL_DRAWS = 56                    # 54个排序键，补齐到Philox一次计数器输出（4个）的整数倍
+_DEAL_COUNTER_STEP = _DEAL_DRAWS // 4
+_DEAL_CHUNK = 65536                 # 单次生成的副数上限，控制临时内存
+
+# create_deck()下标 -> 牌编号
+DECK_INDEX_TO_ID = None
+
+def deal_stream_key(seed, stream=0):
+    """(种子, 流编号) -> Philox密钥：不同流（每桌/每个进程）统计独立"""
+    _require_numpy()
+    return np.random.SeedSequence([seed, stream]).generate_state(2, np.uint64)
+
+def _deal_bit_generator(seed, stream, index):
+    bit_generator = np.random.Philox(key=deal_stream_key(seed, stream))
+    bit_generator.advance(index * _DEAL_COUNTER_STEP)
+    return bit_generator
+
+def batch_deals(seed, count, start=0, stream=0):
+    """
+    生成第start..start+count-1副牌
+    :return: (count, 54) int数组，每行是create_deck()下标的一个排列
+    """
+    bit_generator = _deal_bit_generator(seed, stream, start)
+    deals = np.empty((count, DECK_SIZE), dtype=np.int8)
+    for begin in range(0, count, _DEAL_CHUNK):
+        size = min(_DEAL_CHUNK, count - begin)
+        keys = bit_generator.random_raw(size * _DEAL_DRAWS).reshape(size, _DEAL_DRAWS)[:, :DECK_SIZE]
+        deals[begin:begin + size] = keys.argsort(axis=1, kind="stable")
+    return deals
+
+def deal_at(seed, index, stream=0):
+    """重放单副牌（与batch_deals中同一下标的行相同）"""
+    return batch_deals(seed, 1, index, stream)[0]
+
+def iter_deals(seed, count, start=0, stream=0, chunk=_DEAL_CHUNK):
+    """分块生成大量牌局，逐块返回（起始下标, 排列数组）"""
+    for begin in range(start, start + count, chunk):
+        size = min(chunk, start + count - begin)
+        yield begin, batch_deals(seed, size, begin, stream)
+
+def deal_card_ids(deals):
+    """create_deck()下标排列 -> 牌编号排列（供BatchEnv.reset使用）"""
+    global DECK_INDEX_TO_ID
+    if DECK_INDEX_TO_ID is None:
+        DECK_INDEX_TO_ID = np.array(create_deck(encoded=True), dtype=np.int8)
+    return DECK_INDEX_TO_ID[deals]
+
+def deal_to_deck(deal):
+    """单副排列 -> 牌字符串列表（供GameEngine.new_round/deal使用）"""
+    deck = create_deck()
+    return [deck[index] for index in deal]
+
+# ---------------------- 向量化牌型判定 ----------------------
+# 签名表展开为稠密数组：[1张点数数, 2张点数数, 3张点数数, 4张点数数] -> 规则编号（0为非法）
+_SIG_DIM = RANK_SLOT_COUNT + 1
+_RULES = None
+
+def _build_rule_arrays():
+    """把_SIGNATURE_TABLE转换为按规则编号索引的列数组"""
+    global _RULES
+    if _RULES is not None:
+        return _RULES
+    rules = [(-1, CARD_TYPE_INVALID, 0, False)] + list(_SIGNATURE_TABLE.values())
+    index = np.zeros((_SIG_DIM,) * 4, dtype=np.int16)
+    for rule_id, signature in enumerate(_SIGNATURE_TABLE, 1):
+        index[signature] = rule_id
+    _RULES = (
+        index,
+        np.array([rule[0] for rule in rules], dtype=np.int8),                        # 判定方式
+        np.array([BATCH_TYPE_CODE[rule[1]] for rule in rules], dtype=np.int8),       # 牌型编码
+        np.array([rule[2] for rule in rules], dtype=np.int8),                        # 主体张数
+        np.array([rule[3] for rule in rules], dtype=bool),                           # 附加条件
+    )
+    return _RULES
+
+def _first_slot(mask):
+    """每行第一个为True的槽位（无则为0）"""
+    return mask.argmax(axis=1)
+
+def _last_slot(mask):
+    """每行最后一个为True的槽位（无则为列数-1）"""
+    return mask.shape[1] - 1 - mask[:, ::-1].argmax(axis=1)
+
+def judge_rank_counts_batch(counts):
+    """
+    批量判定牌型（与judge_rank_counts逐行一致）
+    :param counts: (N, 15) 点数张数数组，全0行视为过牌
+    :return: (牌型编码, 核心优先级, 辅助数量) 三个长度N的数组
+    """
+    _require_numpy()
+    index, rule_kind, rule_type, rule_group, rule_flag = _build_rule_arrays()
+    counts = np.asarray(counts)
+    rows = np.arange(len(counts))
+    hist = [(counts == k).sum(axis=1) for k in range(5)]
+    rule = index[hist[1], hist[2], hist[3], hist[4]]
+    rule[(counts > 4).any(axis=1)] = 0
+    kind = rule_kind[rule]
+    group = rule_group[rule]
+    flag = rule_flag[rule]
+    main = counts == group[:, None]
+    main_slot = _first_slot(main)
+    main_is_joker = main_slot >= _JOKER_SLOTS[0]
+    types = rule_type[rule].astype(np.int8)
+    priority = (main_slot + 3).astype(np.int16)
+    count = np.ones(len(counts), dtype=np.int16)
+    valid = rule > 0
+
+    # 单张/对子/三张/炸弹：对子和三张不能是大小王
+    single = kind == _JUDGE_SINGLE_RANK
+    valid &= ~(single & flag & main_is_joker)
+
+    # 两张单牌：只能是王炸
+    rocket = kind == _JUDGE_JOKER_PAIR
+    valid &= ~(rocket & ~((counts[:, _JOKER_SLOTS[0]] > 0) & (counts[:, _JOKER_SLOTS[1]] > 0)))
+    priority[rocket] = RANK_PRIORITY["大王"]
+
+    # 带牌：主体不能是大小王，三带一对的对子也不能是大小王
+    kicker = kind == _JUDGE_WITH_KICKER
+    pair_is_joker = _first_slot(counts == 2) >= _JOKER_SLOTS[0]
+    valid &= ~(kicker & (main_is_joker | (flag & pair_is_joker)))
+
+    # 链式牌型：主体点数排除2和大小王后需连续，优先级取主体最大点数
+    chain = kind == _JUDGE_CHAIN
+    chain_main = main[:, :_SLOT_2]
+    chain_len = chain_main.sum(axis=1)
+    low = _first_slot(chain_main)
+    high = _last_slot(chain_main)
+    valid &= ~(chain & ((chain_len == 0) | (high - low + 1 != chain_len)))
+    group_count = np.choose(np.clip(group, 0, 4), hist)
+    priority = np.where(chain, _last_slot(main) + 3, priority)
+    count = np.where(chain, np.where(flag, group_count * group, group_count), count).astype(np.int16)
+
+    types[~valid] = CODE_INVALID
+    priority[~valid] = 0
+    count[~valid] = 0
+    is_pass = counts.sum(axis=1) == 0
+    types[is_pass] = CODE_PASS
+    priority[is_pass] = 0
+    count[is_pass] = 0
+    return types, priority, count
+
+def can_beat_batch(types, priority, count, last_type, last_priority, last_count):
+    """批量压制校验（与is_card_able_to_play一致，另外首出时不允许过牌）"""
+    is_lead = last_type == CODE_LEAD
+    is_pass = types == CODE_PASS
+    playable = (types != CODE_INVALID) & ~is_pass
+    last_normal = (last_type != CODE_LEAD) & (last_type != CODE_BOMB) & (last_type != CODE_JOKER_BOMB)
+    beats = (
+        (types == CODE_JOKER_BOMB)
+        | ((last_type == CODE_BOMB) & (types == CODE_BOMB) & (priority > last_priority))
+        | (last_normal & (types == CODE_BOMB))
+        | (last_normal & (types == last_type) & (count == last_count) & (priority > last_priority))
+    )
+    return np.where(is_lead, playable, is_pass | (playable & beats))
+
+def pattern_cards(pattern):
+    """点数张数 -> 一组代表牌（花色按♠♥♣♦依次取），用于把数组中的出牌还原为Play"""
+    cards = []
+    for slot, count in enumerate(pattern):
+        if slot >= _JOKER_SLOTS[0]:
+            cards.extend([RANK_ORDER[slot]] * count)
+        else:
+            cards.extend(CARD_STRINGS[slot * 4 + suit] for suit in range(count))
+    return cards
+
+# ---------------------- 批量环境 ----------------------
+class BatchEnv:
+    """
+    结构化数组形式的多桌对局：每桌三个座位的点数张数 + 上一手（需压制）的牌型/优先级/数量列
+    step(actions)同时推进所有桌：actions为(桌数, 15)的点数张数，全0表示过牌
+    """
+
+    def __init__(self, tables):
+        _require_numpy()
+        self.tables = tables
+        self.counts = np.zeros((tables, BATCH_SEATS, RANK_SLOT_COUNT), dtype=np.int8)
+        self.last_pattern = np.zeros((tables, RANK_SLOT_COUNT), dtype=np.int8)
+        self.last_type = np.zeros(tables, dtype=np.int8)
+        self.last_priority = np.zeros(tables, dtype=np.int16)
+        self.last_count = np.zeros(tables, dtype=np.int16)
+        self.last_seat = np.full(tables, -1, dtype=np.int8)
+        self.pass_count = np.zeros(tables, dtype=np.int8)
+        self.current = np.zeros(tables, dtype=np.int8)
+        self.landlord = np.zeros(tables, dtype=np.int8)
+        self.winner = np.full(tables, -1, dtype=np.int8)
+        self.moves = np.zeros(tables, dtype=np.int32)
+        self._rows = np.arange(tables)
+
+    def reset(self, deals, landlord=0):
+        """
+        按发牌重置所有桌
+        :param deals: (桌数, 54) 牌编号排列（前51张轮流发给三个座位，后3张为底牌）
+        :param landlord: 地主座位（整数或长度为桌数的数组），地主获得底牌并首出
+        """
+        deals = np.asarray(deals)
+        landlord = np.broadcast_to(np.asarray(landlord, dtype=np.int8), (self.tables,)).copy()
+        slots = np.asarray(CARD_RANK_SLOT, dtype=np.int64)[deals]
+        seats = np.empty(deals.shape[1], dtype=np.int64)
+        dealt = BATCH_SEATS * BATCH_HAND_SIZE
+        seats[:dealt] = np.arange(dealt) % BATCH_SEATS
+        seats = np.broadcast_to(seats, deals.shape).copy()
+        seats[:, dealt:] = landlord[:, None]
+        flat = (self._rows[:, None] * BATCH_SEATS + seats) * RANK_SLOT_COUNT + slots
+        self.counts[...] = np.bincount(
+            flat.ravel(), minlength=self.tables * BATCH_SEATS * RANK_SLOT_COUNT
+        ).reshape(self.counts.shape)
+        self.last_pattern[:] = 0
+        self.last_type[:] = CODE_LEAD
+        self.last_priority[:] = 0
+        self.last_count[:] = 0
+        self.last_seat[:] = -1
+        self.pass_count[:] = 0
+        self.landlord[:] = landlord
+        self.current[:] = landlord
+        self.winner[:] = -1
+        self.moves[:] = 0
+
+    @property
+    def done(self):
+        return self.winner >= 0
+
+    def current_counts(self):
+        """各桌当前行动座位的手牌点数张数 (桌数, 15)"""
+        return self.counts[self._rows, self.current]
+
+    def legal_mask(self, actions):
+        """各桌动作是否合法（已结束的桌恒为False），返回（合法掩码, 牌型, 优先级, 数量）"""
+        actions = np.asarray(actions)
+        types, priority, count = judge_rank_counts_batch(actions)
+        in_hand = (actions <= self.current_counts()).all(axis=1) & (actions >= 0).all(axis=1)
+        legal = in_hand & ~self.done & can_beat_batch(
+            types, priority, count, self.last_type, self.last_priority, self.last_count)
+        return legal, types, priority, count
+
+    def step(self, actions):
+        """
+        同步推进所有桌：合法动作生效，非法动作及已结束的桌保持不变
+        :return: 合法掩码（长度为桌数的bool数组）
+        """
+        actions = np.asarray(actions, dtype=np.int8)
+        legal, types, priority, count = self.legal_mask(actions)
+        rows = self._rows[legal]
+        seats = self.current[legal]
+        self.counts[rows, seats] -= actions[legal]
+        self.moves[legal] += 1
+
+        played = legal & (types != CODE_PASS)
+        self.last_pattern[played] = actions[played]
+        self.last_type[played] = types[played]
+        self.last_priority[played] = priority[played]
+        self.last_count[played] = count[played]
+        self.last_seat[played] = self.current[played]
+        self.pass_count[played] = 0
+
+        # 其余两家都过牌，出牌人重新首出
+        passed = legal & (types == CODE_PASS)
+        self.pass_count[passed] += 1
+        reset = passed & (self.pass_count == BATCH_SEATS - 1)
+        self.last_pattern[reset] = 0
+        self.last_type[reset] = CODE_LEAD
+        self.last_priority[reset] = 0
+        self.last_count[reset] = 0
+        self.last_seat[reset] = -1
+        self.pass_count[reset] = 0
+
+        emptied = played & (self.counts[self._rows, self.current].sum(axis=1) == 0)
+        self.winner[emptied] = self.current[emptied]
+        advance = legal & ~emptied
+        self.current[advance] = (self.current[advance] + 1) % BATCH_SEATS
+        return legal
+
+    def landlord_won(self):
+        """各桌地主是否获胜（未结束的桌为False）"""
+        return self.done & (self.winner == self.landlord)
+
+    def last_play(self, table):
+        """第table桌需压制的出牌（Play，供单桌策略如iter_beating_moves使用）"""
+        code = int(self.last_type[table])
+        if code == CODE_LEAD:
+            return NO_PLAY
+        return Play(pattern_cards(self.last_pattern[table]), BATCH_CARD_TYPES[code], int(self.last_priority[table]),
+                    int(self.last_count[table]), int(self.last_seat[table]))
+
+# ---------------------- 基准策略 ----------------------
+def greedy_actions(env, decompose=False):
+    """
+    逐桌贪心策略（与greedy_play一致，见greedy_move）
+    :return: (桌数, 15) 动作数组，已结束的桌为全0
+    """
+    actions = np.zeros((env.tables, RANK_SLOT_COUNT), dtype=np.int8)
+    hands = env.current_counts().tolist()
+    for table in np.flatnonzero(~env.done):
+        move = greedy_move(hands[table], env.last_play(table), decompose)
+        if move is not None:
+            actions[table] = move[0]
+    return actions
@@ -1,5 +1,7 @@
 # logic_card.py
 """斗地主纯牌型逻辑模块（无Pygame依赖，仅处理数据和规则）"""
+from functools import lru_cache
+from itertools import combinations
 
 # ---------------------- 核心常量定义（与界面无关）----------------------
 # 卡牌基础配置
@@ -37,11 +39,80 @@ MIN_SEQUENCE_SINGLE_COUNT = 5  # 顺子最小5张
 MIN_SEQUENCE_PAIR_COUNT = 3    # 连对最小3对（6张）
 MIN_PLANE_COUNT = 2            # 飞机最小2组（6张）
 
+# ---------------------- 紧凑整数编码（牌编号0~53 + 54位手牌位掩码）----------------------
+# 点数槽位（按大小升序，共15个槽位：3..A、2、小王、大王）
+RANK_ORDER = ['3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A', '2', '小王', '大王']
+RANK_SLOT_COUNT = len(RANK_ORDER)
+RANK_SLOT = {rank: slot for slot, rank in enumerate(RANK_ORDER)}
+
+# 牌编号：普通牌 = 点数槽位*4 + 花色序号，小王52，大王53（编号越大点数越大）
+CARD_ID_SMALL_JOKER = 52
+CARD_ID_BIG_JOKER = 53
+DECK_SIZE = 54
+FULL_DECK_MASK = (1 << DECK_SIZE) - 1
+
+# 编号 <-> 显示字符串 查找表
+CARD_STRINGS = [f"{suit}{rank}" for rank in RANK_ORDER[:13] for suit in SUITS] + JOKERS
+CARD_ID_BY_STRING = {card: card_id for card_id, card in enumerate(CARD_STRINGS)}
+# 编号 -> 点数槽位 / 点数字符串 / 点数优先级
+CARD_RANK_SLOT = [card_id >> 2 for card_id in range(CARD_ID_SMALL_JOKER)] + [13, 14]
+CARD_RANK = [RANK_ORDER[slot] for slot in CARD_RANK_SLOT]
+CARD_PRIORITY = [RANK_PRIORITY[rank] for rank in CARD_RANK]
+
+def encode(card):
+    """显示字符串 -> 牌编号（已是编号则原样返回）"""
+    if isinstance(card, int):
+        return card
+    return CARD_ID_BY_STRING[card]
+
+def decode(card_id):
+    """牌编号 -> 显示字符串（已是字符串则原样返回）"""
+    if isinstance(card_id, str):
+        return card_id
+    return CARD_STRINGS[card_id]
+
+def cards_to_mask(cards):
+    """牌列表（字符串或编号）-> 54位手牌位掩码"""
+    mask = 0
+    for card in cards:
+        mask |= 1 << encode(card)
+    return mask
+
+def mask_to_cards(mask):
+    """54位手牌位掩码 -> 牌编号列表（按点数升序）"""
+    card_ids = []
+    while mask:
+        low_bit = mask & -mask
+        card_ids.append(low_bit.bit_length() - 1)
+        mask ^= low_bit
+    return card_ids
+
+def encode_cards(cards):
+    """牌列表/位掩码 -> 牌编号列表"""
+    if isinstance(cards, int):
+        return mask_to_cards(cards)
+    return [encode(card) for card in cards]
+
+def decode_cards(cards):
+    """牌编号列表/位掩码 -> 显示字符串列表（供界面使用）"""
+    if isinstance(cards, int):
+        cards = mask_to_cards(cards)
+    return [decode(card) for card in cards]
+
+def as_card_list(cards):
+    """统一入参：位掩码展开为编号列表，列表原样返回"""
+    if isinstance(cards, int):
+        return mask_to_cards(cards)
+    return cards
+
 # ---------------------- 纯逻辑工具方法 ----------------------
 def get_card_rank(card):
-    """提取卡牌的点数（处理花色和大小王）"""
-    if card in JOKERS:
-        return card
+    """提取卡牌的点数（处理花色和大小王，支持牌编号）"""
+    if isinstance(card, int):
+        return CARD_RANK[card]
+    card_id = CARD_ID_BY_STRING.get(card)
+    if card_id is not None:
+        return CARD_RANK[card_id]
     # 优先匹配长点数"10"，避免拆分
     for rank in RANKS[::-1]:
         if card.endswith(rank):
@@ -49,9 +120,9 @@ def get_card_rank(card):
     return card[1:]
 
 def count_rank_occurrences(cards):
-    """统计卡牌中点数的出现次数"""
+    """统计卡牌中点数的出现次数（支持字符串、牌编号列表或位掩码）"""
     rank_count = {}
-    for card in cards:
+    for card in as_card_list(cards):
         rank = get_card_rank(card)
         rank_count[rank] = rank_count.get(rank, 0) + 1
     return rank_count
@@ -82,190 +153,252 @@ def get_max_rank_priority(cards):
     """获取牌组中最大点数的优先级"""
     if not cards:
         return 0
-    ranks = [get_card_rank(c) for c in cards]
+    ranks = [get_card_rank(c) for c in as_card_list(cards)]
     return max([RANK_PRIORITY.get(r, 0) for r in ranks])
 
+# ---------------------- 牌型判定（点数签名查表）----------------------
+# 签名 = 各张数（1/2/3/4张）的点数个数，判定规则只取决于签名和少量点数条件
+_JUDGE_SINGLE_RANK = 0   # 单张/对子/三张/炸弹：仅一个点数
+_JUDGE_JOKER_PAIR = 1    # 两张单牌：仅大小王组成王炸
+_JUDGE_WITH_KICKER = 2   # 三带一/三带一对/四带二：主体+带牌
+_JUDGE_CHAIN = 3         # 顺子/连对/飞机（可带翼）：主体点数需连续
+
+_SLOT_2 = RANK_SLOT['2']
+_JOKER_SLOTS = (RANK_SLOT['小王'], RANK_SLOT['大王'])
+_INVALID_RESULT = (CARD_TYPE_INVALID, 0, 0)
+
+def _build_signature_table():
+    """预计算签名表：(1张点数数, 2张点数数, 3张点数数, 4张点数数) -> 判定规则"""
+    table = {
+        (1, 0, 0, 0): (_JUDGE_SINGLE_RANK, CARD_TYPE_SINGLE, 1, False),
+        (0, 1, 0, 0): (_JUDGE_SINGLE_RANK, CARD_TYPE_PAIR, 2, True),
+        (0, 0, 1, 0): (_JUDGE_SINGLE_RANK, CARD_TYPE_TRIPLE, 3, True),
+        (0, 0, 0, 1): (_JUDGE_SINGLE_RANK, CARD_TYPE_BOMB, 4, False),
+        (2, 0, 0, 0): (_JUDGE_JOKER_PAIR, CARD_TYPE_JOKER_BOMB, 1, False),
+        (1, 0, 1, 0): (_JUDGE_WITH_KICKER, CARD_TYPE_TRIPLE_ONE, 3, False),
+        (0, 1, 1, 0): (_JUDGE_WITH_KICKER, CARD_TYPE_TRIPLE_PAIR, 3, True),
+        (2, 0, 0, 1): (_JUDGE_WITH_KICKER, CARD_TYPE_FOUR_TWO_SINGLE, 4, False),
+        (0, 2, 0, 1): (_JUDGE_WITH_KICKER, CARD_TYPE_FOUR_TWO_PAIR, 4, False),
+    }
+    # 链式牌型：(牌型, 主体张数, 辅助数量是否取总张数)
+    for length in range(2, RANK_SLOT_COUNT + 1):
+        if length >= MIN_SEQUENCE_SINGLE_COUNT:
+            table[(length, 0, 0, 0)] = (_JUDGE_CHAIN, CARD_TYPE_SEQUENCE_SINGLE, 1, True)
+        if length >= MIN_SEQUENCE_PAIR_COUNT:
+            table[(0, length, 0, 0)] = (_JUDGE_CHAIN, CARD_TYPE_SEQUENCE_PAIR, 2, False)
+        if length >= MIN_PLANE_COUNT:
+            table[(0, 0, length, 0)] = (_JUDGE_CHAIN, CARD_TYPE_PLANE_NO_WING, 3, False)
+            table[(length, 0, length, 0)] = (_JUDGE_CHAIN, CARD_TYPE_PLANE_SINGLE_WING, 3, False)
+            table[(0, length, length, 0)] = (_JUDGE_CHAIN, CARD_TYPE_PLANE_PAIR_WING, 3, False)
+    return table
+
+_SIGNATURE_TABLE = _build_signature_table()
+
+# 牌（字符串或编号）-> 点数槽位，一次字典查找完成计数
+_CARD_SLOT = {card: CARD_RANK_SLOT[card_id] for card, card_id in CARD_ID_BY_STRING.items()}
+_CARD_SLOT.update(enumerate(CARD_RANK_SLOT))
+# 4位花色掩码 -> 张数
+_NIBBLE_COUNT = [bin(nibble).count('1') for nibble in range(16)]
+
+def rank_count_vector(cards):
+    """统计15个点数槽位的张数（支持字符串、牌编号列表、位掩码或Hand）"""
+    if isinstance(cards, Hand):
+        return cards.counts.copy()
+    if isinstance(cards, int):
+        counts = [_NIBBLE_COUNT[(cards >> (slot << 2)) & 0xF] for slot in range(13)]
+        counts.append((cards >> CARD_ID_SMALL_JOKER) & 1)
+        counts.append((cards >> CARD_ID_BIG_JOKER) & 1)
+        return counts
+    counts = [0] * RANK_SLOT_COUNT
+    for card in cards:
+        counts[_CARD_SLOT[card]] += 1
+    return counts
+
+# ---------------------- 花色同构规范键 ----------------------
+# 除大小王外花色不影响牌型和大小，手牌/出牌只以15槽位点数张数元组为键（大小王各占一个槽位，即王的有无标记），
+# 牌型判定、出牌生成、最少手数拆分、残局求解和AI的缓存共用这一个键
+JUDGE_CACHE_SIZE = 1 << 16   # 牌型判定缓存的键个数上限
+MOVE_CACHE_SIZE = 1 << 12    # 出牌生成缓存的键个数上限（每个键保存整手候选）
+
+def canonical_key(cards):
+    """手牌或出牌的规范键（支持字符串、牌编号列表、位掩码或Hand），同点数不同花色得到同一个键"""
+    return tuple(rank_count_vector(cards))
+
+def judge_rank_counts(counts):
+    """按15槽位点数张数判定牌型，返回（牌型，核心优先级，辅助数量）"""
+    signature = [0, 0, 0, 0, 0]
+    for count in counts:
+        if count:
+            if count > 4:
+                return _INVALID_RESULT
+            signature[count] += 1
+    rule = _SIGNATURE_TABLE.get((signature[1], signature[2], signature[3], signature[4]))
+    if rule is None:
+        return _INVALID_RESULT
+    kind, card_type, group, flag = rule
+    
+    if kind == _JUDGE_SINGLE_RANK:
+        slot = counts.index(group)
+        if flag and slot in _JOKER_SLOTS:
+            return _INVALID_RESULT
+        return (card_type, slot + 3, 1)
+    
+    if kind == _JUDGE_JOKER_PAIR:
+        if counts[_JOKER_SLOTS[0]] and counts[_JOKER_SLOTS[1]]:
+            return (card_type, RANK_PRIORITY["大王"], 1)
+        return _INVALID_RESULT
+    
+    if kind == _JUDGE_WITH_KICKER:
+        if counts.index(group) in _JOKER_SLOTS:
+            return _INVALID_RESULT
+        # 三带一对：对子也不能是大小王
+        if flag and counts.index(2) in _JOKER_SLOTS:
+            return _INVALID_RESULT
+        return (card_type, counts.index(group) + 3, 1)
+    
+    # 链式牌型：主体点数排除2和大小王后需连续（与is_rank_continuous一致）
+    group_count = signature[group]
+    low = high = -1
+    valid_count = 0
+    top = 0
+    for slot in range(RANK_SLOT_COUNT):
+        if counts[slot] == group:
+            top = slot
+            if slot < _SLOT_2:
+                if low < 0:
+                    low = slot
+                high = slot
+                valid_count += 1
+    if valid_count == 0 or high - low + 1 != valid_count:
+        return _INVALID_RESULT
+    return (card_type, top + 3, group_count * group if flag else group_count)
+
 def judge_card_type(cards):
     """判断牌型（全量合法牌型），返回（牌型，核心优先级，辅助数量）"""
+    if isinstance(cards, int):
+        if not cards:
+            return _INVALID_RESULT
+        return judge_rank_counts(rank_count_vector(cards))
     if not cards:
-        return (CARD_TYPE_INVALID, 0, 0)
+        return _INVALID_RESULT
     
-    # 1. 过牌单独处理
-    if cards == ["过牌"]:
+    # 过牌单独处理
+    if len(cards) == 1 and cards[0] == "过牌":
         return (CARD_TYPE_PASS, 0, 0)
     
-    card_count = len(cards)
-    rank_count = count_rank_occurrences(cards)
-    ranks = list(rank_count.keys())
-    occurrences = list(rank_count.values())
-    unique_rank_count = len(ranks)
-    
-    # 2. 王炸（唯一2张，包含小王+大王）
-    if card_count == 2 and set(cards) == set(JOKERS):
-        return (CARD_TYPE_JOKER_BOMB, RANK_PRIORITY["大王"], 1)
-    
-    # 3. 普通炸弹（4张同点数，不含大小王）
-    if card_count == 4 and unique_rank_count == 1 and occurrences[0] == 4:
-        core_prio = RANK_PRIORITY[ranks[0]]
-        return (CARD_TYPE_BOMB, core_prio, 1)
-    
-    # 4. 单张（1张任意牌）
-    if card_count == 1:
-        core_prio = RANK_PRIORITY[get_card_rank(cards[0])]
-        return (CARD_TYPE_SINGLE, core_prio, 1)
-    
-    # 5. 对子（2张同点数，不含大小王）
-    if card_count == 2 and unique_rank_count == 1 and occurrences[0] == 2:
-        if ranks[0] in JOKERS:
-            return (CARD_TYPE_INVALID, 0, 0)
-        core_prio = RANK_PRIORITY[ranks[0]]
-        return (CARD_TYPE_PAIR, core_prio, 1)
-    
-    # 6. 顺子（单顺，≥5张连续单牌，不含2、大小王）
-    if card_count >= MIN_SEQUENCE_SINGLE_COUNT and unique_rank_count == card_count:
-        # 条件：所有点数出现1次、连续、不含2和大小王
-        if all(o == 1 for o in occurrences) and is_rank_continuous(ranks):
-            max_rank = max(ranks, key=lambda r: RANK_PRIORITY[r])
-            core_prio = RANK_PRIORITY[max_rank]
-            return (CARD_TYPE_SEQUENCE_SINGLE, core_prio, card_count)
-    
-    # 7. 连对（拖拉机，≥3对（6张），偶数张，不含2、大小王）
-    if card_count >= 2 * MIN_SEQUENCE_PAIR_COUNT and card_count % 2 == 0:
-        # 条件：所有点数出现2次、连续、不含2和大小王
-        if all(o == 2 for o in occurrences) and is_rank_continuous(ranks):
-            pair_count = card_count // 2
-            max_rank = max(ranks, key=lambda r: RANK_PRIORITY[r])
-            core_prio = RANK_PRIORITY[max_rank]
-            return (CARD_TYPE_SEQUENCE_PAIR, core_prio, pair_count)
-    
-    # 8. 三张（3张同点数，不含大小王）
-    if card_count == 3 and unique_rank_count == 1 and occurrences[0] == 3:
-        if ranks[0] in JOKERS:
-            return (CARD_TYPE_INVALID, 0, 0)
-        core_prio = RANK_PRIORITY[ranks[0]]
-        return (CARD_TYPE_TRIPLE, core_prio, 1)
-    
-    # 9. 三带一（4张，3张同点+1张单牌）
-    if card_count == 4 and unique_rank_count == 2:
-        sorted_occur = sorted(occurrences)
-        if sorted_occur == [1, 3]:
-            # 提取三张的点数（核心优先级）
-            triple_rank = ranks[0] if occurrences[0] == 3 else ranks[1]
-            if triple_rank in JOKERS:
-                return (CARD_TYPE_INVALID, 0, 0)
-            core_prio = RANK_PRIORITY[triple_rank]
-            return (CARD_TYPE_TRIPLE_ONE, core_prio, 1)
-    
-    # 10. 三带一对（5张，3张同点+1对对子）
-    if card_count == 5 and unique_rank_count == 2:
-        sorted_occur = sorted(occurrences)
-        if sorted_occur == [2, 3]:
-            triple_rank = ranks[0] if occurrences[0] == 3 else ranks[1]
-            pair_rank = ranks[0] if occurrences[0] == 2 else ranks[1]
-            if triple_rank in JOKERS or pair_rank in JOKERS:
-                return (CARD_TYPE_INVALID, 0, 0)
-            core_prio = RANK_PRIORITY[triple_rank]
-            return (CARD_TYPE_TRIPLE_PAIR, core_prio, 1)
-    
-    # 11. 飞机不带翼（≥6张，≥2组连续三张，不含2、大小王）
-    if card_count >= 3 * MIN_PLANE_COUNT and card_count % 3 == 0:
-        plane_group_count = card_count // 3
-        # 条件：所有点数出现3次、组数≥2、点数连续
-        if all(o == 3 for o in occurrences) and len(ranks) == plane_group_count and plane_group_count >= MIN_PLANE_COUNT:
-            if is_rank_continuous(ranks):
-                max_rank = max(ranks, key=lambda r: RANK_PRIORITY[r])
-                core_prio = RANK_PRIORITY[max_rank]
-                return (CARD_TYPE_PLANE_NO_WING, core_prio, plane_group_count)
-    
-    # 12. 飞机带单翼（≥8张，≥2组连续三张+等量单张）
-    if card_count >= 3 * MIN_PLANE_COUNT + MIN_PLANE_COUNT:
-        plane_group_count = None
-        # 统计点数出现次数：3次（三张）、1次（单张）
-        occur_3_count = sum(1 for o in occurrences if o == 3)
-        occur_1_count = sum(1 for o in occurrences if o == 1)
-        # 条件：组数=3次点数数量=1次点数数量≥2、总牌数=3*组数+1*组数
-        if occur_3_count == occur_1_count and occur_3_count >= MIN_PLANE_COUNT:
-            plane_group_count = occur_3_count
-            total_needed = 3 * plane_group_count + 1 * plane_group_count
-            if card_count == total_needed:
-                # 提取三张的点数并验证连续性
-                plane_ranks = [r for r, o in rank_count.items() if o == 3]
-                if is_rank_continuous(plane_ranks):
-                    max_plane_rank = max(plane_ranks, key=lambda r: RANK_PRIORITY[r])
-                    core_prio = RANK_PRIORITY[max_plane_rank]
-                    return (CARD_TYPE_PLANE_SINGLE_WING, core_prio, plane_group_count)
-    
-    # 13. 飞机带双翼（≥10张，≥2组连续三张+等量对子）
-    if card_count >= 3 * MIN_PLANE_COUNT + 2 * MIN_PLANE_COUNT:
-        plane_group_count = None
-        # 统计点数出现次数：3次（三张）、2次（对子）
-        occur_3_count = sum(1 for o in occurrences if o == 3)
-        occur_2_count = sum(1 for o in occurrences if o == 2)
-        # 条件：组数=3次点数数量=2次点数数量≥2、总牌数=3*组数+2*组数
-        if occur_3_count == occur_2_count and occur_3_count >= MIN_PLANE_COUNT:
-            plane_group_count = occur_3_count
-            total_needed = 3 * plane_group_count + 2 * plane_group_count
-            if card_count == total_needed:
-                # 提取三张的点数并验证连续性
-                plane_ranks = [r for r, o in rank_count.items() if o == 3]
-                if is_rank_continuous(plane_ranks):
-                    max_plane_rank = max(plane_ranks, key=lambda r: RANK_PRIORITY[r])
-                    core_prio = RANK_PRIORITY[max_plane_rank]
-                    return (CARD_TYPE_PLANE_PAIR_WING, core_prio, plane_group_count)
-    
-    # 14. 四带两张单（6张，4张同点+2张不同单牌）
-    if card_count == 6 and unique_rank_count == 3:
-        sorted_occur = sorted(occurrences)
-        if sorted_occur == [1, 1, 4]:
-            four_rank = [r for r, o in rank_count.items() if o == 4][0]
-            if four_rank in JOKERS:
-                return (CARD_TYPE_INVALID, 0, 0)
-            core_prio = RANK_PRIORITY[four_rank]
-            return (CARD_TYPE_FOUR_TWO_SINGLE, core_prio, 1)
-    
-    # 15. 四带两对（8张，4张同点+2副不同对子）
-    if card_count == 8 and unique_rank_count == 3:
-        sorted_occur = sorted(occurrences)
-        if sorted_occur == [2, 2, 4]:
-            four_rank = [r for r, o in rank_count.items() if o == 4][0]
-            if four_rank in JOKERS:
-                return (CARD_TYPE_INVALID, 0, 0)
-            core_prio = RANK_PRIORITY[four_rank]
-            return (CARD_TYPE_FOUR_TWO_PAIR, core_prio, 1)
-    
-    # 16. 非法牌型
-    return (CARD_TYPE_INVALID, 0, 0)
+    # 一次计数得到规范键，再按键查缓存/签名表判定（非牌组中的牌视为非法）
+    try:
+        key = canonical_key(cards)
+    except KeyError:
+        return _INVALID_RESULT
+    return judge_key(key)
+
+@lru_cache(maxsize=JUDGE_CACHE_SIZE)
+def judge_key(key):
+    """按规范键判定牌型（带缓存）"""
+    return judge_rank_counts(key)
+
+# ---------------------- 已判定出牌（Play）----------------------
+class Play:
+    """已判定牌型的出牌（不可变、可哈希），判定一次后供压制校验和last_play复用"""
+    __slots__ = ("cards", "type", "priority", "count", "player")
+    
+    def __init__(self, cards, card_type, priority, count, player=""):
+        object.__setattr__(self, "cards", tuple(cards))
+        object.__setattr__(self, "type", card_type)
+        object.__setattr__(self, "priority", priority)
+        object.__setattr__(self, "count", count)
+        object.__setattr__(self, "player", player)
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("Play对象不可修改")
+    
+    def __delattr__(self, name):
+        raise AttributeError("Play对象不可修改")
+    
+    def _key(self):
+        return (self.cards, self.type, self.priority, self.count, self.player)
+    
+    def __eq__(self, other):
+        if not isinstance(other, Play):
+            return NotImplemented
+        return self._key() == other._key()
+    
+    def __hash__(self):
+        return hash(self._key())
+    
+    def __repr__(self):
+        return (f"Play(cards={list(self.cards)!r}, type={self.type!r}, priority={self.priority}, "
+                f"count={self.count}, player={self.player!r})")
+    
+    @property
+    def is_pass(self):
+        """是否为过牌"""
+        return self.type == CARD_TYPE_PASS
+    
+    @property
+    def is_lead(self):
+        """作为上一轮出牌时，是否表示无需压制（无出牌或过牌）"""
+        return not self.cards or self.type == "" or self.type == CARD_TYPE_PASS
+    
+    def with_player(self, player):
+        """返回出牌人不同的同一出牌"""
+        return Play(self.cards, self.type, self.priority, self.count, player)
+    
+    @classmethod
+    def from_dict(cls, play_info):
+        """兼容旧的last_play字典（player/cards/type/priority/count）"""
+        return cls(as_card_list(play_info.get("cards", [])), play_info.get("type", ""),
+                   play_info.get("priority", 0), play_info.get("count", 0),
+                   play_info.get("player", ""))
+
+# 无出牌（新一轮开始）
+NO_PLAY = Play((), "", 0, 0)
+
+def classify_play(cards, player=""):
+    """判定牌型并生成Play（过牌为["过牌"]）"""
+    card_type, priority, count = judge_card_type(cards)
+    return Play(as_card_list(cards), card_type, priority, count, player)
+
+def pass_play(player=""):
+    """生成过牌的Play"""
+    return Play(["过牌"], CARD_TYPE_PASS, 0, 0, player)
+
+def as_play(play):
+    """统一入参：旧的last_play字典转换为Play，Play原样返回"""
+    if isinstance(play, Play):
+        return play
+    return Play.from_dict(play)
 
 def is_card_able_to_play(current_cards, last_play):
     """
     判断当前牌是否能出（覆盖所有牌型的压制规则）
-    :param current_cards: 当前要出的牌
-    :param last_play: 上一轮出牌信息（dict，包含type/priority/count）
+    :param current_cards: 当前要出的牌（牌列表，或已判定的Play）
+    :param last_play: 上一轮出牌信息（Play，兼容旧的字典）
     :return: (是否合法, 提示文字)
     """
     # 提取上一轮信息
-    last_type = last_play.get("type", "")
-    last_priority = last_play.get("priority", 0)
-    last_count = last_play.get("count", 0)
-    last_cards = last_play.get("cards", [])
-    
-    # 第一步：判断是否为合法牌型（过牌除外）
-    if current_cards != ["过牌"]:
-        current_type, current_priority, current_count = judge_card_type(current_cards)
-        if current_type == CARD_TYPE_INVALID:
-            return (False, "非法牌型，请重新选择！")
-    else:
-        # 过牌始终合法
+    last_play = as_play(last_play)
+    last_type = last_play.type
+    last_priority = last_play.priority
+    last_count = last_play.count
+    last_cards = last_play.cards
+    
+    # 第一步：判断是否为合法牌型（过牌始终合法），已判定的Play不再重复判定
+    if not isinstance(current_cards, Play):
+        current_cards = classify_play(current_cards)
+    if current_cards.is_pass:
         return (True, "")
+    current_type = current_cards.type
+    current_priority = current_cards.priority
+    current_count = current_cards.count
+    if current_type == CARD_TYPE_INVALID:
+        return (False, "非法牌型，请重新选择！")
     
     # 第二步：判断是否为首轮（上一轮无出牌），首轮合法牌型可直接出
-    if not last_cards or last_type == "" or last_type == CARD_TYPE_PASS:
+    if last_play.is_lead:
         return (True, "")
     
-    # 第三步：提取当前牌关键信息
-    current_type, current_priority, current_count = judge_card_type(current_cards)
-    current_card_count = len(current_cards)
-    
     # 规则1：王炸可压一切
     if current_type == CARD_TYPE_JOKER_BOMB:
         return (True, "")
@@ -331,11 +464,471 @@ def is_card_able_to_play(current_cards, last_play):
     # 其他未覆盖情况（默认非法）
     return (False, "无法压制上一轮牌型，请重新选择！")
 
-def create_deck():
-    """创建完整的54张扑克牌组"""
+def create_deck(encoded=False):
+    """创建完整的54张扑克牌组（encoded=True时返回同顺序的牌编号）"""
+    if encoded:
+        return list(_DECK_IDS)
     deck = []
     for suit in SUITS:
         for rank in RANKS:
             deck.append(f"{suit}{rank}")
     deck.extend(JOKERS)
-    return deck
\ No newline at end of file
+    return deck
+
+# 牌组编号（与create_deck()字符串顺序一一对应）
+_DECK_IDS = tuple(encode(card) for card in create_deck())
+
+# ---------------------- 出牌生成（按点数模式去重，支持增量更新）----------------------
+# 出牌模式 = 15槽位点数张数元组，花色不同但点数相同的出牌视为同一模式
+_CHAIN_SLOT_LIMIT = RANK_SLOT['2']  # 顺子/连对/飞机只能用3..A
+
+# 单一点数牌型：需要的张数
+_RANK_TYPE_NEED = {
+    CARD_TYPE_SINGLE: 1, CARD_TYPE_PAIR: 2, CARD_TYPE_TRIPLE: 3, CARD_TYPE_BOMB: 4
+}
+# 带牌牌型：（主体张数，带牌张数，带牌份数）
+_KICKER_TYPE_SHAPE = {
+    CARD_TYPE_TRIPLE_ONE: (3, 1, 1),
+    CARD_TYPE_TRIPLE_PAIR: (3, 2, 1),
+    CARD_TYPE_FOUR_TWO_SINGLE: (4, 1, 2),
+    CARD_TYPE_FOUR_TWO_PAIR: (4, 2, 2),
+}
+# 链式牌型：（每个点数张数，最短长度，每组带牌张数）
+_CHAIN_TYPE_SHAPE = {
+    CARD_TYPE_SEQUENCE_SINGLE: (1, MIN_SEQUENCE_SINGLE_COUNT, 0),
+    CARD_TYPE_SEQUENCE_PAIR: (2, MIN_SEQUENCE_PAIR_COUNT, 0),
+    CARD_TYPE_PLANE_NO_WING: (3, MIN_PLANE_COUNT, 0),
+    CARD_TYPE_PLANE_SINGLE_WING: (3, MIN_PLANE_COUNT, 1),
+    CARD_TYPE_PLANE_PAIR_WING: (3, MIN_PLANE_COUNT, 2),
+}
+# 普通牌型（炸弹、王炸之外，需同牌型同数量才能压制）
+NORMAL_CARD_TYPES = (
+    CARD_TYPE_SINGLE, CARD_TYPE_PAIR, CARD_TYPE_TRIPLE,
+    CARD_TYPE_TRIPLE_ONE, CARD_TYPE_TRIPLE_PAIR,
+    CARD_TYPE_FOUR_TWO_SINGLE, CARD_TYPE_FOUR_TWO_PAIR,
+    CARD_TYPE_SEQUENCE_SINGLE, CARD_TYPE_SEQUENCE_PAIR,
+    CARD_TYPE_PLANE_NO_WING, CARD_TYPE_PLANE_SINGLE_WING, CARD_TYPE_PLANE_PAIR_WING,
+)
+_ROCKET_PATTERN = tuple(1 if slot in _JOKER_SLOTS else 0 for slot in range(RANK_SLOT_COUNT))
+_ROCKET_RESULT = (CARD_TYPE_JOKER_BOMB, RANK_PRIORITY["大王"], 1)
+
+def _make_pattern(parts):
+    """[(点数槽位, 张数), ...] -> 出牌模式元组"""
+    pattern = [0] * RANK_SLOT_COUNT
+    for slot, count in parts:
+        pattern[slot] = count
+    return tuple(pattern)
+
+def iter_moves_of_type(counts, card_type, group_count=0, above=0):
+    """
+    按核心优先级升序生成指定牌型的出牌（同优先级带牌小的在前）
+    :param counts: 15槽位点数张数（rank_count_vector的结果）
+    :param card_type: 牌型（普通牌型、炸弹或王炸）
+    :param group_count: 链式牌型的长度/组数，0表示不限
+    :param above: 只生成核心优先级大于该值的出牌
+    :return: 生成器，元素为（出牌模式元组，（牌型，核心优先级，辅助数量））
+    """
+    first_slot = max(above - 2, 0)
+    
+    if card_type == CARD_TYPE_JOKER_BOMB:
+        if counts[_JOKER_SLOTS[0]] and counts[_JOKER_SLOTS[1]]:
+            yield _ROCKET_PATTERN, _ROCKET_RESULT
+        return
+    
+    if card_type in _RANK_TYPE_NEED:
+        need = _RANK_TYPE_NEED[card_type]
+        end_slot = RANK_SLOT_COUNT if need == 1 else 13
+        for slot in range(first_slot, end_slot):
+            if counts[slot] >= need:
+                yield _make_pattern(((slot, need),)), (card_type, slot + 3, 1)
+        return
+    
+    if card_type in _KICKER_TYPE_SHAPE:
+        main_need, kicker_need, kicker_count = _KICKER_TYPE_SHAPE[card_type]
+        kicker_end = RANK_SLOT_COUNT if kicker_need == 1 else 13
+        for main in range(first_slot, 13):
+            if counts[main] < main_need:
+                continue
+            kickers = [slot for slot in range(kicker_end)
+                       if slot != main and counts[slot] >= kicker_need]
+            result = (card_type, main + 3, 1)
+            base = [0] * RANK_SLOT_COUNT
+            base[main] = main_need
+            for chosen in combinations(kickers, kicker_count):
+                pattern = base.copy()
+                for slot in chosen:
+                    pattern[slot] = kicker_need
+                yield tuple(pattern), result
+        return
+    
+    if card_type in _CHAIN_TYPE_SHAPE:
+        need, min_len, wing_need = _CHAIN_TYPE_SHAPE[card_type]
+        if group_count and group_count < min_len:
+            return
+        wing_end = RANK_SLOT_COUNT if wing_need == 1 else 13
+        # 按链尾点数升序枚举，链尾向前延伸到不足need张为止
+        for end in range(first_slot, _CHAIN_SLOT_LIMIT):
+            if counts[end] < need:
+                continue
+            lowest = end
+            while lowest > 0 and counts[lowest - 1] >= need:
+                lowest -= 1
+            if group_count:
+                starts = (end - group_count + 1,) if end - group_count + 1 >= lowest else ()
+            else:
+                starts = range(end - min_len + 1, lowest - 1, -1)
+            for start in starts:
+                length = end - start + 1
+                body = [0] * RANK_SLOT_COUNT
+                body[start:end + 1] = [need] * length
+                result = (card_type, end + 3, length)
+                if not wing_need:
+                    yield tuple(body), result
+                    continue
+                # 翼不能与机身同点数
+                wings = [slot for slot in range(wing_end)
+                         if (slot < start or slot > end) and counts[slot] >= wing_need]
+                for chosen in combinations(wings, length):
+                    pattern = body.copy()
+                    for slot in chosen:
+                        pattern[slot] = wing_need
+                    yield tuple(pattern), result
+
+def generate_moves(counts):
+    """
+    按点数张数生成全部合法出牌（标准牌型，链式牌型不含2和大小王）
+    :param counts: 15槽位点数张数（rank_count_vector的结果）
+    :return: dict，出牌模式元组 -> （牌型，核心优先级，辅助数量）（新dict，调用方可修改）
+    """
+    return dict(moves_for_key(tuple(counts)))
+
+@lru_cache(maxsize=MOVE_CACHE_SIZE)
+def moves_for_key(key):
+    """按规范键生成全部合法出牌（带缓存），返回（出牌模式, 牌型结果）元组，顺序同generate_moves"""
+    moves = dict(iter_moves_of_type(key, CARD_TYPE_JOKER_BOMB))
+    moves.update(iter_moves_of_type(key, CARD_TYPE_BOMB))
+    for card_type in NORMAL_CARD_TYPES:
+        moves.update(iter_moves_of_type(key, card_type))
+    return tuple(moves.items())
+
+def iter_beating_moves(counts, last_play):
+    """
+    惰性生成能压制上一轮的出牌：同牌型同数量更大 -> 炸弹 -> 王炸，
+    每段内从小到大，调用方取到第一个满意的出牌即可停止（压制规则同is_card_able_to_play）
+    :param counts: 15槽位点数张数（rank_count_vector的结果）
+    :param last_play: 上一轮出牌信息（Play，兼容旧的字典）
+    :return: 生成器，元素为（出牌模式元组，（牌型，核心优先级，辅助数量））
+    """
+    last_play = as_play(last_play)
+    last_type = last_play.type
+    last_priority = last_play.priority
+    last_count = last_play.count
+    
+    # 首轮（上一轮无出牌或过牌）：任意合法牌型，普通牌型在前
+    if last_play.is_lead:
+        for card_type in NORMAL_CARD_TYPES:
+            yield from iter_moves_of_type(counts, card_type)
+        yield from iter_moves_of_type(counts, CARD_TYPE_BOMB)
+        yield from iter_moves_of_type(counts, CARD_TYPE_JOKER_BOMB)
+        return
+    
+    if last_type == CARD_TYPE_JOKER_BOMB:
+        return
+    if last_type == CARD_TYPE_BOMB:
+        yield from iter_moves_of_type(counts, CARD_TYPE_BOMB, above=last_priority)
+    elif last_type in NORMAL_CARD_TYPES:
+        yield from iter_moves_of_type(counts, last_type, last_count, last_priority)
+        yield from iter_moves_of_type(counts, CARD_TYPE_BOMB)
+    yield from iter_moves_of_type(counts, CARD_TYPE_JOKER_BOMB)
+
+def pattern_to_cards(pattern, cards):
+    """按出牌模式从手牌中取出具体的牌（同点数取手牌中靠前的），按点数升序返回"""
+    need = list(pattern)
+    picked = []
+    for card in as_card_list(cards):
+        slot = _CARD_SLOT[card]
+        if need[slot]:
+            need[slot] -= 1
+            picked.append(card)
+    picked.sort(key=_CARD_SLOT.__getitem__)
+    return picked
+
+def legal_plays(cards):
+    """列出手牌的全部合法出牌（具体牌列表，按点数模式去重）"""
+    counts = rank_count_vector(cards)
+    return [pattern_to_cards(pattern, cards) for pattern in generate_moves(counts)]
+
+class MoveGenerator:
+    """手牌出牌候选集：出牌后只复查涉及变动点数的候选，无需整体重建"""
+    __slots__ = ("counts", "moves", "_slot_index")
+    
+    def __init__(self, cards=()):
+        self.counts = rank_count_vector(cards)
+        self._rebuild()
+    
+    def _rebuild(self):
+        """整体生成候选集并建立 点数槽位 -> 候选 的索引"""
+        self.moves = generate_moves(self.counts)
+        self._slot_index = [set() for _ in range(RANK_SLOT_COUNT)]
+        for pattern in self.moves:
+            for slot, count in enumerate(pattern):
+                if count:
+                    self._slot_index[slot].add(pattern)
+    
+    def __len__(self):
+        return len(self.moves)
+    
+    def __iter__(self):
+        return iter(self.moves.items())
+    
+    def remove_pattern(self, pattern):
+        """按点数张数移除手牌，剔除超出剩余张数的候选（移除牌不会产生新候选）"""
+        counts = self.counts
+        slot_index = self._slot_index
+        for slot, count in enumerate(pattern):
+            if not count:
+                continue
+            counts[slot] -= count
+            limit = counts[slot]
+            stale = [move for move in slot_index[slot] if move[slot] > limit]
+            for move in stale:
+                del self.moves[move]
+                for move_slot, move_count in enumerate(move):
+                    if move_count:
+                        slot_index[move_slot].discard(move)
+    
+    def remove(self, cards):
+        """移除已出的牌（字符串、牌编号列表或位掩码）"""
+        self.remove_pattern(rank_count_vector(cards))
+    
+    def add(self, cards):
+        """加入新牌（如地主底牌），新牌可组成新牌型，因此重建候选集"""
+        for slot, count in enumerate(rank_count_vector(cards)):
+            self.counts[slot] += count
+        self._rebuild()
+
+# ---------------------- 最少出牌手数拆分（按点数张数记忆化）----------------------
+MIN_PLAYS_CACHE_SIZE = 1 << 18  # 记忆化缓存的点数张数向量个数上限
+
+def _covering_rests(counts, low):
+    """
+    出掉一手包含点数槽位low的合法出牌后的全部剩余点数张数（low须为手牌中最小的点数槽位）
+    直接在点数张数上构造，供最少手数拆分的动态规划使用
+    """
+    rests = []
+    have = counts[low]
+    
+    def take(*parts):
+        rest = list(counts)
+        for slot, count in parts:
+            rest[slot] -= count
+        rests.append(tuple(rest))
+    
+    # 除low外可作单张/对子带牌的点数，三张及以上、四张的点数
+    singles = [slot for slot in range(RANK_SLOT_COUNT) if slot != low and counts[slot]]
+    pairs = [slot for slot in range(13) if slot != low and counts[slot] >= 2]
+    triples = [slot for slot in range(13) if counts[slot] >= 3]
+    
+    # 同点数：单张/对子/三张/炸弹（大小王只能单出或组成王炸）
+    for need in range(1, have + 1):
+        take((low, need))
+    if low == _JOKER_SLOTS[0] and counts[_JOKER_SLOTS[1]]:
+        take((low, 1), (_JOKER_SLOTS[1], 1))
+    
+    # 带牌：low作为主体，或作为带牌之一（带牌与主体、带牌之间点数不同）
+    for main in triples:
+        four = counts[main] == 4
+        if main == low:
+            for kicker in singles:
+                take((low, 3), (kicker, 1))
+            for kicker in pairs:
+                take((low, 3), (kicker, 2))
+            if four:
+                for chosen in combinations(singles, 2):
+                    take((low, 4), (chosen[0], 1), (chosen[1], 1))
+                for chosen in combinations(pairs, 2):
+                    take((low, 4), (chosen[0], 2), (chosen[1], 2))
+            continue
+        take((main, 3), (low, 1))
+        if have >= 2 and low < 13:
+            take((main, 3), (low, 2))
+        if four:
+            for kicker in singles:
+                if kicker != main:
+                    take((main, 4), (low, 1), (kicker, 1))
+            if have >= 2 and low < 13:
+                for kicker in pairs:
+                    if kicker != main:
+                        take((main, 4), (low, 2), (kicker, 2))
+    
+    # 链式：机身从low开始（low最小），或low作为飞机的翼
+    for need, min_len, wing_need in _CHAIN_TYPE_SHAPE.values():
+        starts = [low] if have >= need else []
+        if wing_need and (wing_need == 1 or (have >= 2 and low < 13)):
+            starts.extend(slot for slot in triples if slot > low)
+        for start in starts:
+            end = start
+            while end < _CHAIN_SLOT_LIMIT and counts[end] >= need:
+                end += 1
+            for stop in range(start + min_len, end + 1):
+                length = stop - start
+                body = [(slot, need) for slot in range(start, stop)]
+                if not wing_need:
+                    take(*body)
+                    continue
+                wings = [slot for slot in (singles if wing_need == 1 else pairs) if slot < start or slot >= stop]
+                if start == low:
+                    for chosen in combinations(wings, length):
+                        take(*body, *((slot, wing_need) for slot in chosen))
+                else:
+                    for chosen in combinations(wings, length - 1):
+                        take(*body, (low, wing_need), *((slot, wing_need) for slot in chosen))
+    return rests
+
+def iter_moves_covering(counts, low):
+    """
+    生成包含点数槽位low的全部合法出牌模式（low须为手牌中最小的点数槽位），
+    结果与 generate_moves(counts) 中 pattern[low] > 0 的部分相同，但无需生成其余出牌
+    """
+    for rest in _covering_rests(counts, low):
+        yield tuple(have - left for have, left in zip(counts, rest))
+
+@lru_cache(maxsize=MIN_PLAYS_CACHE_SIZE)
+def _min_plays(counts):
+    """(最少出牌手数, 其中包含最小点数的那一手)；花色不影响结果，因此只以点数张数为键"""
+    low = next((slot for slot, count in enumerate(counts) if count), None)
+    if low is None:
+        return (0, None)
+    best_plays = RANK_SLOT_COUNT * 4 + 1
+    best_rest = None
+    for rest in _covering_rests(counts, low):
+        plays = _min_plays(rest)[0] + 1
+        if plays < best_plays:
+            best_plays, best_rest = plays, rest
+            if plays == 1:
+                break
+    return (best_plays, tuple(have - left for have, left in zip(counts, best_rest)))
+
+def min_play_count(counts):
+    """
+    出完手牌最少需要几手合法出牌（不考虑压制关系），缓存命中时只需一次字典查找
+    :param counts: 15槽位点数张数（rank_count_vector的结果）
+    """
+    return _min_plays(tuple(counts))[0]
+
+def min_play_split(counts):
+    """最少手数的一种拆分方案，返回出牌模式元组列表"""
+    counts = tuple(counts)
+    split = []
+    while True:
+        pattern = _min_plays(counts)[1]
+        if pattern is None:
+            return split
+        split.append(pattern)
+        counts = tuple(have - used for have, used in zip(counts, pattern))
+
+# ---------------------- 手牌容器（点数张数 + 位掩码 + 有序视图）----------------------
+class Hand:
+    """
+    手牌容器：以15槽位点数张数和54位牌位掩码（每个点数4位花色）为准，增删只做O(1)计数/掩码更新；
+    按点数升序的视图在增删后第一次读取时由掩码按位展开（牌编号即按点数升序），连续增删只展开一次
+    """
+    __slots__ = ("counts", "mask", "encoded", "_size", "_ids", "_cards")
+    
+    def __init__(self, cards=(), encoded=False):
+        """encoded=True时视图元素为牌编号，否则为显示字符串"""
+        self.encoded = encoded
+        self.clear()
+        self.extend(cards)
+    
+    def clear(self):
+        """清空手牌"""
+        self.counts = [0] * RANK_SLOT_COUNT
+        self.mask = 0
+        self._size = 0
+        self._ids = []
+        self._cards = []
+    
+    def add(self, card):
+        """加入一张牌（字符串或牌编号），重复加入同一张牌抛出ValueError"""
+        card_id = encode(card)
+        bit = 1 << card_id
+        if self.mask & bit:
+            raise ValueError(f"手牌中已有{decode(card_id)}")
+        self.mask |= bit
+        self.counts[CARD_RANK_SLOT[card_id]] += 1
+        self._size += 1
+        self._ids = self._cards = None
+    
+    append = add
+    
+    def extend(self, cards):
+        """加入多张牌（字符串、牌编号列表或位掩码）"""
+        for card in as_card_list(cards):
+            self.add(card)
+    
+    def remove(self, card):
+        """移除一张牌，不在手牌中时抛出ValueError（与list.remove一致）"""
+        card_id = encode(card)
+        bit = 1 << card_id
+        if not self.mask & bit:
+            raise ValueError(f"手牌中没有{decode(card_id)}")
+        self.mask ^= bit
+        self.counts[CARD_RANK_SLOT[card_id]] -= 1
+        self._size -= 1
+        self._ids = self._cards = None
+    
+    def remove_cards(self, cards):
+        """移除多张牌（字符串、牌编号列表或位掩码）"""
+        for card in as_card_list(cards):
+            self.remove(card)
+    
+    def suit_mask(self, rank):
+        """某点数的花色位掩码（4位，大小王各占最低位）"""
+        slot = RANK_SLOT[rank] if isinstance(rank, str) else rank
+        if slot >= 13:
+            return (self.mask >> (CARD_ID_SMALL_JOKER + slot - 13)) & 1
+        return (self.mask >> (slot << 2)) & 0xF
+    
+    @property
+    def card_ids(self):
+        """按点数升序的牌编号视图（只读使用，下次增删后失效）"""
+        if self._ids is None:
+            self._ids = mask_to_cards(self.mask)
+        return self._ids
+    
+    @property
+    def cards(self):
+        """按点数升序的牌视图（只读使用，下次增删后失效）"""
+        if self._cards is None:
+            card_ids = self.card_ids
+            self._cards = card_ids if self.encoded else [CARD_STRINGS[card_id] for card_id in card_ids]
+        return self._cards
+    
+    def copy(self):
+        """复制手牌"""
+        hand = Hand.__new__(Hand)
+        hand.encoded = self.encoded
+        hand.counts = self.counts.copy()
+        hand.mask = self.mask
+        hand._size = self._size
+        # 视图只读，可与原手牌共用到下次增删
+        hand._ids = self._ids
+        hand._cards = self._cards
+        return hand
+    
+    def __len__(self):
+        return self._size
+    
+    def __iter__(self):
+        return iter(self.cards)
+    
+    def __getitem__(self, index):
+        return self.cards[index]
+    
+    def __contains__(self, card):
+        card_id = card if isinstance(card, int) else CARD_ID_BY_STRING.get(card)
+        return card_id is not None and bool(self.mask >> card_id & 1)
+    
+    def __repr__(self):
+        return f"Hand({self.cards!r})"
@@ -0,0 +1,353 @@
+# logic_game.py
+"""斗地主无界面对局引擎（无Pygame依赖：发牌、叫地主、出牌/过牌、胜负判定，三个座位均可接入代理）"""
+import random
+import time
+from logic_card import *
+
+# ---------------------- 对局常量 ----------------------
+SEAT_COUNT = 3
+HAND_SIZE = 17
+BOTTOM_SIZE = 3
+
+# 对局阶段
+PHASE_IDLE = "idle"            # 尚未发牌
+PHASE_DEALING = "dealing"      # 发牌中
+PHASE_BIDDING = "bidding"      # 叫地主
+PHASE_PLAYING = "playing"      # 出牌
+PHASE_OVER = "over"            # 已分胜负
+PHASE_ABANDONED = "abandoned"  # 无人叫地主，需重新发牌
+
+# ---------------------- 默认AI策略（原界面中的AI逻辑）----------------------
+def should_call(hand):
+    """叫地主判断：王炸、炸弹、两张2或任意一张王"""
+    counts = hand.counts
+    if counts[RANK_SLOT['小王']] and counts[RANK_SLOT['大王']]:
+        return True
+    if 4 in counts:
+        return True
+    if counts[RANK_SLOT['2']] >= 2:
+        return True
+    if counts[RANK_SLOT['小王']] + counts[RANK_SLOT['大王']] >= 1:
+        return True
+    return False
+
+def play_order_key(result):
+    """牌型排序键（王炸>炸弹>普通牌型，同类按核心优先级）"""
+    card_type, priority, _ = result
+    if card_type == CARD_TYPE_JOKER_BOMB:
+        return 1000 + priority
+    elif card_type == CARD_TYPE_BOMB:
+        return 100 + priority
+    else:
+        return priority
+
+def ordered_legal_plays(hand):
+    """获取手牌的所有合法出牌（Play列表，按牌型优先级降序：王炸>炸弹>普通牌型）"""
+    if not hand:
+        return []
+    moves = generate_moves(rank_count_vector(hand))
+    ordered_moves = sorted(moves.items(), key=lambda move: play_order_key(move[1]), reverse=True)
+    return [Play(pattern_to_cards(pattern, hand), *result) for pattern, result in ordered_moves]
+
+def _rest_play_count(counts, pattern):
+    """出掉pattern后剩余手牌最少还需几手"""
+    return min_play_count([have - used for have, used in zip(counts, pattern)])
+
+def _slot_max(pattern):
+    return max(slot for slot, count in enumerate(pattern) if count)
+
+def greedy_move(counts, last_play, decompose=False):
+    """
+    贪心出牌（点数张数层面）：返回（出牌模式, 牌型结果），过牌返回None
+    默认能压就出最小的压制牌，首轮出最大点数最小的一手，同最大点数时牌型大的优先；
+    decompose为True时参考最少手数拆分（地主胜率更高，但自对弈慢约4倍）：
+    压制时只在最先可用的一类压制牌（同牌型/炸弹/王炸）中选，剩余手牌最少手数能出完的优先，其次最小；
+    首轮从最少手数拆分中出最大点数最小的一手（剩余手牌仍是最少手数），同最大点数时牌型大的优先
+    """
+    if not decompose:
+        if not last_play.is_lead:
+            return next(iter(iter_beating_moves(counts, last_play)), None)
+        moves = sorted(generate_moves(counts).items(), key=lambda move: play_order_key(move[1]), reverse=True)
+        return min(moves, key=lambda move: _slot_max(move[0])) if moves else None
+    if not last_play.is_lead:
+        segment = []
+        for move in iter_beating_moves(counts, last_play):
+            if segment and move[1][0] != segment[0][1][0]:
+                break
+            segment.append(move)
+        if len(segment) <= 1:
+            return segment[0] if segment else None
+        # 剩余手数不可能少于当前最少手数-1，取到即停
+        target = min_play_count(counts) - 1
+        best = None
+        for move in segment:
+            key = _rest_play_count(counts, move[0])
+            if best is None or key < best[0]:
+                best = (key, move)
+                if key <= target:
+                    break
+        return best[1]
+    split = min_play_split(counts)
+    if not split:
+        return None
+    pattern = min(split, key=lambda pattern: (_slot_max(pattern), -play_order_key(judge_rank_counts(pattern))))
+    return pattern, judge_rank_counts(pattern)
+
+def greedy_play(hand, last_play, decompose=False):
+    """贪心出牌（见greedy_move），返回Play，压不住或无牌时过牌"""
+    move = greedy_move(rank_count_vector(hand), last_play, decompose)
+    if move is None:
+        return pass_play()
+    return Play(pattern_to_cards(move[0], hand), *move[1])
+
+# ---------------------- 开局库查询 ----------------------
+def book_call(book, hand):
+    """按开局库决定是否叫地主：没有开局库或库中未收录该手牌时返回None"""
+    if book is None:
+        return None
+    return book.should_call(hand.counts)
+
+def book_opening_play(book, engine, seat):
+    """地主首出查开局库，返回Play；不是首出、没有开局库或未收录时返回None"""
+    if book is None or engine.history or seat != engine.landlord:
+        return None
+    hand = engine.hands[seat]
+    pattern = book.opening_lead(hand.counts)
+    if pattern is None or any(need > have for need, have in zip(pattern, hand.counts)):
+        return None
+    play = classify_play(pattern_to_cards(pattern, hand))
+    if play.type == CARD_TYPE_INVALID:
+        return None
+    return play
+
+# ---------------------- 座位代理 ----------------------
+class Agent:
+    """
+    座位代理接口：引擎轮到该座位时调用。deadline为本次决策的截止时刻（time.perf_counter()），
+    None表示按代理自身的预算；搜索型代理到截止时刻必须返回目前找到的最好决定
+    """
+
+    def bid(self, engine, seat, deadline=None):
+        """是否叫地主"""
+        return False
+
+    def play(self, engine, seat, deadline=None):
+        """返回要出的Play（过牌返回pass_play()）"""
+        return pass_play()
+
+class GreedyAgent(Agent):
+    """默认AI：should_call叫地主 + greedy_play出牌（提供开局库时叫地主与地主首出先查库，decompose见greedy_move）"""
+
+    def __init__(self, book=None, decompose=False):
+        self.book = book
+        self.decompose = decompose
+
+    def bid(self, engine, seat, deadline=None):
+        call = book_call(self.book, engine.hands[seat])
+        return should_call(engine.hands[seat]) if call is None else call
+
+    def play(self, engine, seat, deadline=None):
+        play = book_opening_play(self.book, engine, seat)
+        if play is not None:
+            return play
+        return greedy_play(engine.hands[seat], engine.last_play, self.decompose)
+
+# ---------------------- 对局引擎 ----------------------
+class GameEngine:
+    """
+    斗地主对局状态机：发牌 -> 叫地主 -> 轮流出牌/过牌 -> 胜负判定
+    座位0、1、2依次行动；代理为None的座位由外部（如界面）调用bid/play提交操作
+    """
+
+    def __init__(self, agents=None, rng=None, bid_start=0, latency=None):
+        self.agents = list(agents) if agents is not None else [GreedyAgent() for _ in range(SEAT_COUNT)]
+        self.rng = rng if rng is not None else random.Random()
+        self.bid_start = bid_start
+        self.latency = latency  # 可选的决策耗时直方图（logic_latency.LatencyHistogram），step中记录
+        self.hands = [Hand() for _ in range(SEAT_COUNT)]
+        self.bottom_cards = []
+        self.deck = []
+        self.round_id = 0  # 局号，每次new_round加一（副本沿用，供记牌器识别同一局）
+        self.reset()
+
+    def clone(self):
+        """复制对局状态（手牌、底牌与历史独立，代理与随机数共用），供预计算在副本上走子"""
+        other = GameEngine.__new__(GameEngine)
+        other.__dict__.update(self.__dict__)
+        other.agents = list(self.agents)
+        other.hands = [Hand(hand.card_ids) for hand in self.hands]
+        other.bottom_cards = list(self.bottom_cards)
+        other.deck = list(self.deck)
+        other.history = list(self.history)
+        return other
+
+    def reset(self):
+        """清空对局状态（未发牌）"""
+        for hand in self.hands:
+            hand.clear()
+        self.bottom_cards = []
+        self.deck = []
+        self.deal_index = 0
+        self.phase = PHASE_IDLE
+        self.landlord = -1
+        self.current = self.bid_start
+        self.bids_left = SEAT_COUNT
+        self.last_play = NO_PLAY    # 需要压制的出牌（新一轮为NO_PLAY）
+        self.last_action = NO_PLAY  # 最近一次操作（含过牌）
+        self.pass_count = 0
+        self.winner = -1
+        self.history = []           # [(座位, Play), ...]
+        self.redeals = 0            # run_game中因无人叫地主而重新发牌的次数
+
+    # ---------- 发牌 ----------
+    def new_round(self, deck=None):
+        """开始新一局：deck为None时用引擎随机数洗牌"""
+        self.reset()
+        self.round_id += 1
+        if deck is None:
+            deck = create_deck()
+            self.rng.shuffle(deck)
+        self.deck = list(deck)
+        self.phase = PHASE_DEALING
+
+    def deal_next(self):
+        """发一张牌（轮流发给三个座位，最后3张为底牌），返回（牌, 座位），底牌座位为-1"""
+        card = self.deck[self.deal_index]
+        if self.deal_index < SEAT_COUNT * HAND_SIZE:
+            seat = self.deal_index % SEAT_COUNT
+            self.hands[seat].add(card)
+        else:
+            seat = -1
+            self.bottom_cards.append(card)
+        self.deal_index += 1
+        if self.deal_index == len(self.deck):
+            self.phase = PHASE_BIDDING
+            self.current = self.bid_start
+        return card, seat
+
+    def deal(self, deck=None):
+        """一次性发完整副牌"""
+        self.new_round(deck)
+        while self.phase == PHASE_DEALING:
+            self.deal_next()
+
+    # ---------- 叫地主 ----------
+    def bid(self, seat, call):
+        """座位seat叫/不叫地主；叫则成为地主并获得底牌，三人都不叫则本局作废"""
+        if self.phase != PHASE_BIDDING or seat != self.current:
+            raise ValueError(f"当前不是座位{seat}叫地主")
+        if call:
+            self.landlord = seat
+            self.hands[seat].extend(self.bottom_cards)
+            self.phase = PHASE_PLAYING
+            self.current = seat
+            return
+        self.bids_left -= 1
+        if self.bids_left == 0:
+            self.phase = PHASE_ABANDONED
+        else:
+            self.current = (seat + 1) % SEAT_COUNT
+
+    # ---------- 出牌 ----------
+    def check_play(self, seat, play):
+        """校验出牌是否合法，返回（是否合法, 提示文字）"""
+        if self.phase != PHASE_PLAYING or seat != self.current:
+            return (False, "还没轮到你出牌！")
+        if play.is_pass:
+            if self.last_play.is_lead:
+                return (False, "首轮出牌不能过牌！")
+            return (True, "")
+        hand = self.hands[seat]
+        if len(set(play.cards)) != len(play.cards) or any(card not in hand for card in play.cards):
+            return (False, "所选的牌不在手牌中！")
+        return is_card_able_to_play(play, self.last_play)
+
+    def play(self, seat, play):
+        """座位seat出牌或过牌（play为已判定的Play），返回（是否合法, 提示文字）"""
+        is_able, tip = self.check_play(seat, play)
+        if not is_able:
+            return (is_able, tip)
+        play = play.with_player(seat)
+        self.history.append((seat, play))
+        self.last_action = play
+        if play.is_pass:
+            self.pass_count += 1
+            # 其余两家都过牌，出牌人重新领出
+            if self.pass_count == SEAT_COUNT - 1:
+                self.last_play = NO_PLAY
+                self.pass_count = 0
+        else:
+            self.hands[seat].remove_cards(play.cards)
+            self.last_play = play
+            self.pass_count = 0
+            if not self.hands[seat]:
+                self.winner = seat
+                self.phase = PHASE_OVER
+                return (True, "")
+        self.current = (seat + 1) % SEAT_COUNT
+        return (True, "")
+
+    # ---------- 代理驱动 ----------
+    def step(self, deadline=None):
+        """让当前座位的代理行动一次（deadline为决策截止时刻），返回其决定（叫地主为bool，出牌为Play）"""
+        seat = self.current
+        agent = self.agents[seat]
+        if agent is None:
+            raise RuntimeError(f"座位{seat}没有代理，需由外部提交操作")
+        start = time.perf_counter()
+        hand_size = len(self.hands[seat])
+        if self.phase == PHASE_BIDDING:
+            call = bool(agent.bid(self, seat, deadline))
+            if self.latency is not None:
+                self.latency.record(PHASE_BIDDING, hand_size, time.perf_counter() - start)
+            self.bid(seat, call)
+            return call
+        if self.phase == PHASE_PLAYING:
+            play = agent.play(self, seat, deadline)
+            if self.latency is not None:
+                self.latency.record(PHASE_PLAYING, hand_size, time.perf_counter() - start)
+            is_able, tip = self.play(seat, play)
+            if not is_able:
+                raise ValueError(f"座位{seat}的代理出牌不合法：{tip}")
+            return play
+        raise RuntimeError(f"当前阶段（{self.phase}）无需行动")
+
+    def run_game(self, deck=None, max_redeals=100):
+        """全部由代理完成一局（无人叫地主则重新发牌，次数记入self.redeals），返回获胜座位"""
+        for redeals in range(max_redeals + 1):
+            self.deal(deck)
+            while self.phase == PHASE_BIDDING:
+                self.step()
+            if self.phase == PHASE_PLAYING:
+                break
+            deck = None
+        else:
+            raise RuntimeError("连续多次无人叫地主")
+        self.redeals = redeals
+        while self.phase == PHASE_PLAYING:
+            self.step()
+        return self.winner
+
+    # ---------- 规范键 ----------
+    def canonical_key(self):
+        """
+        对局状态的规范键（与花色无关）：(三家手牌规范键, 当前座位, 需压制的（牌型, 优先级, 数量）或None, 连续过牌数, 地主座位)
+        """
+        last = None if self.last_play.is_lead else (self.last_play.type, self.last_play.priority, self.last_play.count)
+        return (tuple(tuple(hand.counts) for hand in self.hands), self.current, last, self.pass_count, self.landlord)
+
+    # ---------- 胜负 ----------
+    @property
+    def is_over(self):
+        return self.phase == PHASE_OVER
+
+    @property
+    def landlord_won(self):
+        """地主是否获胜（对局结束后有效）"""
+        return self.winner == self.landlord
+
+    def seat_won(self, seat):
+        """座位seat所在一方是否获胜（农民一方共同胜负）"""
+        if self.winner < 0:
+            return False
+        return (seat == self.landlord) == self.landlord_won
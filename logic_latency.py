@@ -0,0 +1,115 @@
+# logic_latency.py
+"""AI决策耗时统计（无Pygame依赖）：按对局阶段与手牌张数分组的对数分桶直方图，可合并、可导出JSON"""
+import json
+import math
+import threading
+import time
+
+# ---------------------- 分桶 ----------------------
+LATENCY_BASE = 1e-6          # 第0个桶的上界（秒）
+LATENCY_GROWTH = 2 ** 0.25   # 相邻桶上界之比（相对误差约19%）
+LATENCY_BUCKETS = 112        # 桶数（最后一个桶上界约4分钟）
+LATENCY_PERCENTILES = (50, 95, 99)
+
+def bucket_index(seconds):
+    """耗时所在的桶序号"""
+    if seconds <= LATENCY_BASE:
+        return 0
+    index = math.ceil(math.log(seconds / LATENCY_BASE, LATENCY_GROWTH))
+    return min(index, LATENCY_BUCKETS - 1)
+
+def bucket_bound(index):
+    """桶的上界（秒）"""
+    return LATENCY_BASE * LATENCY_GROWTH ** index
+
+# ---------------------- 直方图 ----------------------
+class LatencyHistogram:
+    """
+    决策耗时直方图：键为（阶段, 手牌张数），每个键保存各桶计数、总次数、总耗时和最大值；
+    分位数取所在桶的上界（不超过最大值）。线程安全，可在Future完成回调中记录
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {}  # (阶段, 手牌张数) -> [桶计数列表, 次数, 总耗时, 最大值]
+
+    def __getstate__(self):
+        # 锁不能跨进程传递，模拟器各进程的直方图只传数据
+        return {"series": self._series}
+
+    def __setstate__(self, state):
+        self._lock = threading.Lock()
+        self._series = state["series"]
+
+    def record(self, phase, hand_size, seconds):
+        with self._lock:
+            series = self._series.get((phase, hand_size))
+            if series is None:
+                series = self._series[(phase, hand_size)] = [[0] * LATENCY_BUCKETS, 0, 0.0, 0.0]
+            series[0][bucket_index(seconds)] += 1
+            series[1] += 1
+            series[2] += seconds
+            series[3] = max(series[3], seconds)
+
+    def track(self, future, phase, hand_size):
+        """从现在起到future完成的耗时记入直方图（已完成的future立即记录）"""
+        start = time.perf_counter()
+        future.add_done_callback(lambda _: self.record(phase, hand_size, time.perf_counter() - start))
+
+    def merge(self, other):
+        with self._lock:
+            for key, (counts, total, elapsed, longest) in other._series.items():
+                series = self._series.get(key)
+                if series is None:
+                    self._series[key] = [counts.copy(), total, elapsed, longest]
+                    continue
+                series[0] = [mine + theirs for mine, theirs in zip(series[0], counts)]
+                series[1] += total
+                series[2] += elapsed
+                series[3] = max(series[3], longest)
+        return self
+
+    def summary(self):
+        """
+        各分组与各阶段合计的统计（秒）
+        :return: {"阶段/张数" 或 "阶段/all": {"count", "mean", "p50", "p95", "p99", "max"}}，按阶段、张数排序
+        """
+        with self._lock:
+            series = {key: (counts.copy(), total, elapsed, longest)
+                      for key, (counts, total, elapsed, longest) in self._series.items()}
+        merged = {}
+        for (phase, hand_size), (counts, total, elapsed, longest) in series.items():
+            if phase not in merged:
+                merged[phase] = ([0] * LATENCY_BUCKETS, 0, 0.0, 0.0)
+            all_counts, all_total, all_elapsed, all_longest = merged[phase]
+            merged[phase] = ([a + b for a, b in zip(all_counts, counts)], all_total + total,
+                             all_elapsed + elapsed, max(all_longest, longest))
+        result = {}
+        for phase in sorted(merged):
+            for key in sorted(key for key in series if key[0] == phase):
+                result[f"{phase}/{key[1]}"] = _describe(*series[key])
+            result[f"{phase}/all"] = _describe(*merged[phase])
+        return result
+
+    def to_json(self, indent=2):
+        return json.dumps(self.summary(), ensure_ascii=False, indent=indent)
+
+    def dump(self, path):
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(self.to_json())
+
+def _describe(counts, total, elapsed, longest):
+    stats = {"count": total, "mean": elapsed / total if total else 0.0}
+    for percentile in LATENCY_PERCENTILES:
+        stats[f"p{percentile}"] = _percentile(counts, total, longest, percentile)
+    stats["max"] = longest
+    return stats
+
+def _percentile(counts, total, longest, percentile):
+    rank = math.ceil(total * percentile / 100)
+    seen = 0
+    for index, count in enumerate(counts):
+        seen += count
+        if seen >= rank and count:
+            return min(bucket_bound(index), longest)
+    return longest
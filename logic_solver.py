@@ -0,0 +1,223 @@
+# logic_solver.py
+"""斗地主残局求解（无Pygame依赖）：三家手牌公开时的完全信息博弈搜索，Zobrist哈希置换表"""
+import random
+from functools import lru_cache
+from logic_card import *
+
+SOLVER_SEATS = 3
+DEFAULT_TABLE_BITS = 18       # 置换表2^18个槽位
+DEFAULT_ENDGAME_CARDS = 20    # 三家合计不超过该张数时切换到残局求解
+
+# ---------------------- Zobrist随机数 ----------------------
+_ZOBRIST_RNG = random.Random(0x5EED)
+# 每个座位、每个点数槽位、每种张数一个随机数
+_ZOBRIST_HAND = [[[_ZOBRIST_RNG.getrandbits(64) for _ in range(5)] for _ in range(RANK_SLOT_COUNT)]
+                 for _ in range(SOLVER_SEATS)]
+_ZOBRIST_SEAT = [_ZOBRIST_RNG.getrandbits(64) for _ in range(SOLVER_SEATS)]
+# 同一局面地主不同结论不同（同一求解器跨局复用置换表）
+_ZOBRIST_LANDLORD = [_ZOBRIST_RNG.getrandbits(64) for _ in range(SOLVER_SEATS)]
+_ZOBRIST_LAST = {}  # (需压制的出牌, 连续过牌数) -> 随机数，按需生成
+
+def _last_key(last, pass_count):
+    key = (last, pass_count)
+    value = _ZOBRIST_LAST.get(key)
+    if value is None:
+        value = _ZOBRIST_LAST[key] = _ZOBRIST_RNG.getrandbits(64)
+    return value
+
+def hand_hash(hands):
+    """三家手牌的Zobrist哈希"""
+    value = 0
+    for seat, counts in enumerate(hands):
+        for slot, count in enumerate(counts):
+            value ^= _ZOBRIST_HAND[seat][slot][count]
+    return value
+
+# ---------------------- 着法生成（按规范键缓存）----------------------
+# 着法 = (出牌模式, （牌型, 优先级, 数量）, 出牌后的点数张数, 三个座位的哈希增量, 出牌后剩余张数)
+def _expand(counts, moves):
+    expanded = []
+    for pattern, result in moves:
+        after = tuple(have - used for have, used in zip(counts, pattern))
+        deltas = tuple(_xor_delta(_ZOBRIST_HAND[seat], counts, after) for seat in range(SOLVER_SEATS))
+        expanded.append((pattern, result, after, deltas, sum(after)))
+    return tuple(expanded)
+
+def _xor_delta(zobrist, before, after):
+    delta = 0
+    for slot, (old, new) in enumerate(zip(before, after)):
+        if old != new:
+            delta ^= zobrist[slot][old] ^ zobrist[slot][new]
+    return delta
+
+@lru_cache(maxsize=1 << 16)
+def _lead_moves(counts):
+    """首出的全部着法，出牌张数多的在前（更快走完手牌）"""
+    moves = _expand(counts, moves_for_key(counts))
+    return tuple(sorted(moves, key=lambda move: (sum(1 for count in move[2] if count), move[4])))
+
+@lru_cache(maxsize=1 << 16)
+def _beating_moves(counts, last):
+    """能压制last（牌型, 优先级, 数量）的全部着法：同牌型 -> 炸弹 -> 王炸"""
+    last_type, last_priority, last_count = last
+    if last_type == CARD_TYPE_JOKER_BOMB:
+        return ()
+    if last_type == CARD_TYPE_BOMB:
+        moves = list(iter_moves_of_type(counts, CARD_TYPE_BOMB, above=last_priority))
+    else:
+        moves = list(iter_moves_of_type(counts, last_type, last_count, last_priority))
+        moves.extend(iter_moves_of_type(counts, CARD_TYPE_BOMB))
+    moves.extend(iter_moves_of_type(counts, CARD_TYPE_JOKER_BOMB))
+    return _expand(counts, moves)
+
+@lru_cache(maxsize=1 << 16)
+def _finish_results(counts):
+    """静态判胜用：(整手牌一次出完的牌型结果或None, 出牌后剩余牌能一次出完的首出牌型结果)"""
+    whole = judge_rank_counts(counts)
+    whole = None if whole[0] == CARD_TYPE_INVALID else whole
+    two_step = tuple(move[1] for move in _lead_moves(counts)
+                     if move[4] and judge_rank_counts(move[2])[0] != CARD_TYPE_INVALID)
+    return whole, two_step
+
+def can_beat(result, last):
+    """（牌型, 优先级, 数量）能否压制last（同is_card_able_to_play的压制规则）"""
+    card_type, priority, count = result
+    last_type, last_priority, last_count = last
+    if card_type == CARD_TYPE_JOKER_BOMB:
+        return True
+    if last_type == CARD_TYPE_JOKER_BOMB:
+        return False
+    if card_type == CARD_TYPE_BOMB:
+        return last_type != CARD_TYPE_BOMB or priority > last_priority
+    return card_type == last_type and count == last_count and priority > last_priority
+
+# ---------------------- 残局求解器 ----------------------
+class _SearchAborted(Exception):
+    """超出节点预算，中止本次搜索"""
+
+class EndgameSolver:
+    """
+    地主 vs 农民的胜负搜索（结果只有胜/负，找到获胜着法即剪枝），
+    局面以Zobrist哈希为键存入固定大小的置换表，槽位冲突时新局面直接覆盖旧局面
+    """
+
+    def __init__(self, table_bits=DEFAULT_TABLE_BITS):
+        self._table_mask = (1 << table_bits) - 1
+        self._table = [None] * (1 << table_bits)
+        self.nodes = 0
+        self.hits = 0
+        self._landlord = 0
+        self._node_limit = None
+
+    def clear(self):
+        self._table = [None] * len(self._table)
+
+    def solve(self, hands, current, last=None, pass_count=0, landlord=0, max_nodes=None):
+        """
+        求解局面：返回地主一方是否必胜，超过max_nodes个搜索节点时放弃并返回None
+        :param hands: 三家15槽位点数张数
+        :param current: 当前行动座位
+        :param last: 需压制的（牌型, 优先级, 数量），首出为None
+        :param pass_count: last之后已连续过牌的人数
+        """
+        return self.solve_move(hands, current, False, last, pass_count, landlord, max_nodes)
+
+    def solve_move(self, hands, current, move, last=None, pass_count=0, landlord=0, max_nodes=None):
+        """
+        当前座位走move之后地主一方是否必胜（move为（出牌模式, 牌型结果），None为过牌，False为不指定着法）
+        超过max_nodes个搜索节点时返回None（已完成的子局面仍保留在置换表中）
+        """
+        self._landlord = landlord
+        self._node_limit = self.nodes + max_nodes if max_nodes is not None else None
+        hands = [tuple(counts) for counts in hands]
+        key = hand_hash(hands)
+        try:
+            if move is False:
+                return self._search(hands, current, last, pass_count, key)
+            if move is None:
+                return self._pass(hands, current, last, pass_count, key)
+            expanded = _expand(hands[current], (move,))[0]
+            return self._play(hands, current, expanded, key)
+        except _SearchAborted:
+            return None
+
+    def winning_moves(self, hands, current, last=None, pass_count=0, landlord=0):
+        """
+        当前座位的各着法是否能让己方获胜
+        :return: [(出牌模式或None表示过牌, （牌型, 优先级, 数量）或None, 是否获胜), ...]
+        """
+        mover_is_landlord = current == landlord
+        counts = tuple(hands[current])
+        moves = _lead_moves(counts) if last is None else _beating_moves(counts, last)
+        moves = [move[:2] for move in moves]
+        if last is not None:
+            moves.append(None)
+        results = []
+        for move in moves:
+            landlord_won = self.solve_move(hands, current, move, last, pass_count, landlord)
+            pattern, result = move if move is not None else (None, None)
+            results.append((pattern, result, landlord_won == mover_is_landlord))
+        return results
+
+    def _play(self, hands, seat, move, hand_key):
+        """走一步后继续搜索，返回地主是否获胜（hands原样恢复）"""
+        if not move[4]:
+            return seat == self._landlord
+        before = hands[seat]
+        hands[seat] = move[2]
+        value = self._search(hands, (seat + 1) % SOLVER_SEATS, move[1], 0, hand_key ^ move[3][seat])
+        hands[seat] = before
+        return value
+
+    def _pass(self, hands, seat, last, pass_count, hand_key):
+        pass_count += 1
+        if pass_count == SOLVER_SEATS - 1:
+            last = None
+            pass_count = 0
+        return self._search(hands, (seat + 1) % SOLVER_SEATS, last, pass_count, hand_key)
+
+    def _quick_win(self, hands, current, last):
+        """静态判胜：能一手出完；或首出时有一手对手都压不住的牌，剩下的牌又能一手出完"""
+        whole, two_step = _finish_results(hands[current])
+        if whole is not None and (last is None or can_beat(whole, last)):
+            return True
+        if last is None and two_step:
+            landlord = self._landlord
+            opponents = [hands[seat] for seat in range(SOLVER_SEATS)
+                         if seat != current and (seat == landlord) != (current == landlord)]
+            for result in two_step:
+                if not any(_beating_moves(other, result) for other in opponents):
+                    return True
+        return False
+
+    def _search(self, hands, current, last, pass_count, hand_key):
+        key = hand_key ^ _ZOBRIST_SEAT[current] ^ _ZOBRIST_LANDLORD[self._landlord] ^ _last_key(last, pass_count)
+        index = key & self._table_mask
+        entry = self._table[index]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry[1]
+        self.nodes += 1
+        if self._node_limit is not None and self.nodes > self._node_limit:
+            raise _SearchAborted
+        landlord = self._landlord
+        maximizing = current == landlord
+        value = not maximizing
+        # 跟队友的牌时先尝试过牌
+        teammate_led = last is not None and not maximizing and (current - 1 - pass_count) % SOLVER_SEATS != landlord
+        if teammate_led and self._pass(hands, current, last, pass_count, hand_key) == maximizing:
+            value = maximizing
+        elif self._quick_win(hands, current, last):
+            value = maximizing
+        else:
+            counts = hands[current]
+            moves = _lead_moves(counts) if last is None else _beating_moves(counts, last)
+            for move in moves:
+                if self._play(hands, current, move, hand_key) == maximizing:
+                    value = maximizing
+                    break
+            else:
+                if last is not None and not teammate_led:
+                    value = self._pass(hands, current, last, pass_count, hand_key)
+        self._table[index] = (key, value)
+        return value
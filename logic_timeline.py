@@ -0,0 +1,185 @@
+# logic_timeline.py
+"""动画时间线（无Pygame依赖）：由主循环每帧推进的补间与生成器脚本，动画播完后经回调或脚本继续游戏流程，不阻塞主循环"""
+import time
+
+TIMELINE_MAX_PASSES = 64  # 单次推进中连锁完成（脚本接连等待已到期的时间）的最多轮数
+
+# ---------------------- 缓动函数 ----------------------
+def linear(t):
+    return t
+
+def ease_in_out(t):
+    """平滑起止（smoothstep）"""
+    return t * t * (3 - 2 * t)
+
+def ease_out(t):
+    """先快后慢（二次）"""
+    return 1 - (1 - t) * (1 - t)
+
+# ---------------------- 补间 ----------------------
+class Tween:
+    """
+    在[start, start + duration]内把进度从0推进到1：每次推进以（缓动后的进度, 原始进度）调用update，
+    到达终点后依次调用then登记的回调；没有update的补间就是单纯的定时等待
+    """
+
+    def __init__(self, start, duration, update=None, easing=linear):
+        self.start = start
+        self.duration = duration
+        self.update = update
+        self.easing = easing
+        self.progress = 0.0
+        self.finished = False
+        self.cancelled = False
+        self._callbacks = []
+
+    @property
+    def end(self):
+        return self.start + self.duration
+
+    def then(self, callback):
+        """结束后调用callback()（已结束则立即调用）"""
+        if self.finished:
+            callback()
+        else:
+            self._callbacks.append(callback)
+        return self
+
+    def cancel(self):
+        """取消补间，不再调用update与回调"""
+        self.cancelled = True
+        self._callbacks.clear()
+
+    def advance(self, now):
+        """推进到now时刻，返回是否已结束"""
+        if self.cancelled or self.finished:
+            return True
+        if self.duration <= 0:
+            progress = 1.0
+        else:
+            progress = min(max((now - self.start) / self.duration, 0.0), 1.0)
+        self.progress = progress
+        if self.update is not None:
+            self.update(self.easing(progress), progress)
+        if progress < 1.0:
+            return False
+        self.finished = True
+        callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+        return True
+
+# ---------------------- 脚本 ----------------------
+class Script:
+    """
+    生成器脚本（按顺序书写的动画流程）：yield补间表示等它播完，yield秒数表示等待；
+    等待从上一段的终点起算（帧率低时不累积误差，落后时在同一帧内追上），生成器结束后调用then登记的回调
+    """
+
+    def __init__(self, timeline, generator):
+        self.timeline = timeline
+        self.finished = False
+        self.cancelled = False
+        self._generator = generator
+        self._waiting = None
+        self._time = timeline.clock()
+        self._callbacks = []
+
+    def then(self, callback):
+        if self.finished:
+            callback()
+        else:
+            self._callbacks.append(callback)
+        return self
+
+    def cancel(self):
+        """中止脚本（当前等待的补间一并取消）"""
+        if self.finished or self.cancelled:
+            return
+        self.cancelled = True
+        self._callbacks.clear()
+        if self._waiting is not None:
+            self._waiting.cancel()
+        self._generator.close()
+
+    def resume(self):
+        """执行脚本到下一个yield（由等待的补间结束时调用）"""
+        if self.cancelled:
+            return
+        if self._waiting is not None:
+            self._time = self._waiting.end
+        try:
+            step = next(self._generator)
+        except StopIteration:
+            self.finished = True
+            self._waiting = None
+            callbacks, self._callbacks = self._callbacks, []
+            for callback in callbacks:
+                callback()
+            return
+        if isinstance(step, Tween):
+            self._waiting = step
+        else:
+            self._waiting = self.timeline.add(Tween(self._time, step))
+        self._waiting.then(self.resume)
+
+# ---------------------- 时间线 ----------------------
+class Timeline:
+    """补间与脚本的调度器：主循环每帧调用update推进，回调中登记的新补间若已到期在同一次推进中继续完成"""
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.now = clock()
+        self._tweens = []
+
+    def add(self, tween):
+        self._tweens.append(tween)
+        return tween
+
+    def tween(self, duration, update=None, easing=linear, delay=0.0):
+        """登记从现在（加delay）起duration秒的补间"""
+        return self.add(Tween(self.clock() + delay, duration, update, easing))
+
+    def wait(self, seconds):
+        """登记seconds秒后结束的定时等待"""
+        return self.tween(seconds)
+
+    def spawn(self, generator):
+        """启动生成器脚本（立即执行到第一个yield），返回Script"""
+        script = Script(self, generator)
+        script.resume()
+        return script
+
+    def update(self, now=None):
+        """推进全部补间到now（默认当前时刻），移除已结束与已取消的"""
+        self.now = self.clock() if now is None else now
+        running = []
+        pending = self._tweens
+        for _ in range(TIMELINE_MAX_PASSES):
+            self._tweens = []
+            running += [tween for tween in pending if not tween.advance(self.now)]
+            # 回调中新登记的补间在下一轮推进（已到期的在本次update内完成）
+            pending = self._tweens
+            if not pending:
+                break
+        self._tweens = running + pending
+
+    def cancel_all(self):
+        for tween in self._tweens:
+            tween.cancel()
+        self._tweens = []
+
+    @property
+    def active(self):
+        """是否还有未结束的补间"""
+        return any(not tween.cancelled for tween in self._tweens)
+
+    @property
+    def frame_needed(self):
+        """是否有需要逐帧刷新画面的补间（纯定时等待不需要）"""
+        return any(tween.update is not None and not tween.cancelled for tween in self._tweens)
+
+    def next_due(self):
+        """未结束补间中最早的终点时刻，没有则返回None"""
+        ends = [tween.end for tween in self._tweens if not tween.cancelled]
+        return min(ends) if ends else None
@@ -0,0 +1,216 @@
+# logic_tracker.py
+"""斗地主记牌（无Pygame依赖）：位掩码记录已出的牌、由过牌推断的缺牌，并按这些约束快速采样其余两家手牌"""
+import random
+from math import comb
+from logic_card import *
+
+TRACKER_SEATS = 3
+_RANK_ALL = (1 << RANK_SLOT_COUNT) - 1
+_RANK_NORMAL = (1 << 13) - 1   # 3..2，不含大小王
+_COUNTS_ANY = (1 << 5) - 1     # 张数掩码：0~4张都可能
+
+# 过牌推断：不压该牌型时，点数高于被压牌的每个点数（不含大小王）最多持有几张；
+# 炸弹、王炸都可能被保留，不压炸弹之外的牌型时仍可能持有4张，大小王不作推断
+_PASS_LIMIT = {
+    CARD_TYPE_SINGLE: 0,
+    CARD_TYPE_PAIR: 1,
+    CARD_TYPE_TRIPLE: 2,
+    CARD_TYPE_TRIPLE_ONE: 2,
+    CARD_TYPE_TRIPLE_PAIR: 2,
+    CARD_TYPE_BOMB: 3,
+}
+
+def ranks_above(priority):
+    """优先级高于priority的点数槽位位掩码"""
+    return _RANK_ALL & ~((1 << max(priority - 2, 0)) - 1)
+
+# ---------------------- 记牌器 ----------------------
+class CardTracker:
+    """
+    按对局历史增量记牌：played/played_by为已出牌的54位掩码，
+    limits[座位][k]为15位点数掩码，置位的点数该座位最多持有k张（k=0即缺牌），但仍可能保留着炸弹；
+    no_bombs[座位]为不可能持有炸弹的点数掩码（不压炸弹时推断）
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.played = 0
+        self.played_by = [0] * TRACKER_SEATS
+        self.limits = [[0] * 4 for _ in range(TRACKER_SEATS)]
+        self.no_bombs = [0] * TRACKER_SEATS
+        self.landlord = -1
+        self._round = None
+        self._seen = 0
+        self._seen_entry = None  # 已读入的最后一条历史（判断局面副本的历史是否在此后分叉）
+        self._last = None        # 本轮需压制的出牌
+        self._last_seat = -1
+        self._pass_count = 0
+
+    def sync(self, engine):
+        """
+        读入引擎历史中新增的出牌/过牌：按局号识别同一局（局面副本的历史与原局共用条目，不必重读），
+        新的一局或历史与已读入的不一致（如预计算的另一分支）时重置
+        """
+        history = engine.history
+        seen = self._seen
+        if (engine.round_id != self._round or len(history) < seen
+                or (seen and history[seen - 1] is not self._seen_entry)):
+            self.reset()
+            self._round = engine.round_id
+        self.landlord = engine.landlord
+        for seat, play in history[self._seen:]:
+            self.observe(seat, play)
+        self._seen = len(history)
+        self._seen_entry = history[-1] if history else None
+
+    def observe(self, seat, play):
+        """记录一次出牌或过牌"""
+        if play.is_pass:
+            if self._last is not None:
+                self._infer_pass(seat)
+            self._pass_count += 1
+            if self._pass_count == TRACKER_SEATS - 1:
+                self._last = None
+                self._pass_count = 0
+            return
+        mask = cards_to_mask(play.cards)
+        self.played |= mask
+        self.played_by[seat] |= mask
+        # 打出的张数超过推断上限，说明当时是主动不压，撤销相应的推断
+        limits = self.limits[seat]
+        for slot, count in enumerate(rank_count_vector(mask)):
+            for level in range(min(count, 4)):
+                limits[level] &= ~(1 << slot)
+            if count == 4:
+                self.no_bombs[seat] &= ~(1 << slot)
+        self._last = play
+        self._last_seat = seat
+        self._pass_count = 0
+
+    def _infer_pass(self, seat):
+        level = _PASS_LIMIT.get(self._last.type)
+        if level is None:
+            return
+        landlord = self.landlord
+        if landlord >= 0 and seat != landlord and self._last_seat != landlord:
+            return  # 农民不压队友，不说明缺牌
+        ranks = ranks_above(self._last.priority) & _RANK_NORMAL
+        self.limits[seat][level] |= ranks
+        if self._last.type == CARD_TYPE_BOMB:
+            self.no_bombs[seat] |= ranks
+
+    def allowed_counts(self, seat):
+        """座位seat每个点数可能持有的张数（15槽位，每槽位为张数掩码，第k位置位表示可能持有k张）"""
+        caps = [4] * RANK_SLOT_COUNT
+        for level in range(3, -1, -1):
+            ranks = self.limits[seat][level]
+            while ranks:
+                low_bit = ranks & -ranks
+                caps[low_bit.bit_length() - 1] = level
+                ranks ^= low_bit
+        no_bombs = self.no_bombs[seat]
+        allowed = []
+        for slot, cap in enumerate(caps):
+            counts = (1 << (cap + 1)) - 1
+            if not no_bombs >> slot & 1:
+                counts |= 1 << 4  # 仍可能保留着炸弹
+            allowed.append(counts)
+        return allowed
+
+    def unseen_mask(self, own_mask):
+        """手牌为own_mask的座位看不到的牌（未出且不在自己手中）"""
+        return FULL_DECK_MASK & ~self.played & ~own_mask
+
+    def sampler(self, engine, seat, use_limits=True):
+        """
+        座位seat视角的其余两家手牌采样器（先sync到引擎当前局面）；
+        地主尚未打出的底牌固定在地主手中，use_limits为False时忽略过牌推断
+        """
+        self.sync(engine)
+        unseen = self.unseen_mask(engine.hands[seat].mask)
+        landlord = engine.landlord
+        forced = 0
+        if seat != landlord and landlord >= 0:
+            forced = cards_to_mask(engine.bottom_cards) & ~self.played_by[landlord]
+            unseen &= ~forced
+        others = []
+        for other in range(TRACKER_SEATS):
+            if other == seat:
+                continue
+            base = rank_count_vector(forced) if other == landlord else [0] * RANK_SLOT_COUNT
+            allowed = self.allowed_counts(other) if use_limits else [_COUNTS_ANY] * RANK_SLOT_COUNT
+            allowed = [counts >> have for counts, have in zip(allowed, base)]
+            others.append((other, len(engine.hands[other]) - sum(base), base, allowed))
+        sampler = HiddenHandSampler(seat, engine.hands[seat].counts, rank_count_vector(unseen), others)
+        if not sampler.total and use_limits:
+            # 推断互相矛盾（对手主动不压），退回只按张数约束采样
+            return self.sampler(engine, seat, use_limits=False)
+        return sampler
+
+# ---------------------- 约束采样 ----------------------
+class HiddenHandSampler:
+    """
+    把未知牌分给两家的均匀采样（每种具体的牌面分配等概率）：
+    构造时按点数槽位从后往前统计满足张数与上限约束的分法数，
+    每次采样只取一个随机整数，逐槽位按分法数解码出各家张数，不洗牌、不建中间列表
+    """
+
+    def __init__(self, seat, own_counts, unknown, others):
+        """
+        :param unknown: 两家合计的未知牌点数张数
+        :param others: [(座位, 需补的张数, 已确定的点数张数, 每个点数可再补张数的掩码), ...]（两家）
+        """
+        (self.first, need, self.first_base, first_allowed), (self.second, _, self.second_base, second_allowed) = others
+        self.seat = seat
+        self.own = list(own_counts)
+        self.need = need
+        # 只保留有未知牌的槽位：(槽位, 张数, [(给第一家的张数, 组合数), ...])
+        slots = []
+        for slot, count in enumerate(unknown):
+            if count:
+                first_counts, second_counts = first_allowed[slot], second_allowed[slot]
+                slots.append((slot, count, [(take, comb(count, take)) for take in range(count + 1)
+                                            if first_counts >> take & 1 and second_counts >> (count - take) & 1]))
+        self._slots = slots
+        # ways[i][s]：第i个槽位起给第一家恰好s张的分法数
+        ways = [[0] * (need + 1) for _ in range(len(slots) + 1)]
+        if need >= 0:
+            ways[len(slots)][0] = 1
+        for index in range(len(slots) - 1, -1, -1):
+            row, after = ways[index], ways[index + 1]
+            for take, weight in slots[index][2]:
+                for rest in range(need - take + 1):
+                    if after[rest]:
+                        row[rest + take] += weight * after[rest]
+        self._ways = ways
+        self.total = ways[0][need] if need >= 0 else 0
+
+    def sample(self, rng=None):
+        """返回三家点数张数列表（新列表，可直接交给推演修改）"""
+        rng = rng or random
+        x = rng.randrange(self.total)
+        first = self.first_base.copy()
+        second = self.second_base.copy()
+        left = self.need
+        ways = self._ways
+        for index, (slot, count, options) in enumerate(self._slots):
+            after = ways[index + 1]
+            for take, weight in options:
+                if take > left:
+                    break
+                block = after[left - take]
+                span = weight * block
+                if x < span:
+                    x %= block
+                    first[slot] += take
+                    second[slot] += count - take
+                    left -= take
+                    break
+                x -= span
+        hands = [None] * TRACKER_SEATS
+        hands[self.seat] = self.own.copy()
+        hands[self.first] = first
+        hands[self.second] = second
+        return hands
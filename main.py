@@ -6,7 +6,14 @@ import time
 import math
 import json
 import os
+import multiprocessing
+from collections import OrderedDict
 from logic_card import *
+from logic_game import *
+from logic_ai import make_agent, BidEstimator, SpeculativePlanner, AIWorker
+from logic_latency import LatencyHistogram
+from logic_timeline import Timeline, ease_in_out, ease_out
+from opening_book import OpeningBook, OPENING_BOOK_FILE
 import sys
 
 # ---------------------- 统计数据文件路径 ----------------------
@@ -19,6 +26,7 @@ except ImportError:
     DATA_DIR = os.path.join(os.path.expanduser("~"), "card")
 
 DATA_FILE = os.path.join(DATA_DIR, "data.json")
+LATENCY_FILE = os.path.join(DATA_DIR, "latency.json")  # AI决策耗时统计（退出时导出）
 # 获取可执行文件所在目录
 EXE_DIR = os.path.dirname(sys.executable)
 RELEASE = '__compiled__' in globals()
@@ -33,6 +41,8 @@ def file_path(filename):
 WINDOW_WIDTH = 1200
 WINDOW_HEIGHT = 800
 FPS = 60
+IDLE_MAX_WAIT = 500  # 画面静止时单次阻塞等待事件的最长时间（毫秒）
+WAKE_EVENT = pygame.event.custom_type()  # 后台线程（AI决策完成）唤醒主循环的事件
 HALF_W = WINDOW_WIDTH // 2
 HALF_H = WINDOW_HEIGHT // 2
 
@@ -59,6 +69,8 @@ CARD_SELECT_OFFSET = -15  # 选中卡牌向上偏移
 CARD_SELECT_SCALE = 1.05  # 选中卡牌缩放比例
 CARD_ROUND_RADIUS = 8     # 卡牌圆角半径
 CARD_SHADOW_OFFSET = (2, 2)  # 卡牌阴影偏移
+CARD_SPRITE_CACHE_SIZE = 256  # 卡牌图缓存的张数上限（尺寸变化后旧尺寸按最久未用淘汰）
+TEXT_CACHE_BUDGET = 8 * 1024 * 1024  # 文字图缓存的像素内存上限（字节）
 
 # 按钮常量（美化升级：圆角按钮、悬停色）
 BUTTON_WIDTH = 120
@@ -72,12 +84,22 @@ BUTTON_RED = (180, 0, 0)
 BUTTON_RED_HOVER = (220, 0, 0)
 
 # 动画常量
-SHUFFLE_SPEED = 0.03    # 洗牌动画速度
-DEAL_SPEED = 0.05       # 发牌动画速度
+SHUFFLE_SPEED = 0.03    # 洗牌动画每帧牌堆偏移的衰减
+SHUFFLE_FRAMES = 60     # 洗牌动画的帧数（按进度插值，与实际帧率无关）
+SHUFFLE_TIME = 1.0      # 洗牌动画时长（秒）
+DEAL_NOTICE_TIME = 0.5  # 发牌前提示的显示时长（秒）
+DEAL_INTERVAL = 0.025   # 发牌动画每张牌的间隔（秒）
 PLAY_CARD_SPEED = 0.02  # 出牌动画速度
 TIP_FADE_SPEED = 5      # 提示文字淡入淡出速度
-LANDLORD_CARD_SPEED = 0.03  # 底牌并入动画速度
-SORT_CARD_SPEED = 0.02      # 手牌整理动画速度
+LANDLORD_CARD_TIME = 0.5    # 底牌并入动画时长（秒）
+SORT_CARD_TIME = 0.6        # 手牌整理动画时长（秒）
+
+# AI常量
+AI_LEVEL = "normal"         # AI难度等级（见logic_ai.AI_LEVELS，每步的时间/节点预算），思考时间计入出牌后的停顿
+AI_PLAY_DELAY = 1.0         # AI出牌停顿总时长（秒）
+AI_NOTICE_TIME = 2.0        # AI操作提示的显示时长（秒）
+AI_BID_BUDGET = 0.3         # AI叫地主估计胜率的推演时间（秒）
+AI_BID_JOBS = max(1, (os.cpu_count() or 1) - 1)  # 叫地主推演的进程数（留一个核给界面）
 
 # ---------------------- 工具函数（动画+绘制美化）----------------------
 def draw_rounded_rect(surface, color, rect, radius):
@@ -92,15 +114,102 @@ def draw_rounded_rect(surface, color, rect, radius):
     pygame.draw.circle(surface, color, (x + radius, y + h - radius), radius)
     pygame.draw.circle(surface, color, (x + w - radius, y + h - radius), radius)
 
+class TextCache:
+    """
+    文字图缓存：按（文字, 字体, 颜色, 阴影颜色, 阴影偏移）缓存渲染好的文字图（已convert_alpha），
+    超出像素内存预算时淘汰最久未用的；中文字形光栅化很慢，静态标签只渲染一次，数值类文字在值变化时才重新渲染。
+    带阴影的文字图以预乘alpha合成（与先画阴影再画文字的效果一致），须用blit方法以BLEND_PREMULTIPLIED绘制
+    """
+
+    def __init__(self, budget=TEXT_CACHE_BUDGET):
+        self.budget = budget
+        self.used = 0  # 已缓存文字图占用的字节数
+        self._surfaces = OrderedDict()
+
+    def render(self, font, text, color, shadow_color=None, shadow_offset=1):
+        """取文字图（shadow_color为None时不带阴影，可直接blit；带阴影时图的左上角即文字左上角）"""
+        key = (text, font, color, shadow_color, shadow_offset)
+        surf = self._surfaces.get(key)
+        if surf is not None:
+            self._surfaces.move_to_end(key)
+            return surf
+        
+        main_surf = font.render(text, True, color)
+        if shadow_color is None:
+            surf = main_surf.convert_alpha()
+        else:
+            width, height = main_surf.get_size()
+            surf = pygame.Surface((width + shadow_offset, height + shadow_offset), pygame.SRCALPHA).convert_alpha()
+            shadow_surf = font.render(text, True, shadow_color).convert_alpha().premul_alpha()
+            surf.blit(shadow_surf, (shadow_offset, shadow_offset), special_flags=pygame.BLEND_PREMULTIPLIED)
+            surf.blit(main_surf.convert_alpha().premul_alpha(), (0, 0), special_flags=pygame.BLEND_PREMULTIPLIED)
+        
+        self._surfaces[key] = surf
+        self.used += _surface_bytes(surf)
+        while self.used > self.budget and len(self._surfaces) > 1:
+            _, old = self._surfaces.popitem(last=False)
+            self.used -= _surface_bytes(old)
+        return surf
+
+    def blit(self, surface, font, text, color, pos, shadow_color=None, shadow_offset=1):
+        """把文字图画到surface的pos处"""
+        surf = self.render(font, text, color, shadow_color, shadow_offset)
+        surface.blit(surf, pos, special_flags=0 if shadow_color is None else pygame.BLEND_PREMULTIPLIED)
+
+    def clear(self):
+        self._surfaces.clear()
+        self.used = 0
+
+def _surface_bytes(surf):
+    return surf.get_width() * surf.get_height() * surf.get_bytesize()
+
+TEXT_CACHE = TextCache()
+
+def render_text(font, text, color):
+    """渲染文字（经文字图缓存，不带阴影）"""
+    return TEXT_CACHE.render(font, text, color)
+
 def draw_text_with_shadow(surface, font, text, color, pos, shadow_color=COLOR_GRAY):
-    """绘制带阴影的文字（美化显示）"""
-    x, y = pos
-    # 绘制阴影
-    shadow_surf = font.render(text, True, shadow_color)
-    surface.blit(shadow_surf, (x + 1, y + 1))
-    # 绘制主文字
-    main_surf = font.render(text, True, color)
-    surface.blit(main_surf, (x, y))
+    """绘制带阴影的文字（美化显示，阴影与文字合成为一张缓存的文字图）"""
+    TEXT_CACHE.blit(surface, font, text, color, pos, shadow_color)
+
+class DirtyRegions:
+    """
+    脏矩形记录：每帧给出画面状态键和各区域的（名称, 矩形, 状态键），
+    只有状态键与上一帧不同的区域需要重绘并提交到屏幕；画面状态键变化或invalidate后整屏重绘
+    """
+
+    def __init__(self, screen_rect):
+        self.screen_rect = pygame.Rect(screen_rect)
+        self._scene = None
+        self._keys = None  # 上一帧各区域的状态键，None表示需要整屏重绘
+
+    def invalidate(self):
+        """屏幕内容需要整体刷新（补间动画逐帧重绘、窗口重新显示），下一帧整屏重绘"""
+        self._keys = None
+
+    def collect(self, scene_key, regions):
+        """
+        :param scene_key: 整个画面的状态键（游戏状态、卡牌尺寸等）
+        :param regions: [(区域名, 矩形, 状态键), ...]，区域可以重叠
+        :return: 需要重绘的矩形列表（空列表表示画面没有变化）
+        """
+        keys = {name: key for name, _, key in regions}
+        if self._keys is None or scene_key != self._scene:
+            dirty = [self.screen_rect]
+        else:
+            dirty = [pygame.Rect(rect) for name, rect, key in regions
+                     if name not in self._keys or self._keys[name] != key]
+        self._scene = scene_key
+        self._keys = keys
+        return dirty
+
+def post_wake_event(*_):
+    """唤醒阻塞在事件等待上的主循环（可在其他线程调用，Pygame已退出时忽略）"""
+    try:
+        pygame.event.post(pygame.event.Event(WAKE_EVENT))
+    except pygame.error:
+        pass
 
 def lerp(a, b, t):
     """线性插值（用于动画平滑过渡）"""
@@ -118,6 +227,13 @@ class LandlordGamePygame:
         
         # 字体缓存（避免重复加载导致卡顿）
         self.font_cache = {}  # 格式: {(size, bold): font_object}
+        # 卡牌图缓存（阴影+牌面/牌背+边框合成后的整张图，绘制一张牌只需一次blit）
+        self.card_sprite_cache = OrderedDict()  # 格式: {(card, width, height, selected, face_up): surface}
+        # 脏矩形记录（画面没有变化的帧不重绘、不提交）
+        self.dirty_regions = DirtyRegions(self.screen.get_rect())
+        # 动画时间线（由主循环每帧推进），flow为进行中的动画流程脚本（洗牌发牌、底牌并入），期间不响应出牌操作
+        self.timeline = Timeline()
+        self.flow = None
         
         # 加载支持中文的字体（美化：增加字体大小选项）
         self.font = self.load_chinese_font(24)
@@ -125,18 +241,31 @@ class LandlordGamePygame:
         self.large_font = self.load_chinese_font(32, bold=True)
         self.tip_font = self.load_chinese_font(20, bold=True)
         
-        # 游戏状态变量
-        self.deck = []  # 完整牌组
-        self.player_cards = []  # 玩家手牌
-        self.ai1_cards = []  # AI1手牌（下方农民）
-        self.ai2_cards = []  # AI2手牌（上方农民）
-        self.landlord_cards = []  # 地主底牌
-        self.landlord = -1  # -1-未确定，0-玩家，1-AI1，2-AI2
-        self.game_state = "menu"  # menu/tutorial/shuffling/dealing/calling/playing/over
-        self.last_play = {
-            "player": "", "cards": [], "type": "", 
-            "priority": 0, "count": 0
-        }
+        # 对局规则由无界面引擎负责（座位0为玩家，由界面提交操作；座位1、2为AI代理）
+        # 开局库（可选）：叫地主与地主首出先查库，文件不存在时AI实时计算
+        self.opening_book = OpeningBook.open(file_path(OPENING_BOOK_FILE))
+        # 两个AI共用的叫地主胜率估计（进程池推演 + 按手牌缓存）
+        self.bid_estimator = BidEstimator(time_budget=AI_BID_BUDGET, jobs=AI_BID_JOBS)
+        self.engine = GameEngine(agents=[None,
+                                         make_agent(AI_LEVEL, book=self.opening_book, bidder=self.bid_estimator),
+                                         make_agent(AI_LEVEL, book=self.opening_book, bidder=self.bid_estimator)])
+        # 玩家思考期间后台预计算下一家AI的应对（使用独立的代理，不与对局中的代理共享状态）
+        self.planner = SpeculativePlanner([None,
+                                           make_agent(AI_LEVEL, book=self.opening_book),
+                                           make_agent(AI_LEVEL, book=self.opening_book)],
+                                          time_budget=AI_PLAY_DELAY)
+        # AI决策在后台线程中计算，主循环每帧轮询结果（界面保持按FPS刷新）
+        self.ai_worker = AIWorker()
+        self.ai_future = None    # 当前AI座位的决策Future
+        self.ai_seat = -1
+        self.ai_ready_at = 0.0   # 出牌停顿结束时刻（思考时间计入停顿）
+        self.redeal_at = None    # 无人叫地主时重新洗牌的时刻
+        self.ai_notice = ""      # AI操作提示（叠加显示，不阻塞）
+        self.ai_notice_until = 0.0
+        # AI决策耗时（从提交到得出决定，预计算命中时接近0），按阶段与手牌张数统计
+        self.latency = LatencyHistogram()
+        # 界面状态变量
+        self.game_state = "menu"  # menu/tutorial/stats/shuffling/dealing/calling/playing/game_over
         
         # 动画相关变量（新增）
         self.tip_text = ""  # 顶部提示信息
@@ -144,6 +273,10 @@ class LandlordGamePygame:
         self.deal_animation_progress = 0  # 发牌动画进度
         self.play_card_animation = None  # 出牌动画（起始/目标位置）
         self.shuffle_offset = []  # 洗牌动画偏移量
+        self.shuffle_frame = 0.0  # 洗牌动画当前帧（按进度插值）
+        self.deal_notice = False  # 是否显示发牌前提示
+        self.landlord_flight = None  # 底牌并入动画状态（进行中时为字典）
+        self.card_sorting = None  # 手牌整理动画状态（进行中时为字典）
         
         # 卡牌选中相关变量
         self.selected_cards = []  # 记录玩家选中的卡牌
@@ -172,13 +305,49 @@ class LandlordGamePygame:
         }
         
         # 游戏结束状态变量
-        self.game_over_winner = ""  # 记录获胜者
+        self.game_over_winner = ""  # 记录出完手牌的一方
+        self.game_over_player_won = False  # 玩家所在一方是否获胜
         
         # 统计数据
         self.stats = self.load_stats()
         
         # 不再自动初始化游戏，等待用户从菜单选择
     
+    # ---------------------- 对局状态（只读转发到引擎）----------------------
+    @property
+    def player_cards(self):
+        """玩家手牌（Hand，始终按点数排序）"""
+        return self.engine.hands[0]
+
+    @property
+    def ai1_cards(self):
+        """AI1手牌（下方农民）"""
+        return self.engine.hands[1]
+
+    @property
+    def ai2_cards(self):
+        """AI2手牌（上方农民）"""
+        return self.engine.hands[2]
+
+    @property
+    def landlord_cards(self):
+        """地主底牌"""
+        return self.engine.bottom_cards
+
+    @property
+    def landlord(self):
+        """-1-未确定，0-玩家，1-AI1，2-AI2"""
+        return self.engine.landlord
+
+    @property
+    def last_play(self):
+        """最近一次出牌/过牌（Play，player为座位号）"""
+        return self.engine.last_action
+
+    def seat_name(self, seat):
+        """座位号 -> 显示名称"""
+        return "玩家" if seat == 0 else f"AI{seat}"
+
     def load_chinese_font(self, font_size, bold=False):
         """加载多系统兼容的中文字体（带缓存，避免重复加载导致卡顿）"""
         # 检查缓存
@@ -267,10 +436,11 @@ class LandlordGamePygame:
         
         self.save_stats()
 
-    def draw_card_text(self, x, y, width, height, card):
-        """绘制卡牌文字（自适应字体大小，区分花色颜色）"""
+    def draw_card_text(self, x, y, width, height, card, surface=None):
+        """绘制卡牌文字（自适应字体大小，区分花色颜色），surface默认为屏幕"""
+        surface = surface or self.screen
         # 绘制白色背景
-        draw_rounded_rect(self.screen, COLOR_WHITE, (x, y, width, height), CARD_ROUND_RADIUS)
+        draw_rounded_rect(surface, COLOR_WHITE, (x, y, width, height), CARD_ROUND_RADIUS)
         
         # 判断卡牌颜色（红色花色：♥、♦；黑色花色：♠、♣）
         if card in JOKERS:
@@ -290,7 +460,7 @@ class LandlordGamePygame:
             text_surf = card_font.render(card_text, True, card_color)
             text_x = x + (width - text_surf.get_width()) // 2
             text_y = y + (height - text_surf.get_height()) // 2
-            self.screen.blit(text_surf, (text_x, text_y))
+            surface.blit(text_surf, (text_x, text_y))
         else:
             # 普通卡牌
             card_color = COLOR_RED if (card[0] == '♥' or card[0] == '♦') else COLOR_BLACK
@@ -305,13 +475,13 @@ class LandlordGamePygame:
             
             # 左上角显示花色
             suit_surf = card_font.render(suit, True, card_color)
-            self.screen.blit(suit_surf, (x + 4, y + 4))
+            surface.blit(suit_surf, (x + 4, y + 4))
             
             # 右下角显示点数
             rank_surf = card_font.render(rank, True, card_color)
             rank_x = x + width - rank_surf.get_width() - 4
             rank_y = y + height - rank_surf.get_height() - 4
-            self.screen.blit(rank_surf, (rank_x, rank_y))
+            surface.blit(rank_surf, (rank_x, rank_y))
             
             # 中间显示大号花色（装饰）
             center_font_size = min(max(int(height * 0.5), 24), 40)
@@ -320,127 +490,136 @@ class LandlordGamePygame:
             center_surf.set_alpha(100)  # 半透明
             center_x = x + (width - center_surf.get_width()) // 2
             center_y = y + (height - center_surf.get_height()) // 2
-            self.screen.blit(center_surf, (center_x, center_y))
+            surface.blit(center_surf, (center_x, center_y))
         
         # 绘制卡牌边框
-        pygame.draw.rect(self.screen, CARD_BORDER, (x, y, width, height), 1, border_radius=CARD_ROUND_RADIUS)
+        pygame.draw.rect(surface, CARD_BORDER, (x, y, width, height), 1, border_radius=CARD_ROUND_RADIUS)
 
-    def draw_card_back(self, x, y, width, height):
-        """绘制卡牌背面（使用渐变颜色）"""
+    def draw_card_back(self, x, y, width, height, surface=None):
+        """绘制卡牌背面（使用渐变颜色），surface默认为屏幕"""
+        surface = surface or self.screen
         # 绘制渐变背景
-        draw_rounded_rect(self.screen, CARD_BACK_DARK, (x, y, width, height), CARD_ROUND_RADIUS)
+        draw_rounded_rect(surface, CARD_BACK_DARK, (x, y, width, height), CARD_ROUND_RADIUS)
         
         # 绘制内部装饰图案（交叉线）
         center_x = x + width // 2
         center_y = y + height // 2
         line_color = CARD_BACK_LIGHT
-        pygame.draw.line(self.screen, line_color, (x + 4, y + 4), (x + width - 4, y + height - 4), 2)
-        pygame.draw.line(self.screen, line_color, (x + width - 4, y + 4), (x + 4, y + height - 4), 2)
+        pygame.draw.line(surface, line_color, (x + 4, y + 4), (x + width - 4, y + height - 4), 2)
+        pygame.draw.line(surface, line_color, (x + width - 4, y + 4), (x + 4, y + height - 4), 2)
         
         # 绘制卡牌边框
-        pygame.draw.rect(self.screen, CARD_BORDER, (x, y, width, height), 1, border_radius=CARD_ROUND_RADIUS)
+        pygame.draw.rect(surface, CARD_BORDER, (x, y, width, height), 1, border_radius=CARD_ROUND_RADIUS)
+
+    def get_card_sprite(self, card, width, height, selected=False, face_up=True):
+        """取合成好的整张卡牌图（含右下阴影，左上角即牌面左上角），按（牌, 宽, 高, 是否选中, 是否正面）LRU缓存"""
+        key = (card if face_up else "", width, height, selected, face_up)
+        sprite = self.card_sprite_cache.get(key)
+        if sprite is not None:
+            self.card_sprite_cache.move_to_end(key)
+            return sprite
+        
+        sprite = pygame.Surface((width + CARD_SHADOW_OFFSET[0], height + CARD_SHADOW_OFFSET[1]), pygame.SRCALPHA)
+        # 1. 卡牌阴影
+        draw_rounded_rect(sprite, COLOR_GRAY, (CARD_SHADOW_OFFSET[0], CARD_SHADOW_OFFSET[1], width, height),
+                          CARD_ROUND_RADIUS)
+        # 2. 牌面（文字）或牌背
+        if face_up:
+            self.draw_card_text(0, 0, width, height, card, sprite)
+        else:
+            self.draw_card_back(0, 0, width, height, sprite)
+        # 3. 卡牌边框（选中状态亮绿，否则灰黑）
+        border_color = COLOR_LIGHT_GREEN if selected else CARD_BORDER
+        border_width = 2 if selected else 1
+        pygame.draw.rect(sprite, border_color, (0, 0, width, height), border_width, border_radius=CARD_ROUND_RADIUS)
+        sprite = sprite.convert_alpha()
+        
+        self.card_sprite_cache[key] = sprite
+        if len(self.card_sprite_cache) > CARD_SPRITE_CACHE_SIZE:
+            self.card_sprite_cache.popitem(last=False)
+        return sprite
 
     # ---------------------- 动画美化：洗牌动画 ----------------------
-    def shuffle_deck(self):
-        """自动洗牌+流畅洗牌动画（牌堆晃动+颜色渐变+旋转）"""
-        self.deck = create_deck()
+    def shuffle_script(self):
+        """洗牌动画脚本（牌堆晃动+颜色渐变），播完后由引擎洗牌开始新一局"""
         self.game_state = "shuffling"
         self.tip_text = ""
         self.shuffle_offset = [(random.randint(-30, 30), random.randint(-30, 30)) for _ in range(50)]
+        self.shuffle_frame = 0.0
         
-        for i in range(60):
-            self.screen.fill(COLOR_LIGHT_GRAY)
-            # 绘制洗牌文字（带阴影+居中）
-            shuffle_text_str = "正在自动洗牌..."
-            text_x = HALF_W - self.large_font.size(shuffle_text_str)[0] // 2
-            text_y = HALF_H - 100
-            draw_text_with_shadow(self.screen, self.large_font, shuffle_text_str, COLOR_RED, (text_x, text_y))
-            
-            # 绘制晃动的牌堆（渐变颜色+随机旋转）
-            for j in range(30):
-                # 平滑偏移（随动画进度衰减）
-                offset_x = self.shuffle_offset[j][0] * (1 - i * SHUFFLE_SPEED)
-                offset_y = self.shuffle_offset[j][1] * (1 - i * SHUFFLE_SPEED)
-                x = HALF_W + offset_x
-                y = HALF_H + 50 + offset_y
-                # 颜色渐变（从深棕到浅棕）
-                card_color = (
-                    lerp(CARD_BACK_DARK[0], CARD_BACK_LIGHT[0], j/30),
-                    lerp(CARD_BACK_DARK[1], CARD_BACK_LIGHT[1], j/30),
-                    lerp(CARD_BACK_DARK[2], CARD_BACK_LIGHT[2], j/30)
-                )
-                # 绘制卡牌（圆角+阴影）
-                card_rect = (x, y, self.current_card_width, self.current_card_height)
-                # 阴影
-                shadow_rect = (x + CARD_SHADOW_OFFSET[0], y + CARD_SHADOW_OFFSET[1], 
-                               self.current_card_width, self.current_card_height)
-                draw_rounded_rect(self.screen, COLOR_GRAY, shadow_rect, CARD_ROUND_RADIUS)
-                # 卡牌背景
-                draw_rounded_rect(self.screen, card_color, card_rect, CARD_ROUND_RADIUS)
-                # 卡牌边框
-                pygame.draw.rect(self.screen, CARD_BORDER, card_rect, 1, border_radius=CARD_ROUND_RADIUS)
-            
-            pygame.display.flip()
-            self.clock.tick(FPS)
-            time.sleep(SHUFFLE_SPEED)
+        def update(progress, _):
+            self.shuffle_frame = progress * (SHUFFLE_FRAMES - 1)
         
-        random.shuffle(self.deck)
+        yield self.timeline.tween(SHUFFLE_TIME, update)
+        # 由引擎洗牌，开始新一局
+        self.engine.new_round()
+
+    def draw_shuffle(self):
+        """绘制洗牌动画的当前帧"""
+        i = self.shuffle_frame
+        self.screen.fill(COLOR_LIGHT_GRAY)
+        # 绘制洗牌文字（带阴影+居中）
+        shuffle_text_str = "正在自动洗牌..."
+        text_x = HALF_W - self.large_font.size(shuffle_text_str)[0] // 2
+        text_y = HALF_H - 100
+        draw_text_with_shadow(self.screen, self.large_font, shuffle_text_str, COLOR_RED, (text_x, text_y))
+        
+        # 绘制晃动的牌堆（渐变颜色+随机旋转）
+        for j in range(30):
+            # 平滑偏移（随动画进度衰减）
+            offset_x = self.shuffle_offset[j][0] * (1 - i * SHUFFLE_SPEED)
+            offset_y = self.shuffle_offset[j][1] * (1 - i * SHUFFLE_SPEED)
+            x = HALF_W + offset_x
+            y = HALF_H + 50 + offset_y
+            # 颜色渐变（从深棕到浅棕）
+            card_color = (
+                lerp(CARD_BACK_DARK[0], CARD_BACK_LIGHT[0], j/30),
+                lerp(CARD_BACK_DARK[1], CARD_BACK_LIGHT[1], j/30),
+                lerp(CARD_BACK_DARK[2], CARD_BACK_LIGHT[2], j/30)
+            )
+            # 绘制卡牌（圆角+阴影）
+            card_rect = (x, y, self.current_card_width, self.current_card_height)
+            # 阴影
+            shadow_rect = (x + CARD_SHADOW_OFFSET[0], y + CARD_SHADOW_OFFSET[1], 
+                           self.current_card_width, self.current_card_height)
+            draw_rounded_rect(self.screen, COLOR_GRAY, shadow_rect, CARD_ROUND_RADIUS)
+            # 卡牌背景
+            draw_rounded_rect(self.screen, card_color, card_rect, CARD_ROUND_RADIUS)
+            # 卡牌边框
+            pygame.draw.rect(self.screen, CARD_BORDER, card_rect, 1, border_radius=CARD_ROUND_RADIUS)
 
     # ---------------------- 动画美化：发牌动画 ----------------------
-    def deal_cards(self):
-        """发牌+流畅飞入动画（每张牌飞向目标位置）"""
-        self.player_cards.clear()
-        self.ai1_cards.clear()
-        self.ai2_cards.clear()
-        self.landlord_cards.clear()
+    def deal_script(self):
+        """发牌动画脚本：先显示发牌提示，再由引擎逐张发牌（界面随之刷新），发完进入叫地主"""
+        self.game_state = "dealing"
         self.selected_cards.clear()
         self.tip_text = ""
         self.deal_animation_progress = 0
+        self.deal_notice = True
+        yield DEAL_NOTICE_TIME
+        self.deal_notice = False
         
-        self.screen.fill(COLOR_LIGHT_GRAY)
-        deal_text_str = "正在发牌..."
-        text_x = HALF_W - self.large_font.size(deal_text_str)[0] // 2
-        text_y = HALF_H - 100
-        draw_text_with_shadow(self.screen, self.large_font, deal_text_str, COLOR_BLUE, (text_x, text_y))
-        pygame.display.flip()
-        time.sleep(1)
-        
-        # 按斗地主规则发牌
-        for i in range(54):
-            if self.game_state != "dealing":
-                return
-            
-            card = self.deck[i]
-            if i < 17:
-                self.ai1_cards.append(card)
-            elif i < 34:
-                self.ai2_cards.append(card)
-            elif i < 51:
-                self.player_cards.append(card)
-            else:
-                self.landlord_cards.append(card)
+        # 按斗地主规则发牌（由引擎逐张发牌）
+        while self.engine.phase == PHASE_DEALING:
+            self.engine.deal_next()
             
             # 发牌动画（每张牌平滑飞入）
-            self.deal_animation_progress = i / 54
+            self.deal_animation_progress = self.engine.deal_index / DECK_SIZE
             self.calc_adaptive_card_size()
-            self.draw_interface()
-            pygame.display.flip()
-            self.clock.tick(FPS)
-            time.sleep(DEAL_SPEED)
-        
-        # 排序手牌（按RANK_PRIORITY升序）
-        sort_key = lambda c: RANK_PRIORITY[get_card_rank(c)]
-        # 手牌整理动画（玩家手牌）
-        self.animate_card_sorting(self.player_cards, is_player=True)
-        # AI手牌整理动画
-        self.animate_card_sorting(self.ai1_cards, is_player=False)
-        self.animate_card_sorting(self.ai2_cards, is_player=False)
+            yield DEAL_INTERVAL
         
+        # 手牌为Hand容器，发牌时已按点数插入到位，无需再排序
         # 最终计算自适应尺寸
         self.calc_adaptive_card_size()
         self.game_state = "calling"
-        self.draw_interface()
-        pygame.display.flip()
+
+    def draw_deal_notice(self):
+        """绘制发牌前的提示画面"""
+        self.screen.fill(COLOR_LIGHT_GRAY)
+        deal_text_str = "正在发牌..."
+        text_x = HALF_W - self.large_font.size(deal_text_str)[0] // 2
+        text_y = HALF_H - 100
+        draw_text_with_shadow(self.screen, self.large_font, deal_text_str, COLOR_BLUE, (text_x, text_y))
 
     # ---------------------- 卡牌尺寸自适应（保留原有功能）----------------------
     def calc_adaptive_card_size(self):
@@ -495,32 +674,15 @@ class LandlordGamePygame:
         draw_x = x - (draw_w - self.current_card_width) // 2  # 缩放后居中
         draw_y = y + CARD_SELECT_OFFSET if is_selected else y
         
-        # 1. 绘制卡牌阴影
-        shadow_x = draw_x + CARD_SHADOW_OFFSET[0]
-        shadow_y = draw_y + CARD_SHADOW_OFFSET[1]
-        shadow_rect = (shadow_x, shadow_y, draw_w, draw_h)
-        draw_rounded_rect(self.screen, COLOR_GRAY, shadow_rect, CARD_ROUND_RADIUS)
-        
-        # 2. 绘制卡牌（使用文字）
-        if show_back:
-            # 卡牌背面
-            self.draw_card_back(draw_x, draw_y, draw_w, draw_h)
-        else:
-            # 卡牌正面（使用文字绘制）
-            self.draw_card_text(draw_x, draw_y, draw_w, draw_h, card)
-        
-        # 3. 绘制卡牌边框（选中状态亮绿，否则灰黑）
-        border_color = COLOR_LIGHT_GREEN if is_selected else CARD_BORDER
-        border_width = 2 if is_selected else 1
-        pygame.draw.rect(self.screen, border_color, (draw_x, draw_y, draw_w, draw_h), 
-                         border_width, border_radius=CARD_ROUND_RADIUS)
+        # 阴影、牌面/牌背与边框已合成在缓存的卡牌图中
+        self.screen.blit(self.get_card_sprite(card, draw_w, draw_h, is_selected, not show_back), (draw_x, draw_y))
         
         # 返回卡牌实际绘制的矩形区域
         return pygame.Rect(draw_x, draw_y, draw_w, draw_h)
 
     # ---------------------- 动画美化：底牌并入动画 ----------------------
-    def animate_landlord_cards_to_hand(self, target_player_id):
-        """底牌并入地主手牌动画（底牌飞向目标位置）"""
+    def landlord_cards_script(self, target_player_id):
+        """底牌并入地主手牌动画脚本（底牌飞向目标位置）"""
         if not self.landlord_cards:
             return
         
@@ -539,94 +701,97 @@ class LandlordGamePygame:
             target_x = 50
             target_y = 120
         
-        # 动画帧数
-        animation_frames = 30
+        flight = self.landlord_flight = {
+            'target': target_player_id,
+            'start_x': landlord_start_x,
+            'start_y': landlord_start_y,
+            'target_x': target_x,
+            'target_y': target_y,
+            'progress': 0.0,
+            'ease_progress': 0.0,
+        }
+        
+        def update(ease_progress, progress):
+            flight['ease_progress'] = ease_progress
+            flight['progress'] = progress
         
-        for frame in range(animation_frames + 1):
-            progress = frame / animation_frames
-            # 使用缓动函数让动画更平滑
-            ease_progress = progress * progress * (3 - 2 * progress)
+        # 使用缓动函数让动画更平滑
+        yield self.timeline.tween(LANDLORD_CARD_TIME, update, ease_in_out)
+        self.landlord_flight = None
+
+    def draw_landlord_flight(self):
+        """绘制底牌并入动画的当前帧"""
+        flight = self.landlord_flight
+        target_player_id = flight['target']
+        progress = flight['progress']
+        ease_progress = flight['ease_progress']
+        
+        # 清空屏幕并绘制完整界面（保持其他玩家的手牌）
+        self.screen.fill(COLOR_LIGHT_GRAY)
+        # 绘制顶部信息
+        info_text_surf = self.get_top_info_text()
+        info_x = HALF_W - info_text_surf.get_width() // 2
+        self.screen.blit(info_text_surf, (info_x, 20))
+        # 绘制中间出牌区域
+        self.draw_play_area()
+        # 绘制地主底牌区域（但不显示底牌，因为它们正在飞向目标）
+        landlord_title_text = "地主底牌"
+        draw_text_with_shadow(self.screen, self.font, landlord_title_text, COLOR_RED,
+                              (HALF_W - 50, 200))
+        # 根据目标玩家绘制其他手牌
+        if target_player_id == 0:  # 玩家成为地主，绘制两个AI的手牌
+            self.draw_ai_hand(2, 50, 80, 150, 120)  # AI2
+            self.draw_ai_hand(1, 50, 450, 150, 490)  # AI1
+        elif target_player_id == 1:  # AI1成为地主，绘制AI2和玩家的手牌
+            self.draw_ai_hand(2, 50, 80, 150, 120)  # AI2
+            self.draw_player_hand()
+        else:  # AI2成为地主，绘制AI1和玩家的手牌
+            self.draw_ai_hand(1, 50, 450, 150, 490)  # AI1
+            self.draw_player_hand()
+        # 绘制操作按钮
+        if self.game_state == "calling":
+            self.draw_operation_buttons()
+        
+        # 绘制每张底牌从起始位置飞向目标位置
+        for i, card in enumerate(self.landlord_cards):
+            # 计算当前卡牌的起始x坐标
+            start_x = flight['start_x'] + i * (self.current_card_width + self.current_card_margin)
             
-            # 清空屏幕并绘制完整界面（保持其他玩家的手牌）
-            self.screen.fill(COLOR_LIGHT_GRAY)
-            # 绘制顶部信息
-            info_text_surf = self.get_top_info_text()
-            info_x = HALF_W - info_text_surf.get_width() // 2
-            self.screen.blit(info_text_surf, (info_x, 20))
-            # 绘制中间出牌区域
-            self.draw_play_area()
-            # 绘制地主底牌区域（但不显示底牌，因为它们正在飞向目标）
-            landlord_title_text = "地主底牌"
-            landlord_title = self.font.render(landlord_title_text, True, COLOR_RED)
-            draw_text_with_shadow(self.screen, self.font, landlord_title_text, COLOR_RED,
-                                  (HALF_W - 50, 200))
-            # 根据目标玩家绘制其他手牌
-            if target_player_id == 0:  # 玩家成为地主，绘制两个AI的手牌
-                self.draw_ai_hand(2, 50, 80, 150, 120)  # AI2
-                self.draw_ai_hand(1, 50, 450, 150, 490)  # AI1
-            elif target_player_id == 1:  # AI1成为地主，绘制AI2和玩家的手牌
-                self.draw_ai_hand(2, 50, 80, 150, 120)  # AI2
-                self.draw_player_hand()
-            else:  # AI2成为地主，绘制AI1和玩家的手牌
-                self.draw_ai_hand(1, 50, 450, 150, 490)  # AI1
-                self.draw_player_hand()
-            # 绘制操作按钮
-            if self.game_state == "calling":
-                self.draw_operation_buttons()
+            # 计算当前帧的位置（插值）
+            current_x = int(lerp(start_x, flight['target_x'] + i * (self.current_card_margin // 2), ease_progress))
+            current_y = int(lerp(flight['start_y'], flight['target_y'], ease_progress))
             
-            # 绘制每张底牌从起始位置飞向目标位置
-            for i, card in enumerate(self.landlord_cards):
-                # 计算当前卡牌的起始x坐标
-                start_x = landlord_start_x + i * (self.current_card_width + self.current_card_margin)
-                
-                # 计算当前帧的位置（插值）
-                current_x = int(lerp(start_x, target_x + i * (self.current_card_margin // 2), ease_progress))
-                current_y = int(lerp(landlord_start_y, target_y, ease_progress))
-                
-                # 添加一点旋转效果（通过左右晃动）
-                rotation_offset = int(math.sin(progress * math.pi) * 5)
-                current_x += rotation_offset
-                
-                # 绘制卡牌（带缩放效果，靠近目标时变小）
-                scale = 1.0 - (ease_progress * 0.2)
-                draw_w = int(self.current_card_width * scale)
-                draw_h = int(self.current_card_height * scale)
-                draw_x = current_x - (draw_w - self.current_card_width) // 2
-                draw_y = current_y - (draw_h - self.current_card_height) // 2
-                
-                self.draw_card_sized(draw_x, draw_y, draw_w, draw_h, card)
+            # 添加一点旋转效果（通过左右晃动）
+            rotation_offset = int(math.sin(progress * math.pi) * 5)
+            current_x += rotation_offset
             
-            pygame.display.flip()
-            self.clock.tick(FPS)
-        
-        # 动画结束，底牌已并入手牌
-        self.landlord_cards.clear()
+            # 绘制卡牌（带缩放效果，靠近目标时变小）
+            scale = 1.0 - (ease_progress * 0.2)
+            draw_w = int(self.current_card_width * scale)
+            draw_h = int(self.current_card_height * scale)
+            draw_x = current_x - (draw_w - self.current_card_width) // 2
+            draw_y = current_y - (draw_h - self.current_card_height) // 2
+            
+            self.draw_card_sized(draw_x, draw_y, draw_w, draw_h, card)
     
     def draw_card_sized(self, x, y, width, height, card):
         """绘制指定尺寸的卡牌（使用文字，用于动画）"""
-        # 绘制阴影
-        shadow_x = x + CARD_SHADOW_OFFSET[0]
-        shadow_y = y + CARD_SHADOW_OFFSET[1]
-        shadow_rect = (shadow_x, shadow_y, width, height)
-        draw_rounded_rect(self.screen, COLOR_GRAY, shadow_rect, CARD_ROUND_RADIUS)
-        
-        # 绘制卡牌（使用文字）
-        self.draw_card_text(x, y, width, height, card)
-        
-        # 绘制卡牌边框
-        pygame.draw.rect(self.screen, CARD_BORDER, (x, y, width, height), 1, border_radius=CARD_ROUND_RADIUS)
+        self.screen.blit(self.get_card_sprite(card, width, height), (x, y))
 
     # ---------------------- 动画美化：手牌整理动画 ----------------------
-    def animate_card_sorting(self, cards, is_player=True):
-        """手牌整理动画（从乱序平滑移动到排序状态）"""
+    def card_sorting_script(self, cards, is_player=True, old_order=None):
+        """手牌整理动画脚本（从old_order的显示顺序平滑移动到Hand的有序位置）"""
         if not cards:
             return
+        if old_order is None:
+            old_order = list(cards)
+        is_ai1 = cards is self.ai1_cards
         
-        # 保存排序前的状态
+        # 保存整理前的状态
         old_positions = []
         if is_player:
             start_x = self.get_hand_start_x()
-            for i, card in enumerate(cards):
+            for i, card in enumerate(old_order):
                 old_positions.append({
                     'card': card,
                     'x': start_x + i * (self.current_card_width + self.current_card_margin),
@@ -634,17 +799,16 @@ class LandlordGamePygame:
                 })
         else:
             # AI手牌位置
-            target_y = 490 if len(cards) == len(self.ai1_cards) else 120
-            for i, card in enumerate(cards):
+            target_y = 490 if is_ai1 else 120
+            for i, card in enumerate(old_order):
                 old_positions.append({
                     'card': card,
                     'x': 50 + i * 45,
                     'y': target_y
                 })
         
-        # 排序手牌
-        sorted_key = lambda c: RANK_PRIORITY[get_card_rank(c)]
-        sorted_cards = sorted(cards, key=sorted_key)
+        # Hand始终按点数排序，直接取有序视图
+        sorted_cards = list(cards)
         
         # 计算排序后的目标位置
         if is_player:
@@ -654,9 +818,10 @@ class LandlordGamePygame:
             new_y = 600
         else:
             new_start_x = 50
-            new_y = 490 if len(cards) == len(self.ai1_cards) else 120
+            new_y = 490 if is_ai1 else 120
         
         # 建立排序前后的对应关系
+        old_by_card = {old_pos['card']: old_pos for old_pos in old_positions}
         new_positions = []
         for i, card in enumerate(sorted_cards):
             if is_player:
@@ -664,10 +829,7 @@ class LandlordGamePygame:
             else:
                 target_x = new_start_x + i * 45
             
-            # 找到该卡牌在旧位置中的索引
-            old_index = next(idx for idx, old_pos in enumerate(old_positions) if old_pos['card'] == card)
-            old_pos = old_positions[old_index]
-            
+            old_pos = old_by_card[card]
             new_positions.append({
                 'card': card,
                 'old_x': old_pos['x'],
@@ -676,74 +838,74 @@ class LandlordGamePygame:
                 'new_y': new_y
             })
         
-        # 动画帧数
-        animation_frames = 40
+        sorting = self.card_sorting = {
+            'is_player': is_player,
+            'is_ai1': is_ai1,
+            'positions': new_positions,
+            'progress': 0.0,
+            'ease_progress': 0.0,
+        }
         
-        for frame in range(animation_frames + 1):
-            progress = frame / animation_frames
-            # 使用缓动函数
-            ease_progress = 1 - (1 - progress) * (1 - progress)
-            
-            # 清空屏幕并绘制完整界面
-            self.screen.fill(COLOR_LIGHT_GRAY)
-            # 绘制顶部信息
-            info_text_surf = self.get_top_info_text()
-            info_x = HALF_W - info_text_surf.get_width() // 2
-            self.screen.blit(info_text_surf, (info_x, 20))
-            # 绘制地主底牌
-            self.draw_landlord_cards()
-            # 绘制中间出牌区域
-            self.draw_play_area()
-            # 绘制AI手牌（根据 is_player 决定是否绘制）
-            if is_player:
-                # 正在整理玩家手牌，绘制两个AI的手牌
-                self.draw_ai_hand(2, 50, 80, 150, 120)  # AI2
-                self.draw_ai_hand(1, 50, 450, 150, 490)  # AI1
-            else:
-                # 正在整理AI手牌，绘制另一个AI的手牌和玩家手牌
-                is_ai1 = (len(cards) == len(self.ai1_cards))
-                if is_ai1:
-                    # 整理AI1，绘制AI2和玩家
-                    self.draw_ai_hand(2, 50, 80, 150, 120)  # AI2
-                    self.draw_player_hand()
-                else:
-                    # 整理AI2，绘制AI1和玩家
-                    self.draw_ai_hand(1, 50, 450, 150, 490)  # AI1
-                    self.draw_player_hand()
-            # 绘制操作按钮
-            if self.game_state == "calling":
-                self.draw_operation_buttons()
-            
-            # 绘制每张卡牌在移动过程中的位置（覆盖在对应位置上）
-            for pos_info in new_positions:
-                current_x = int(lerp(pos_info['old_x'], pos_info['new_x'], ease_progress))
-                current_y = int(lerp(pos_info['old_y'], pos_info['new_y'], ease_progress))
-                
-                # 添加一点旋转效果
-                rotation_offset = int(math.sin(progress * math.pi * 2) * 3)
-                current_x += rotation_offset
-                
-                self.draw_card(current_x, current_y, pos_info['card'])
-            
-            pygame.display.flip()
-            self.clock.tick(FPS)
+        def update(ease_progress, progress):
+            sorting['ease_progress'] = ease_progress
+            sorting['progress'] = progress
         
-        # 动画结束，实际更新手牌顺序
+        # 使用缓动函数（先快后慢）
+        yield self.timeline.tween(SORT_CARD_TIME, update, ease_out)
+        self.card_sorting = None
+
+    def draw_card_sorting(self):
+        """绘制手牌整理动画的当前帧"""
+        sorting = self.card_sorting
+        is_player = sorting['is_player']
+        is_ai1 = sorting['is_ai1']
+        progress = sorting['progress']
+        ease_progress = sorting['ease_progress']
+        
+        # 清空屏幕并绘制完整界面
+        self.screen.fill(COLOR_LIGHT_GRAY)
+        # 绘制顶部信息
+        info_text_surf = self.get_top_info_text()
+        info_x = HALF_W - info_text_surf.get_width() // 2
+        self.screen.blit(info_text_surf, (info_x, 20))
+        # 绘制地主底牌
+        self.draw_landlord_cards()
+        # 绘制中间出牌区域
+        self.draw_play_area()
+        # 绘制AI手牌（根据 is_player 决定是否绘制）
         if is_player:
-            self.player_cards.clear()
-            self.player_cards.extend(sorted_cards)
+            # 正在整理玩家手牌，绘制两个AI的手牌
+            self.draw_ai_hand(2, 50, 80, 150, 120)  # AI2
+            self.draw_ai_hand(1, 50, 450, 150, 490)  # AI1
         else:
-            if len(cards) == len(self.ai1_cards):
-                self.ai1_cards.clear()
-                self.ai1_cards.extend(sorted_cards)
+            # 正在整理AI手牌，绘制另一个AI的手牌和玩家手牌
+            if is_ai1:
+                # 整理AI1，绘制AI2和玩家
+                self.draw_ai_hand(2, 50, 80, 150, 120)  # AI2
+                self.draw_player_hand()
             else:
-                self.ai2_cards.clear()
-                self.ai2_cards.extend(sorted_cards)
+                # 整理AI2，绘制AI1和玩家
+                self.draw_ai_hand(1, 50, 450, 150, 490)  # AI1
+                self.draw_player_hand()
+        # 绘制操作按钮
+        if self.game_state == "calling":
+            self.draw_operation_buttons()
+        
+        # 绘制每张卡牌在移动过程中的位置（覆盖在对应位置上）
+        for pos_info in sorting['positions']:
+            current_x = int(lerp(pos_info['old_x'], pos_info['new_x'], ease_progress))
+            current_y = int(lerp(pos_info['old_y'], pos_info['new_y'], ease_progress))
+            
+            # 添加一点旋转效果
+            rotation_offset = int(math.sin(progress * math.pi * 2) * 3)
+            current_x += rotation_offset
+            
+            self.draw_card(current_x, current_y, pos_info['card'])
 
     # ---------------------- 卡牌选中检测（保留原有功能）----------------------
     def check_card_click(self, mouse_pos):
         """检测鼠标是否点击了玩家手牌，切换选中状态"""
-        if self.game_state != "playing" or self.last_play["player"] == "玩家":
+        if self.game_state != "playing" or self.engine.current != 0 or self.flow is not None:
             return
         
         for card_rect, card in zip(self.player_card_rects, self.player_cards):
@@ -770,9 +932,7 @@ class LandlordGamePygame:
         # 绘制顶部提示文字（淡入淡出+橙色+阴影）
         if self.tip_text:
             self.tip_alpha = max(0, min(255, self.tip_alpha - TIP_FADE_SPEED))
-            tip_surface = self.tip_font.render(self.tip_text, True, COLOR_ORANGE)
-            tip_surface.set_alpha(self.tip_alpha)
-            tip_x = HALF_W - tip_surface.get_width() // 2
+            tip_x = HALF_W - self.tip_font.size(self.tip_text)[0] // 2
             draw_text_with_shadow(self.screen, self.tip_font, self.tip_text, COLOR_ORANGE, (tip_x, 60))
         
         # 1. 绘制上方AI2手牌（农民2）
@@ -796,32 +956,29 @@ class LandlordGamePygame:
     def get_top_info_text(self):
         """获取顶部游戏状态信息文本（带阴影）"""
         if self.game_state == "shuffling":
-            return self.large_font.render("正在自动洗牌...", True, COLOR_RED)
+            return render_text(self.large_font, "正在自动洗牌...", COLOR_RED)
         elif self.game_state == "dealing":
-            return self.large_font.render("正在发牌...", True, COLOR_BLUE)
+            return render_text(self.large_font, "正在发牌...", COLOR_BLUE)
         elif self.game_state == "calling":
-            return self.large_font.render("请选择：叫地主 / 不叫", True, COLOR_BLACK)
+            return render_text(self.large_font, "请选择：叫地主 / 不叫", COLOR_BLACK)
         elif self.game_state == "playing":
             landlord_text = "你" if self.landlord == 0 else f"AI{self.landlord}"
-            current_turn = "玩家" if self.last_play["player"] != "玩家" else "AI"
-            return self.large_font.render(f"{landlord_text}是地主，当前回合：{current_turn}", True, COLOR_YELLOW)
+            current_turn = self.seat_name(self.engine.current)
+            return render_text(self.large_font, f"{landlord_text}是地主，当前回合：{current_turn}", COLOR_YELLOW)
         elif self.game_state == "game_over":
-            return self.large_font.render("游戏结束", True, COLOR_RED)
+            return render_text(self.large_font, "游戏结束", COLOR_RED)
         else:
-            return self.large_font.render("游戏结束，即将重新开始...", True, COLOR_GREEN)
+            return render_text(self.large_font, "游戏结束，即将重新开始...", COLOR_GREEN)
 
     def draw_main_menu(self):
         """绘制主菜单界面"""
         # 绘制标题
         title_text = "斗地主"
-        title_surf = self.large_font.render(title_text, True, COLOR_RED)
-        title_x = HALF_W - title_surf.get_width() // 2
+        title_x = HALF_W - self.large_font.size(title_text)[0] // 2
         title_y = HALF_H - 200
         
-        # 绘制标题阴影
-        title_shadow_surf = self.large_font.render(title_text, True, COLOR_GRAY)
-        self.screen.blit(title_shadow_surf, (title_x + 2, title_y + 2))
-        self.screen.blit(title_surf, (title_x, title_y))
+        # 标题与阴影（偏移2像素）合成为一张文字图
+        TEXT_CACHE.blit(self.screen, self.large_font, title_text, COLOR_RED, (title_x, title_y), COLOR_GRAY, 2)
         
         # 绘制装饰性卡牌
         self.draw_menu_cards()
@@ -860,8 +1017,7 @@ class LandlordGamePygame:
         """绘制统计界面"""
         # 绘制标题
         title_text = "游戏统计"
-        title_surf = self.large_font.render(title_text, True, COLOR_RED)
-        title_x = HALF_W - title_surf.get_width() // 2
+        title_x = HALF_W - self.large_font.size(title_text)[0] // 2
         title_y = 50
         
         draw_text_with_shadow(self.screen, self.large_font, title_text, COLOR_RED, (title_x, title_y))
@@ -888,11 +1044,11 @@ class LandlordGamePygame:
         
         for label, value in stats_data:
             # 绘制标签
-            label_surf = self.font.render(label, True, COLOR_BLACK)
+            label_surf = render_text(self.font, label, COLOR_BLACK)
             self.screen.blit(label_surf, (300, y))
             
-            # 绘制数值
-            value_surf = self.large_font.render(str(value), True, COLOR_BLUE)
+            # 绘制数值（值不变时直接复用缓存的文字图）
+            value_surf = render_text(self.large_font, str(value), COLOR_BLUE)
             self.screen.blit(value_surf, (500, y))
             
             y += line_height
@@ -934,8 +1090,8 @@ class LandlordGamePygame:
             # 绘制卡牌文字
             font_size = 20
             card_font = self.load_chinese_font(font_size, bold=True)
-            suit_surf = card_font.render(suit, True, color)
-            rank_surf = card_font.render(rank, True, color)
+            suit_surf = render_text(card_font, suit, color)
+            rank_surf = render_text(card_font, rank, color)
             
             self.screen.blit(suit_surf, (x + 3, y + 3))
             self.screen.blit(rank_surf, (x + card_w - rank_surf.get_width() - 3, y + card_h - rank_surf.get_height() - 3))
@@ -946,8 +1102,7 @@ class LandlordGamePygame:
         """绘制玩法介绍界面"""
         # 绘制标题
         title_text = "斗地主玩法介绍"
-        title_surf = self.large_font.render(title_text, True, COLOR_RED)
-        title_x = HALF_W - title_surf.get_width() // 2
+        title_x = HALF_W - self.large_font.size(title_text)[0] // 2
         title_y = 50
         
         draw_text_with_shadow(self.screen, self.large_font, title_text, COLOR_RED, (title_x, title_y))
@@ -988,7 +1143,7 @@ class LandlordGamePygame:
                 color = COLOR_BLACK
                 font = self.font
             
-            line_surf = font.render(line, True, color)
+            line_surf = render_text(font, line, color)
             self.screen.blit(line_surf, (50, y))
             y += line_height
         
@@ -1007,9 +1162,6 @@ class LandlordGamePygame:
         ai_cards = self.ai1_cards if ai_id == 1 else self.ai2_cards
         # 修正：先定义原始文本字符串
         ai_title_text = f"AI农民{ai_id}（{'下方' if ai_id == 1 else '上方'}）"
-        # 渲染Surface（保留原逻辑）
-        ai_title = self.font.render(ai_title_text, True, COLOR_BLACK)
-        # 传递原始文本字符串，删除.get_text()
         draw_text_with_shadow(self.screen, self.font, ai_title_text, COLOR_BLACK, (title_x, title_y))
         
         # 绘制AI手牌（固定小尺寸，避免超出屏幕）
@@ -1027,7 +1179,6 @@ class LandlordGamePygame:
         """绘制地主底牌（美化+圆角）"""
         # 修正：定义原始文本字符串
         landlord_title_text = "地主底牌"
-        landlord_title = self.font.render(landlord_title_text, True, COLOR_RED)
         draw_text_with_shadow(self.screen, self.font, landlord_title_text, COLOR_RED, 
                               (HALF_W - 50, 200))
         landlord_x = HALF_W - (3 * (self.current_card_width + self.current_card_margin)) // 2
@@ -1041,7 +1192,6 @@ class LandlordGamePygame:
             # 玩家是地主，提示底牌已加入手牌
             # 修正：定义原始文本字符串
             owned_text_text = "已归属玩家（已加入你的手牌）"
-            owned_text = self.font.render(owned_text_text, True, COLOR_GREEN)
             text_x = HALF_W - self.font.size(owned_text_text)[0] // 2
             draw_text_with_shadow(self.screen, self.font, owned_text_text, COLOR_GREEN, 
                                   (text_x, 240))
@@ -1063,16 +1213,16 @@ class LandlordGamePygame:
         pygame.draw.rect(self.screen, COLOR_BLACK, play_area, 2, border_radius=10)
         
         # 绘制上一轮出牌的卡牌（不是文字）
-        if self.last_play["cards"] and self.last_play["type"] != CARD_TYPE_PASS:
+        if self.last_play.cards and self.last_play.type != CARD_TYPE_PASS:
             # 计算卡牌居中显示的起始位置
-            card_count = len(self.last_play["cards"])
+            card_count = len(self.last_play.cards)
             # 使用当前卡牌宽度和间距
             total_width = card_count * self.current_card_width + (card_count - 1) * 10
             start_x = HALF_W - total_width // 2
             card_y = 325  # 垂直居中
             
             # 绘制每张卡牌
-            for i, card in enumerate(self.last_play["cards"]):
+            for i, card in enumerate(self.last_play.cards):
                 card_x = start_x + i * (self.current_card_width + 10)
                 # 使用缩小的卡牌尺寸（0.8倍）
                 scale = 0.8
@@ -1085,12 +1235,12 @@ class LandlordGamePygame:
                 self.draw_card_sized(draw_x, draw_y, draw_w, draw_h, card)
             
             # 在卡牌下方显示玩家和牌型信息
-            player_text = f"{self.last_play['player']} 出牌："
-            type_text = f" {self.last_play['type']}"
+            player_text = f"{self.seat_name(self.last_play.player)} 出牌："
+            type_text = f" {self.last_play.type}"
             draw_text_with_shadow(self.screen, self.font, player_text + type_text, COLOR_BLACK, (250, 380))
-        elif self.last_play["type"] == CARD_TYPE_PASS:
+        elif self.last_play.type == CARD_TYPE_PASS:
             # 过牌时显示文字
-            pass_text = f"{self.last_play['player']} 过牌"
+            pass_text = f"{self.seat_name(self.last_play.player)} 过牌"
             draw_text_with_shadow(self.screen, self.font, pass_text, COLOR_RED, (HALF_W - self.font.size(pass_text)[0] // 2, 340))
         else:
             # 无出牌
@@ -1102,7 +1252,6 @@ class LandlordGamePygame:
         self.player_card_rects.clear()
         # 修正：定义原始文本字符串
         player_title_text = "你的手牌"
-        player_title = self.font.render(player_title_text, True, COLOR_BLUE)
         text_x = HALF_W - self.font.size(player_title_text)[0] // 2
         draw_text_with_shadow(self.screen, self.font, player_title_text, COLOR_BLUE, 
                               (text_x, 550))
@@ -1144,7 +1293,7 @@ class LandlordGamePygame:
             draw_text_with_shadow(self.screen, self.font, "不叫", COLOR_WHITE, 
                                   (self.buttons["giveup_call"].x + 30, self.buttons["giveup_call"].y + 10))
         
-        if self.game_state == "playing" and self.last_play["player"] != "玩家":
+        if self.game_state == "playing" and self.engine.current == 0:
             # 出牌按钮（绿）
             play_hover = self.buttons["play"].collidepoint(mouse_pos)
             play_color = BUTTON_GREEN_HOVER if play_hover else BUTTON_GREEN
@@ -1176,8 +1325,8 @@ class LandlordGamePygame:
         draw_rounded_rect(self.screen, COLOR_WHITE, result_box, 20)
         pygame.draw.rect(self.screen, COLOR_BLACK, result_box, 3, border_radius=20)
         
-        # 判断玩家是赢了还是输了
-        player_won = (self.game_over_winner == "玩家")
+        # 判断玩家是赢了还是输了（农民一方共同胜负）
+        player_won = self.game_over_player_won
         
         # 显示获胜信息
         if player_won:
@@ -1188,19 +1337,19 @@ class LandlordGamePygame:
             result_color = COLOR_RED
         
         # 绘制结果文字
-        result_surf = self.large_font.render(result_text, True, result_color)
-        result_x = HALF_W - result_surf.get_width() // 2
+        result_x = HALF_W - self.large_font.size(result_text)[0] // 2
         result_y = HALF_H - 100
         draw_text_with_shadow(self.screen, self.large_font, result_text, result_color, (result_x, result_y))
         
         # 显示详细信息
-        if player_won:
+        if self.game_over_winner == "玩家":
             detail_text = "你成功出完了所有手牌！"
+        elif player_won:
+            detail_text = f"队友{self.game_over_winner}出完了所有手牌！"
         else:
             detail_text = "很遗憾，下次继续加油！"
         
-        detail_surf = self.font.render(detail_text, True, COLOR_BLACK)
-        detail_x = HALF_W - detail_surf.get_width() // 2
+        detail_x = HALF_W - self.font.size(detail_text)[0] // 2
         detail_y = HALF_H - 40
         draw_text_with_shadow(self.screen, self.font, detail_text, COLOR_BLACK, (detail_x, detail_y))
         
@@ -1225,361 +1374,229 @@ class LandlordGamePygame:
         draw_text_with_shadow(self.screen, self.font, "继续玩", COLOR_WHITE, 
                               (self.buttons["game_over_continue"].x + 40, self.buttons["game_over_continue"].y + 10))
 
-    # ---------------------- 核心修正：AI出牌逻辑（解决炸弹压制+主动过牌）----------------------
-    def get_ai_legal_plays(self, ai_cards):
-        """获取AI的所有合法牌型（补充王炸提取，完善合法牌型）"""
-        legal_plays = []
-        card_count = len(ai_cards)
-        if card_count == 0:
-            return legal_plays
-        
-        # 先按点数排序AI手牌，方便提取连续牌型
-        sorted_ai_cards = sorted(ai_cards, key=lambda c: RANK_PRIORITY[get_card_rank(c)])
-        ai_card_set = set(sorted_ai_cards)
-        
-        # 1. 提取王炸（最高优先级）
-        if '小王' in ai_card_set and '大王' in ai_card_set:
-            joker_bomb = ['小王', '大王']
-            legal_plays.append(joker_bomb)
-        
-        # 2. 提取所有单张
-        for i in range(card_count):
-            single_card = [sorted_ai_cards[i]]
-            if judge_card_type(single_card)[0] != CARD_TYPE_INVALID:
-                legal_plays.append(single_card)
-        
-        # 3. 提取所有对子
-        for i in range(card_count - 1):
-            card1_rank = get_card_rank(sorted_ai_cards[i])
-            card2_rank = get_card_rank(sorted_ai_cards[i+1])
-            if card1_rank == card2_rank:
-                pair_cards = [sorted_ai_cards[i], sorted_ai_cards[i+1]]
-                legal_plays.append(pair_cards)
-        
-        # 4. 提取所有三张
-        for i in range(card_count - 2):
-            card1_rank = get_card_rank(sorted_ai_cards[i])
-            card2_rank = get_card_rank(sorted_ai_cards[i+1])
-            card3_rank = get_card_rank(sorted_ai_cards[i+2])
-            if card1_rank == card2_rank == card3_rank:
-                triple_cards = [sorted_ai_cards[i], sorted_ai_cards[i+1], sorted_ai_cards[i+2]]
-                legal_plays.append(triple_cards)
-        
-        # 5. 提取所有普通炸弹
-        for i in range(card_count - 3):
-            ranks = [get_card_rank(sorted_ai_cards[i+j]) for j in range(4)]
-            if len(set(ranks)) == 1:
-                bomb_cards = sorted_ai_cards[i:i+4]
-                legal_plays.append(bomb_cards)
-        
-        # 6. 提取复杂牌型（顺子、连对、飞机等）
-        min_seq_single_len = MIN_SEQUENCE_SINGLE_COUNT
-        for start in range(card_count - min_seq_single_len + 1):
-            for end in range(start + min_seq_single_len - 1, card_count):
-                sequence_cards = sorted_ai_cards[start:end+1]
-                if judge_card_type(sequence_cards)[0] == CARD_TYPE_SEQUENCE_SINGLE:
-                    legal_plays.append(sequence_cards)
-        
-        # 去重并返回（按优先级降序排序，方便AI优先选大牌）
-        unique_plays = []
-        seen = set()
-        for play in legal_plays:
-            play_tuple = tuple(play)
-            if play_tuple not in seen:
-                seen.add(play_tuple)
-                unique_plays.append(play)
-        
-        # 按牌型优先级降序排序（王炸>炸弹>普通牌型）
-        def play_priority_key(play):
-            p_type, p_prio, _ = judge_card_type(play)
-            if p_type == CARD_TYPE_JOKER_BOMB:
-                return 1000 + p_prio
-            elif p_type == CARD_TYPE_BOMB:
-                return 100 + p_prio
-            else:
-                return p_prio
-        
-        unique_plays.sort(key=play_priority_key, reverse=True)
-        return unique_plays
+    # ---------------------- AI操作（决策在后台线程中由代理完成，主循环轮询结果，界面只负责展示）----------------------
+    def show_ai_notice(self, notice_text, duration=AI_NOTICE_TIME):
+        """显示AI操作提示（居中+阴影，叠加在界面上duration秒，不阻塞主循环）"""
+        self.ai_notice = notice_text
+        self.ai_notice_until = time.perf_counter() + duration
 
-    def show_ai_notice(self, notice_text):
-        """显示AI操作提示（美化+居中+阴影）"""
-        self.screen.fill(COLOR_LIGHT_GRAY)
-        text_x = HALF_W - self.large_font.size(notice_text)[0] // 2
-        text_y = HALF_H
-        draw_text_with_shadow(self.screen, self.large_font, notice_text, COLOR_RED, (text_x, text_y))
-        pygame.display.flip()
-        time.sleep(2)
+    def active_ai_notice(self):
+        """未过期的AI操作提示文字（过期则清除，返回空串）"""
+        if self.ai_notice and time.perf_counter() >= self.ai_notice_until:
+            self.ai_notice = ""
+        return self.ai_notice
 
-    def ai_call_landlord(self):
-        """AI自动叫地主逻辑"""
-        self.screen.fill(COLOR_LIGHT_GRAY)
-        self.show_ai_notice("等待AI叫地主...")
-        
-        # 定义AI叫地主的判断条件
-        def should_call(cards):
-            rank_count = count_rank_occurrences(cards)
-            if '小王' in rank_count and '大王' in rank_count:
-                return True
-            if any(count == 4 for count in rank_count.values()):
-                return True
-            if rank_count.get('2', 0) >= 2:
-                return True
-            if rank_count.get('小王', 0) + rank_count.get('大王', 0) >= 1:
-                return True
-            return False
-        
-        # AI1叫地主判断
-        if should_call(self.ai1_cards):
-            self.landlord = 1
-            # 底牌并入动画
-            self.animate_landlord_cards_to_hand(1)
-            self.ai1_cards.extend(self.landlord_cards)
-            self.landlord_cards.clear()
-            # 手牌整理动画
-            self.animate_card_sorting(self.ai1_cards, is_player=False)
-            
-            self.ai1_cards.sort(key=lambda c: RANK_PRIORITY[get_card_rank(c)])
-            self.show_ai_notice(f"AI农民1选择叫地主，成为地主！")
-            self.game_state = "playing"
-            self.ai_play_card(1)
+    def draw_ai_notice(self):
+        """绘制未过期的AI操作提示"""
+        if not self.active_ai_notice():
             return
+        text_x = HALF_W - self.large_font.size(self.ai_notice)[0] // 2
+        draw_text_with_shadow(self.screen, self.large_font, self.ai_notice, COLOR_RED, (text_x, HALF_H))
+
+    def become_landlord(self, seat, then=None):
+        """座位seat叫地主：引擎并入底牌，界面依次播放底牌并入与手牌整理动画，播完进入出牌阶段后调用then"""
+        hand = self.engine.hands[seat]
+        old_order = list(hand) + list(self.landlord_cards)
+        self.engine.bid(seat, True)
         
-        # AI2叫地主判断
-        if should_call(self.ai2_cards):
-            self.landlord = 2
+        def script():
             # 底牌并入动画
-            self.animate_landlord_cards_to_hand(2)
-            self.ai2_cards.extend(self.landlord_cards)
-            self.landlord_cards.clear()
-            # 手牌整理动画
-            self.animate_card_sorting(self.ai2_cards, is_player=False)
-            
-            self.ai2_cards.sort(key=lambda c: RANK_PRIORITY[get_card_rank(c)])
-            self.show_ai_notice(f"AI农民2选择叫地主，成为地主！")
+            yield from self.landlord_cards_script(seat)
+            # 手牌整理动画（Hand已按点数插入到位，只需动画）
+            yield from self.card_sorting_script(hand, is_player=(seat == 0), old_order=old_order)
+            self.calc_adaptive_card_size()
             self.game_state = "playing"
-            self.ai_play_card(2)
-            return
         
-        # 所有玩家都不叫，重新洗牌
-        self.show_ai_notice("所有玩家都不叫地主，重新开始！")
-        self.reset_game()
+        self.start_flow(script(), then)
 
-    def ai_play_card(self, ai_id):
-        """AI自动出牌逻辑（核心修正：炸弹压制+主动过牌）"""
-        self.game_state = "playing"
-        self.show_ai_notice(f"AI{ai_id}正在出牌...")
+    def start_flow(self, script, then=None):
+        """在时间线上运行一段动画流程脚本（期间不响应叫地主/出牌操作），播完后调用then"""
+        self.flow = self.timeline.spawn(script)
         
-        # 选择AI手牌
-        ai_cards = self.ai1_cards if ai_id == 1 else self.ai2_cards
-        if not ai_cards:
-            self.check_win()
-            return
+        def finished():
+            self.flow = None
+            if then is not None:
+                then()
         
-        # 1. 获取AI所有合法牌型（已按优先级降序排序）
-        legal_plays = self.get_ai_legal_plays(ai_cards)
-        if not legal_plays:
-            # 无合法牌，强制过牌
-            self.last_play = {
-                "player": f"AI{ai_id}", "cards": ["过牌"], 
-                "type": CARD_TYPE_PASS, "priority": 0, "count": 0
-            }
-            self.draw_interface()
-            pygame.display.flip()
-            time.sleep(1)
+        self.flow.then(finished)
+
+    def stop_flow(self):
+        """中止进行中的动画流程与全部补间（重新开始时调用）"""
+        if self.flow is not None:
+            self.flow.cancel()
+            self.flow = None
+        self.timeline.cancel_all()
+        self.landlord_flight = None
+        self.card_sorting = None
+        self.deal_notice = False
+
+    def ai_call_landlord(self):
+        """AI叫地主：轮到的AI在后台决定叫/不叫（开局库收录的手牌直接查库，否则按推演胜率与门槛决定）"""
+        self.show_ai_notice("等待AI叫地主...")
+        self.next_turn()
+
+    def next_turn(self):
+        """按引擎当前座位推进：AI座位提交后台决策，玩家座位等待操作（出牌阶段同时开始预计算）"""
+        engine = self.engine
+        if engine.phase == PHASE_BIDDING:
+            if engine.agents[engine.current] is None:
+                self.game_state = "calling"
+            else:
+                self.submit_ai_decision()
+        elif engine.phase == PHASE_PLAYING:
+            self.game_state = "playing"
+            if engine.agents[engine.current] is None:
+                self.start_speculation()
+            else:
+                self.ai_play_card(engine.current)
+
+    def start_speculation(self):
+        """轮到玩家出牌时开始后台预计算"""
+        if self.engine.phase == PHASE_PLAYING and self.engine.agents[self.engine.current] is None:
+            self.planner.start(self.engine, self.engine.current)
+
+    def ai_play_card(self, ai_id):
+        """
+        AI出牌：玩家思考期间已预计算出的应对直接取用，否则提交后台搜索（地主首出先查开局库），
+        结果由主循环轮询取回
+        """
+        self.show_ai_notice(f"AI{ai_id}正在出牌...")
+        self.submit_ai_decision(self.planner.take(self.engine))
+
+    def submit_ai_decision(self, future=None):
+        """
+        记录当前AI座位的决策Future（未给出时交给后台线程计算，截止时刻为出牌停顿结束），
+        思考时间计入出牌停顿，决策耗时记入直方图
+        """
+        engine = self.engine
+        self.ai_seat = engine.current
+        self.ai_ready_at = time.perf_counter() + AI_PLAY_DELAY
+        if future is None:
+            future = self.ai_worker.submit(engine, deadline=self.ai_ready_at)
+        self.latency.track(future, engine.phase, len(engine.hands[self.ai_seat]))
+        future.add_done_callback(post_wake_event)
+        self.ai_future = future
+
+    def poll_ai(self):
+        """主循环每帧调用：AI决策完成且停顿时间已到时应用到引擎，再推进到下一座位"""
+        now = time.perf_counter()
+        if self.redeal_at is not None and now >= self.redeal_at:
+            self.redeal_at = None
+            self.reset_game()
             return
-        
-        # 2. 筛选能压制上一轮的牌型（核心：严格遵循压制规则）
-        able_to_suppress = []
-        for candidate in legal_plays:
-            is_able, _ = is_card_able_to_play(candidate, self.last_play)
-            if is_able:
-                able_to_suppress.append(candidate)
-        
-        # 3. 出牌决策（优先级：能压制的牌 > 过牌（无压制牌时） > 首轮小牌）
-        play_cards = []
-        last_has_valid_card = bool(self.last_play["cards"]) and self.last_play["type"] != CARD_TYPE_PASS
-        
-        if able_to_suppress:
-            # 有压制牌，优先选最小的压制牌（保留大牌）
-            # 按优先级升序排序，选第一个（最小压制牌）
-            able_to_suppress.sort(key=lambda p: get_max_rank_priority(p))
-            play_cards = able_to_suppress[0]
-        elif last_has_valid_card:
-            # 有合法牌但无压制牌，主动过牌（符合斗地主规则）
-            self.last_play = {
-                "player": f"AI{ai_id}", "cards": ["过牌"], 
-                "type": CARD_TYPE_PASS, "priority": 0, "count": 0
-            }
-            self.draw_interface()
-            pygame.display.flip()
-            time.sleep(1)
+        future = self.ai_future
+        if future is None or not future.done() or now < self.ai_ready_at or self.flow is not None:
             return
+        self.ai_future = None
+        seat = self.ai_seat
+        try:
+            decision = future.result()
+        except Exception as e:
+            # 后台决策出错时按规则叫地主/贪心出牌，牌局照常继续
+            print(f"AI决策失败，改用规则决策：{e!r}")
+            hand = self.engine.hands[seat]
+            if self.engine.phase == PHASE_BIDDING:
+                decision = should_call(hand)
+            else:
+                decision = greedy_play(hand, self.engine.last_play)
+        if self.engine.phase == PHASE_BIDDING:
+            if decision:
+                def landlord_ready():
+                    self.show_ai_notice(f"AI农民{seat}选择叫地主，成为地主！")
+                    self.next_turn()
+                
+                self.become_landlord(seat, then=landlord_ready)
+                return
+            else:
+                self.engine.bid(seat, False)
+                if self.engine.phase == PHASE_ABANDONED:
+                    # 所有玩家都不叫，提示后重新洗牌
+                    self.show_ai_notice("所有玩家都不叫地主，重新开始！")
+                    self.redeal_at = now + AI_NOTICE_TIME
+                    return
         else:
-            # 首轮出牌，选最小的合法牌（避免盲目出大牌）
-            legal_plays.sort(key=lambda p: get_max_rank_priority(p))
-            play_cards = legal_plays[0]
-        
-        # 4. 从AI手牌中移除已出的牌
-        for card in play_cards:
-            if card in ai_cards:
-                ai_cards.remove(card)
-        
-        # 5. 更新上一轮出牌信息
-        card_type, card_priority, card_count = judge_card_type(play_cards)
-        self.last_play = {
-            "player": f"AI{ai_id}", "cards": play_cards,
-            "type": card_type, "priority": card_priority, "count": card_count
-        }
-        
-        # 6. 刷新界面并延时
-        self.calc_adaptive_card_size()
-        self.draw_interface()
-        pygame.display.flip()
-        time.sleep(1)
-        
-        # 7. 检查获胜
-        if self.check_win():
-            return
-        
-        # 8. 切换到玩家回合
-        self.game_state = "playing"
-        self.draw_interface()
-        pygame.display.flip()
+            if not self.engine.play(seat, decision)[0]:
+                # 预计算的出牌与局面不符（不应发生）时交给后台线程重新计算，不在界面线程中搜索
+                self.submit_ai_decision()
+                return
+            self.calc_adaptive_card_size()
+            if self.check_win():
+                return
+        self.next_turn()
+
+    def cancel_ai(self):
+        """取消进行中的AI决策与预计算（返回主菜单、重新开始时调用，正在运行的计算结束后结果被丢弃）"""
+        if self.ai_future is not None:
+            self.ai_future.cancel()
+            self.ai_future = None
+        self.planner.cancel()
+        self.redeal_at = None
+        self.ai_notice = ""
 
     # ---------------------- 玩家操作（保留原有功能）----------------------
     def player_call_landlord(self):
         """玩家叫地主"""
-        self.landlord = 0
         # 更新统计：玩家叫地主
         self.update_stats("call_landlord")
         
-        # 底牌并入动画
-        self.animate_landlord_cards_to_hand(0)
-        # 底牌并入手牌
-        self.player_cards.extend(self.landlord_cards)
-        self.landlord_cards.clear()
-        # 手牌整理动画
-        self.animate_card_sorting(self.player_cards, is_player=True)
-        
-        self.calc_adaptive_card_size()
-        self.game_state = "playing"
-        self.last_play = {
-            "player": "AI", "cards": [], "type": "", 
-            "priority": 0, "count": 0
-        }
-        self.draw_interface()
-        pygame.display.flip()
-        time.sleep(1)
+        self.become_landlord(0, then=self.next_turn)
 
     def player_giveup_landlord(self):
         """玩家不叫地主"""
-        self.game_state = "calling"
+        self.engine.bid(0, False)
         self.ai_call_landlord()
 
-    def player_play_card(self):
-        """玩家出牌"""
-        if not self.player_cards:
-            return
-        
-        play_cards = self.selected_cards.copy() if self.selected_cards else [self.player_cards[0]]
-        is_able, tip = is_card_able_to_play(play_cards, self.last_play)
-        
+    def submit_player_play(self, play):
+        """向引擎提交玩家的出牌/过牌，不合法时显示提示，合法则进入AI回合"""
+        is_able, tip = self.engine.play(0, play)
         if not is_able:
             self.tip_text = tip
             self.tip_alpha = 255
-            self.draw_interface()
-            pygame.display.flip()
             return
         
-        if play_cards != ["过牌"]:
-            card_type, card_priority, card_count = judge_card_type(play_cards)
-            for card in play_cards:
-                if card in self.player_cards:
-                    self.player_cards.remove(card)
-            
-            self.selected_cards.clear()
-            self.tip_text = ""
-            self.tip_alpha = 255
-            
-            self.last_play = {
-                "player": "玩家", "cards": play_cards,
-                "type": card_type, "priority": card_priority, "count": card_count
-            }
-            
-            self.calc_adaptive_card_size()
-        else:
-            self.selected_cards.clear()
-            self.tip_text = ""
-            self.tip_alpha = 255
-            self.last_play = {
-                "player": "玩家", "cards": ["过牌"], 
-                "type": CARD_TYPE_PASS, "priority": 0, "count": 0
-            }
-        
-        self.draw_interface()
-        pygame.display.flip()
-        time.sleep(1)
+        self.selected_cards.clear()
+        self.tip_text = ""
+        self.tip_alpha = 255
+        self.calc_adaptive_card_size()
         
         if self.check_win():
             return
         
-        self.game_state = "playing"
-        self.show_ai_notice("等待AI出牌...")
-        ai_id = 1 if self.landlord != 1 else 2
-        self.ai_play_card(ai_id)
+        self.next_turn()
+
+    def player_play_card(self):
+        """玩家出牌"""
+        if not self.player_cards:
+            return
+        
+        play_cards = self.selected_cards.copy() if self.selected_cards else [self.player_cards[0]]
+        # 只判定一次牌型，压制校验和出牌记录共用同一个Play
+        self.submit_player_play(classify_play(play_cards))
 
     def player_giveup_card(self):
         """玩家过牌"""
-        self.selected_cards.clear()
-        self.tip_text = ""
-        self.tip_alpha = 255
-        self.last_play = {
-            "player": "玩家", "cards": ["过牌"], 
-            "type": CARD_TYPE_PASS, "priority": 0, "count": 0
-        }
-        self.draw_interface()
-        pygame.display.flip()
-        time.sleep(1)
-        
-        ai_id = 1 if self.landlord != 1 else 2
-        self.ai_play_card(ai_id)
+        self.submit_player_play(pass_play())
 
     # ---------------------- 获胜检测与游戏重置 ----------------------
     def check_win(self):
-        """检查是否有玩家获胜"""
-        # 玩家获胜
-        if not self.player_cards:
-            self.game_over_winner = "玩家"
-            self.game_state = "game_over"
-            self.update_stats("win")
-            return True
-        # AI1获胜
-        elif not self.ai1_cards:
-            self.game_over_winner = "AI农民1"
-            # 如果玩家不是地主，玩家输了
-            if self.landlord != 0:
-                self.update_stats("lose")
-            self.game_state = "game_over"
-            return True
-        # AI2获胜
-        elif not self.ai2_cards:
-            self.game_over_winner = "AI农民2"
-            # 如果玩家不是地主，玩家输了
-            if self.landlord != 0:
-                self.update_stats("lose")
-            self.game_state = "game_over"
-            return True
-        return False
+        """检查是否有玩家获胜（胜负由引擎判定，农民一方共同胜负）"""
+        if not self.engine.is_over:
+            return False
+        
+        self.planner.cancel()
+        winner = self.engine.winner
+        self.game_over_winner = "玩家" if winner == 0 else f"AI农民{winner}"
+        self.game_over_player_won = self.engine.seat_won(0)
+        self.update_stats("win" if self.game_over_player_won else "lose")
+        self.game_state = "game_over"
+        return True
 
     def reset_game(self):
         """重置游戏，重新开始"""
-        self.landlord = -1
         self.game_state = "shuffling"
-        self.last_play = {
-            "player": "", "cards": [], "type": "", 
-            "priority": 0, "count": 0
-        }
+        self.cancel_ai()
+        self.stop_flow()
+        self.engine.reset()
         self.selected_cards.clear()
         self.tip_text = ""
         self.tip_alpha = 255
@@ -1590,30 +1607,162 @@ class LandlordGamePygame:
         self.current_card_margin = BASE_CARD_MARGIN
         
         # 重新洗牌发牌
-        self.shuffle_deck()
-        self.game_state = "dealing"
-        self.deal_cards()
+        self.start_flow(self.new_hand_script())
     
     def init_game(self):
         """初始化游戏流程（洗牌+发牌）"""
         # 更新统计：开始新游戏
         self.update_stats("game_start")
         
-        self.shuffle_deck()
-        self.game_state = "dealing"
-        self.deal_cards()
+        self.start_flow(self.new_hand_script())
+
+    def new_hand_script(self):
+        """洗牌+发牌动画流程，播完进入叫地主（玩家先叫）"""
+        yield from self.shuffle_script()
+        yield from self.deal_script()
+
+    # ---------------------- 脏矩形绘制 ----------------------
+    def button_region(self, name):
+        """按钮连同阴影占用的区域"""
+        return self.buttons[name].inflate(6, 6)
+
+    def scene_regions(self):
+        """
+        当前画面的状态键与各区域的（名称, 矩形, 状态键），区域覆盖该部分元素绘制的全部像素，
+        状态键包含该区域绘制时读取的全部状态
+        :return: (画面状态键, 区域列表)
+        """
+        mouse_pos = pygame.mouse.get_pos()
+        state = self.game_state
+        
+        def hover_regions(names):
+            return [(name, self.button_region(name), self.buttons[name].collidepoint(mouse_pos)) for name in names]
+        
+        if state == "menu":
+            return (state,), hover_regions(("menu_ai_battle", "menu_tutorial", "menu_stats"))
+        if state == "tutorial":
+            return (state,), hover_regions(("menu_back",))
+        if state == "stats":
+            return (state, tuple(self.stats.items())), hover_regions(("stats_back",))
+        if state == "shuffling":
+            return (state,), []  # 洗牌动画播放期间逐帧整屏重绘
+        
+        # 动画切换（发牌提示、底牌并入、手牌整理）时整屏重绘，动画播放期间逐帧整屏重绘
+        scene_key = (state, self.current_card_width, self.current_card_height, self.current_card_margin,
+                     self.deal_notice, self.landlord_flight is not None, self.card_sorting is not None)
+        regions = [
+            # 顶部信息栏与提示文字（信息栏文字图来自文字缓存，内容不变时是同一个Surface）
+            ("top", (0, 0, WINDOW_WIDTH, 90), (self.get_top_info_text(), self.tip_text)),
+            ("ai2_hand", (0, 80, WINDOW_WIDTH, 120), len(self.ai2_cards)),
+            ("landlord_cards", (0, 200, WINDOW_WIDTH, 120), (self.landlord, tuple(self.landlord_cards))),
+            # 出牌区域与叠加在中间的AI操作提示
+            ("play_area", (0, 300, WINDOW_WIDTH, 150), (len(self.engine.history), self.last_play.player,
+                                                        self.last_play.type, tuple(self.last_play.cards),
+                                                        self.active_ai_notice())),
+            ("ai1_hand", (0, 450, WINDOW_WIDTH, 130), len(self.ai1_cards)),
+            ("player_hand", (0, 550, WINDOW_WIDTH, BUTTON_Y - 560),
+             (tuple(self.player_cards), tuple(self.selected_cards))),
+            ("buttons", (0, BUTTON_Y - 10, WINDOW_WIDTH, WINDOW_HEIGHT - BUTTON_Y + 10),
+             (self.engine.current, tuple(self.buttons[name].collidepoint(mouse_pos)
+                                         for name in ("call", "giveup_call", "play", "giveup_play")))),
+        ]
+        if state == "game_over":
+            regions += hover_regions(("game_over_menu", "game_over_continue"))
+        return scene_key, regions
+
+    def draw_scene(self):
+        """按游戏状态绘制整个画面（受屏幕裁剪区域限制）"""
+        if self.game_state == "menu":
+            self.screen.fill(COLOR_LIGHT_GRAY)
+            self.draw_main_menu()
+        elif self.game_state == "tutorial":
+            self.screen.fill(COLOR_LIGHT_GRAY)
+            self.draw_tutorial()
+        elif self.game_state == "stats":
+            self.screen.fill(COLOR_LIGHT_GRAY)
+            self.draw_stats_screen()
+        elif self.game_state == "shuffling":
+            self.draw_shuffle()
+        elif self.game_state == "dealing":
+            if self.deal_notice:
+                self.draw_deal_notice()
+            else:
+                self.draw_interface()
+        elif self.landlord_flight is not None:
+            self.draw_landlord_flight()
+        elif self.card_sorting is not None:
+            self.draw_card_sorting()
+        elif self.game_state == "game_over":
+            # 绘制游戏结束界面（覆盖在游戏界面上）
+            self.draw_interface()
+            self.draw_game_over()
+        else:
+            self.draw_interface()
+            self.draw_ai_notice()
+
+    def render_frame(self):
+        """只重绘状态有变化的区域并提交这些矩形，画面没有变化时什么也不做（补间动画播放期间整屏重绘）"""
+        if self.timeline.frame_needed:
+            self.dirty_regions.invalidate()
+        dirty = self.dirty_regions.collect(*self.scene_regions())
+        if not dirty:
+            return
+        # 在脏矩形的外接矩形内重绘一次，只提交脏矩形本身
+        self.screen.set_clip(dirty[0].unionall(dirty[1:]))
+        self.draw_scene()
+        self.screen.set_clip(None)
+        pygame.display.update(dirty)
+
+    def idle_timeout(self):
+        """
+        没有待处理事件时可阻塞等待的毫秒数：补间动画播放期间为0（按FPS出帧），
+        否则等到最近的定时变化（时间线上的等待、AI出牌停顿结束、AI提示过期、重新发牌），最长IDLE_MAX_WAIT；
+        AI决策完成、鼠标移动与点击、窗口变化都会以事件唤醒主循环
+        """
+        if self.timeline.frame_needed:
+            return 0
+        deadlines = []
+        due = self.timeline.next_due()
+        if due is not None:
+            deadlines.append(due)
+        if self.ai_future is not None and self.ai_future.done():
+            deadlines.append(self.ai_ready_at)
+        if self.redeal_at is not None:
+            deadlines.append(self.redeal_at)
+        if self.ai_notice:
+            deadlines.append(self.ai_notice_until)
+        now = time.perf_counter()
+        timeout = IDLE_MAX_WAIT
+        for deadline in deadlines:
+            timeout = min(timeout, math.ceil((deadline - now) * 1000))
+        return max(timeout, 0)
+
+    def wait_events(self):
+        """取出本帧的事件，画面静止时阻塞等待（不再空转到FPS上限），有事件或定时到达即返回"""
+        events = pygame.event.get()
+        if events:
+            return events
+        timeout = self.idle_timeout()
+        if timeout <= 0:
+            return events
+        event = pygame.event.wait(timeout)
+        if event.type == pygame.NOEVENT:
+            return []
+        return [event] + pygame.event.get()
 
     # ---------------------- 游戏主循环（保留原有功能）----------------------
     def run(self):
-        """游戏主循环"""
+        """游戏主循环（帧率上限FPS，画面静止时阻塞等待事件）"""
         running = True
         while running:
             self.clock.tick(FPS)
             
             # 事件处理
-            for event in pygame.event.get():
+            for event in self.wait_events():
                 if event.type == pygame.QUIT:
                     running = False
+                elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                    self.dirty_regions.invalidate()
                 elif event.type == pygame.MOUSEBUTTONDOWN:
                     mouse_pos = pygame.mouse.get_pos()
                     
@@ -1641,6 +1790,7 @@ class LandlordGamePygame:
                     elif self.game_state == "game_over":
                         if self.buttons["game_over_menu"].collidepoint(mouse_pos):
                             # 返回主菜单
+                            self.cancel_ai()
                             self.game_state = "menu"
                         elif self.buttons["game_over_continue"].collidepoint(mouse_pos):
                             # 继续玩，重新开始游戏
@@ -1651,42 +1801,43 @@ class LandlordGamePygame:
                         # 先检测卡牌点击
                         self.check_card_click(mouse_pos)
                         
-                        # 再检测按钮点击
-                        if self.game_state == "calling":
+                        # 再检测按钮点击（AI决策进行中不响应）
+                        player_turn = self.ai_future is None and self.flow is None and self.engine.current == 0
+                        if self.game_state == "calling" and player_turn:
                             if self.buttons["call"].collidepoint(mouse_pos):
                                 self.player_call_landlord()
                             elif self.buttons["giveup_call"].collidepoint(mouse_pos):
                                 self.player_giveup_landlord()
-                        elif self.game_state == "playing" and self.last_play["player"] != "玩家":
+                        elif self.game_state == "playing" and player_turn:
                             if self.buttons["play"].collidepoint(mouse_pos):
                                 self.player_play_card()
                             elif self.buttons["giveup_play"].collidepoint(mouse_pos):
                                 self.player_giveup_card()
             
-            # 绘制界面
-            if self.game_state == "menu":
-                self.screen.fill(COLOR_LIGHT_GRAY)
-                self.draw_main_menu()
-            elif self.game_state == "tutorial":
-                self.screen.fill(COLOR_LIGHT_GRAY)
-                self.draw_tutorial()
-            elif self.game_state == "stats":
-                self.screen.fill(COLOR_LIGHT_GRAY)
-                self.draw_stats_screen()
-            elif self.game_state == "game_over":
-                # 绘制游戏结束界面（覆盖在游戏界面上）
-                self.draw_interface()
-                self.draw_game_over()
-            elif self.game_state not in ["shuffling", "dealing"]:
-                self.draw_interface()
+            # 推进动画，取回已完成的AI决策
+            self.timeline.update()
+            self.poll_ai()
             
-            # 更新显示
-            pygame.display.flip()
+            # 绘制并提交有变化的区域
+            self.render_frame()
         
         # 退出Pygame
         pygame.quit()
+        self.cancel_ai()
+        self.ai_worker.close()
+        self.planner.close()
+        self.bid_estimator.close()
+        self.save_latency()
+
+    def save_latency(self):
+        """导出AI决策耗时统计（JSON）"""
+        try:
+            self.latency.dump(LATENCY_FILE)
+        except (IOError, PermissionError) as e:
+            print(f"保存AI耗时统计失败：{e}")
 
 # ---------------------- 运行游戏 ----------------------
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     game = LandlordGamePygame()
     game.run()
\ No newline at end of file
@@ -0,0 +1,277 @@
+# opening_book.py
+"""
+斗地主开局库：离线按手牌特征键（王、2、A、炸弹、顺子、三张、散牌等）预先算好叫地主胜率与地主首出，写入紧凑的二进制文件；
+运行时通过只读mmap二分查找（不在启动时解析，多进程共享同一份页缓存）
+构建：python opening_book.py -n 2000 -j 8 -o opening_book.bin
+"""
+import argparse
+import mmap
+import os
+import random
+import struct
+import time
+from collections import Counter
+from multiprocessing import Pool
+from logic_game import *
+from logic_ai import landlord_win_rate, monte_carlo_play
+
+# ---------------------- 文件格式 ----------------------
+# 文件头：魔数, 叫地主记录数, 首出记录数
+# 叫地主记录（按键升序）：17张手牌的特征键, 地主胜率（0~65535）, 采样局数
+# 首出记录（按键升序）：地主20张手牌的特征键, 首出（牌型编号, 张数, 在手中同牌型同张数出牌里按主体点数的名次）
+# 带牌不入库，回放时与根节点候选一样取带牌最小的一手
+BOOK_MAGIC = b"DDZBOOK3"
+_HEADER = struct.Struct("<8sII")
+_BID_RECORD = struct.Struct("<QHH")
+_LEAD_RECORD = struct.Struct("<QQ")
+_KEY = struct.Struct("<Q")
+_FEATURE_BITS = 3    # 每个手牌特征取值0~3（或0~2），3位足够
+_LEAD_BITS = 8       # 首出的牌型编号、张数、名次各占8位
+_RATE_SCALE = 65535
+
+# 首出牌型编号
+LEAD_CARD_TYPES = (
+    CARD_TYPE_SINGLE, CARD_TYPE_PAIR, CARD_TYPE_SEQUENCE_PAIR, CARD_TYPE_SEQUENCE_SINGLE,
+    CARD_TYPE_TRIPLE, CARD_TYPE_TRIPLE_ONE, CARD_TYPE_TRIPLE_PAIR, CARD_TYPE_PLANE_NO_WING,
+    CARD_TYPE_PLANE_SINGLE_WING, CARD_TYPE_PLANE_PAIR_WING, CARD_TYPE_BOMB, CARD_TYPE_JOKER_BOMB,
+    CARD_TYPE_FOUR_TWO_SINGLE, CARD_TYPE_FOUR_TWO_PAIR,
+)
+_LEAD_TYPE_CODE = {card_type: code for code, card_type in enumerate(LEAD_CARD_TYPES)}
+
+OPENING_BOOK_FILE = "opening_book.bin"
+DEFAULT_CALL_THRESHOLD = 0.5   # 地主胜率不低于该值时叫地主
+DEFAULT_BID_SAMPLES = 200      # 每手牌叫地主胜率的推演局数
+DEFAULT_LEAD_SAMPLES = 30      # 每手牌首出的蒙特卡洛采样次数
+
+# ---------------------- 手牌特征键 ----------------------
+def _longest_run(counts, need):
+    """3..A中每个点数至少need张的最长连续段"""
+    best = run = 0
+    for count in counts[:RANK_SLOT['2']]:
+        run = run + 1 if count >= need else 0
+        best = max(best, run)
+    return best
+
+def hand_features(counts):
+    """
+    决定叫地主与首出的粗粒度手牌特征（精确点数键几乎不会重复，按特征键才能命中）：
+    (大小王, 2的张数, A的张数, 炸弹数, 有无5连以上的顺子, 3..A的三张数, 3..10的单张数)，各项封顶
+    """
+    jokers = counts[RANK_SLOT['小王']] + 2 * counts[RANK_SLOT['大王']]
+    bombs = sum(1 for count in counts[:RANK_SLOT['小王']] if count == 4)
+    triples = sum(1 for count in counts[:RANK_SLOT['2']] if count == 3)
+    low_singles = sum(1 for count in counts[:RANK_SLOT['J']] if count == 1)
+    return (jokers, min(counts[RANK_SLOT['2']], 3), min(counts[RANK_SLOT['A']], 3), min(bombs, 2),
+            int(_longest_run(counts, 1) >= 5), min(triples, 2), min(low_singles, 3))
+
+def feature_key(counts):
+    """手牌特征打包为整数（开局库的键）"""
+    value = 0
+    for index, feature in enumerate(hand_features(counts)):
+        value |= feature << (index * _FEATURE_BITS)
+    return value
+
+def _same_kind_moves(counts, card_type, count):
+    """手中与(牌型, 张数)相同的出牌：核心优先级 -> 带牌最小的出牌模式，按主体点数从小到大"""
+    moves = {}
+    for pattern, result in iter_moves_of_type(counts, card_type, count):
+        moves.setdefault(result[1], pattern)
+    return moves
+
+def pack_lead(counts, pattern):
+    """首出模式 -> (牌型编号, 张数, 主体名次)打包的整数，与具体点数和带牌无关，可用于特征键相同的其他手牌"""
+    card_type, priority, count = judge_rank_counts(pattern)
+    order = [*_same_kind_moves(counts, card_type, count)].index(priority)
+    return _LEAD_TYPE_CODE[card_type] | count << _LEAD_BITS | min(order, (1 << _LEAD_BITS) - 1) << (2 * _LEAD_BITS)
+
+def unpack_lead(counts, value):
+    """在手牌counts中还原首出模式：同牌型同张数中取主体同名次（不够则取最大）、带牌最小的一手，没有该牌型返回None"""
+    mask = (1 << _LEAD_BITS) - 1
+    code, count, order = value & mask, (value >> _LEAD_BITS) & mask, value >> (2 * _LEAD_BITS)
+    if code >= len(LEAD_CARD_TYPES):
+        return None
+    moves = [*_same_kind_moves(counts, LEAD_CARD_TYPES[code], count).values()]
+    return moves[min(order, len(moves) - 1)] if moves else None
+
+# ---------------------- 查询 ----------------------
+class OpeningBook:
+    """只读开局库：构造时只映射文件并读取文件头，每次查询按手牌特征键在mmap上二分查找固定长度记录"""
+
+    def __init__(self, path, call_threshold=DEFAULT_CALL_THRESHOLD):
+        self.path = path
+        self.call_threshold = call_threshold
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < _HEADER.size:
+            self.close()
+            raise ValueError(f"开局库文件不完整：{path}")
+        magic, self.bid_count, self.lead_count = _HEADER.unpack_from(self._map, 0)
+        self._bid_offset = _HEADER.size
+        self._lead_offset = self._bid_offset + self.bid_count * _BID_RECORD.size
+        if magic != BOOK_MAGIC or len(self._map) != self._lead_offset + self.lead_count * _LEAD_RECORD.size:
+            self.close()
+            raise ValueError(f"不是有效的开局库文件：{path}")
+
+    @classmethod
+    def open(cls, path, call_threshold=DEFAULT_CALL_THRESHOLD):
+        """打开开局库，文件不存在或无效时返回None（调用方退回实时计算）"""
+        try:
+            return cls(path, call_threshold)
+        except (OSError, ValueError):
+            return None
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _find(self, offset, count, record, key):
+        """在[offset, offset + count * record.size)内二分查找键，返回记录偏移，未找到返回-1"""
+        low, high = 0, count
+        data = self._map
+        size = record.size
+        while low < high:
+            mid = (low + high) // 2
+            value = _KEY.unpack_from(data, offset + mid * size)[0]
+            if value < key:
+                low = mid + 1
+            elif value > key:
+                high = mid
+            else:
+                return offset + mid * size
+        return -1
+
+    def bid_rate(self, counts):
+        """17张手牌当地主的胜率（特征键相同的手牌的平均），未收录返回None"""
+        found = self._find(self._bid_offset, self.bid_count, _BID_RECORD, feature_key(counts))
+        if found < 0:
+            return None
+        return _BID_RECORD.unpack_from(self._map, found)[1] / _RATE_SCALE
+
+    def should_call(self, counts):
+        """是否叫地主，未收录返回None"""
+        rate = self.bid_rate(counts)
+        return None if rate is None else rate >= self.call_threshold
+
+    def opening_lead(self, counts):
+        """地主20张手牌的首出模式（15槽位张数），未收录或手中没有收录的牌型返回None"""
+        found = self._find(self._lead_offset, self.lead_count, _LEAD_RECORD, feature_key(counts))
+        if found < 0:
+            return None
+        return unpack_lead(counts, _LEAD_RECORD.unpack_from(self._map, found)[1])
+
+# ---------------------- 构建 ----------------------
+def book_rng(seed, index):
+    """第index手牌的独立随机数流（可复现，与进程划分无关）"""
+    return random.Random(f"card-book:{seed}:{index}")
+
+def build_entry(args):
+    """
+    随机发一副牌，取座位0的17张：推演估计当地主胜率；再让座位0当地主，用蒙特卡洛搜索确定首出
+    :return: (17张特征键, 胜率, 采样局数, 20张特征键, 首出键)
+    """
+    seed, index, bid_samples, lead_samples = args
+    rng = book_rng(seed, index)
+    engine = GameEngine(agents=[None] * SEAT_COUNT, rng=rng)
+    engine.deal()
+    counts = tuple(engine.hands[0].counts)
+    rate = landlord_win_rate(counts, bid_samples, rng)
+    engine.bid(0, True)
+    lead = monte_carlo_play(engine, 0, float("inf"), lead_samples, rng, solver=None)
+    landlord_counts = engine.hands[0].counts
+    return (feature_key(counts), rate, bid_samples, feature_key(landlord_counts),
+            pack_lead(landlord_counts, rank_count_vector(lead.cards)))
+
+def build_book(hands, jobs=None, seed=0, bid_samples=DEFAULT_BID_SAMPLES, lead_samples=DEFAULT_LEAD_SAMPLES,
+               progress=None):
+    """
+    构建hands手牌的开局库条目（同键的叫地主胜率按采样局数合并，首出取出现最多的一种，次数相同取最先出现的）
+    :return: (叫地主 {键: (胜率, 采样局数)}, 首出 {键: 首出键})
+    """
+    jobs = jobs or os.cpu_count() or 1
+    tasks = ((seed, index, bid_samples, lead_samples) for index in range(hands))
+    bids = {}
+    leads = {}
+    start = time.perf_counter()
+
+    def merge(entries):
+        for done, (bid_key, rate, samples, lead_key, lead) in enumerate(entries, 1):
+            if bid_key in bids:
+                old_rate, old_samples = bids[bid_key]
+                rate = (old_rate * old_samples + rate * samples) / (old_samples + samples)
+                samples += old_samples
+            bids[bid_key] = (rate, samples)
+            leads.setdefault(lead_key, Counter())[lead] += 1
+            if progress:
+                progress(done, time.perf_counter() - start)
+
+    if jobs == 1:
+        merge(map(build_entry, tasks))
+    else:
+        with Pool(jobs) as pool:
+            merge(pool.imap(build_entry, tasks, chunksize=4))
+    return bids, {key: votes.most_common(1)[0][0] for key, votes in leads.items()}
+
+def book_hit_rate(bids, leads, hands, seed=0):
+    """
+    另发hands手牌（与构建用的随机数流不重叠）估计命中率
+    :return: (叫地主命中率, 首出命中率)
+    """
+    bid_hits = lead_hits = 0
+    for index in range(hands):
+        engine = GameEngine(agents=[None] * SEAT_COUNT, rng=random.Random(f"card-book-check:{seed}:{index}"))
+        engine.deal()
+        bid_hits += feature_key(engine.hands[0].counts) in bids
+        engine.bid(0, True)
+        lead_hits += feature_key(engine.hands[0].counts) in leads
+    return bid_hits / hands, lead_hits / hands
+
+def write_book(path, bids, leads):
+    """按键升序写入开局库（先写临时文件再替换，读者不会看到半个文件）"""
+    data = bytearray(_HEADER.size + len(bids) * _BID_RECORD.size + len(leads) * _LEAD_RECORD.size)
+    _HEADER.pack_into(data, 0, BOOK_MAGIC, len(bids), len(leads))
+    offset = _HEADER.size
+    for key in sorted(bids):
+        rate, samples = bids[key]
+        _BID_RECORD.pack_into(data, offset, key, round(rate * _RATE_SCALE), min(samples, 0xFFFF))
+        offset += _BID_RECORD.size
+    for key in sorted(leads):
+        _LEAD_RECORD.pack_into(data, offset, key, leads[key])
+        offset += _LEAD_RECORD.size
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as file:
+        file.write(data)
+    os.replace(temp_path, path)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="斗地主开局库构建")
+    parser.add_argument("-n", "--hands", type=int, default=2000, help="随机发牌的手牌数")
+    parser.add_argument("-j", "--jobs", type=int, default=0, help="进程数（默认CPU核数）")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子（相同种子结果可复现）")
+    parser.add_argument("--bid-samples", type=int, default=DEFAULT_BID_SAMPLES, help="叫地主胜率推演局数")
+    parser.add_argument("--lead-samples", type=int, default=DEFAULT_LEAD_SAMPLES, help="首出蒙特卡洛采样次数")
+    parser.add_argument("-o", "--output", default=OPENING_BOOK_FILE, help="输出文件")
+    parser.add_argument("--check", type=int, default=None, help="估计命中率另发的手牌数（默认与--hands相同，0为不估计）")
+    parser.add_argument("-q", "--quiet", action="store_true", help="不输出进度")
+    args = parser.parse_args(argv)
+
+    def progress(done, elapsed):
+        print(f"\r已完成 {done}/{args.hands} 手  {done / max(elapsed, 1e-9):.1f} 手/秒", end="", flush=True)
+
+    bids, leads = build_book(args.hands, args.jobs or None, args.seed, args.bid_samples, args.lead_samples,
+                             None if args.quiet else progress)
+    if not args.quiet:
+        print()
+    write_book(args.output, bids, leads)
+    print(f"已写入 {args.output}：叫地主 {len(bids)} 条，首出 {len(leads)} 条")
+    checks = args.check if args.check is not None else args.hands
+    if checks > 0:
+        bid_rate, lead_rate = book_hit_rate(bids, leads, checks, args.seed)
+        print(f"命中率（另发 {checks} 手牌）：叫地主 {bid_rate:.1%}，首出 {lead_rate:.1%}")
+
+if __name__ == "__main__":
+    main()
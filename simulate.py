@@ -0,0 +1,167 @@
+# simulate.py
+"""斗地主AI自对弈模拟器（多进程）：python simulate.py -n 100000 -j 8 --seed 1"""
+import argparse
+import os
+import random
+import time
+from multiprocessing import Pool
+from logic_game import *
+from logic_ai import AI_LEVELS, make_agent
+from logic_latency import LatencyHistogram
+from opening_book import OpeningBook
+
+GREEDY_LEVELS = {"greedy": False, "greedy-split": True}  # 贪心代理等级 -> 是否参考最少手数拆分
+
+# ---------------------- 统计 ----------------------
+class SimStats:
+    """可累加的对局统计（各进程分别统计，主进程逐块合并，不保存单局结果）"""
+
+    def __init__(self):
+        self.games = 0
+        self.moves = 0
+        self.redeals = 0
+        self.landlord_wins = 0
+        self.seat_wins = [0] * SEAT_COUNT           # 座位所在一方获胜次数
+        self.seat_landlord = [0] * SEAT_COUNT       # 座位当地主次数
+        self.seat_landlord_wins = [0] * SEAT_COUNT  # 座位当地主并获胜次数
+        self.latency = LatencyHistogram()           # 各座位代理的决策耗时
+
+    def record(self, engine):
+        self.games += 1
+        self.moves += len(engine.history)
+        self.redeals += engine.redeals
+        landlord = engine.landlord
+        self.seat_landlord[landlord] += 1
+        if engine.landlord_won:
+            self.landlord_wins += 1
+            self.seat_landlord_wins[landlord] += 1
+        for seat in range(SEAT_COUNT):
+            if engine.seat_won(seat):
+                self.seat_wins[seat] += 1
+
+    def merge(self, other):
+        self.games += other.games
+        self.moves += other.moves
+        self.redeals += other.redeals
+        self.landlord_wins += other.landlord_wins
+        for seat in range(SEAT_COUNT):
+            self.seat_wins[seat] += other.seat_wins[seat]
+            self.seat_landlord[seat] += other.seat_landlord[seat]
+            self.seat_landlord_wins[seat] += other.seat_landlord_wins[seat]
+        self.latency.merge(other.latency)
+        return self
+
+# ---------------------- 对弈 ----------------------
+def chunk_rng(seed, chunk):
+    """第chunk块的独立随机数流（字符串种子经SHA-512展开，各块互不相关且可复现）"""
+    return random.Random(f"card-sim:{seed}:{chunk}")
+
+_BOOKS = {}  # 每个进程按路径只映射一次开局库
+
+def _open_book(path):
+    if path is None:
+        return None
+    if path not in _BOOKS:
+        _BOOKS[path] = OpeningBook.open(path)
+    return _BOOKS[path]
+
+def make_agents(level, book, rng):
+    """level为"greedy"/"greedy-split"时用贪心代理（后者参考最少手数拆分），否则按难度等级创建蒙特卡洛代理"""
+    if level in GREEDY_LEVELS:
+        return [GreedyAgent(book, GREEDY_LEVELS[level]) for _ in range(SEAT_COUNT)]
+    return [make_agent(level, book=book, rng=random.Random(rng.getrandbits(64))) for _ in range(SEAT_COUNT)]
+
+def play_chunk(args):
+    """在当前进程中完成一块对局，返回该块统计"""
+    seed, chunk, games, book_path, level = args
+    book = _open_book(book_path)
+    rng = chunk_rng(seed, chunk)
+    stats = SimStats()
+    engine = GameEngine(agents=make_agents(level, book, rng), rng=rng, latency=stats.latency)
+    for i in range(games):
+        # 叫地主起始座位轮换，避免先叫的座位占优
+        engine.bid_start = i % SEAT_COUNT
+        engine.run_game()
+        stats.record(engine)
+    return stats
+
+def iter_chunks(seed, games, chunk_size, book_path=None, level="greedy"):
+    chunk = 0
+    while games > 0:
+        size = min(chunk_size, games)
+        yield (seed, chunk, size, book_path, level)
+        games -= size
+        chunk += 1
+
+def simulate(games, jobs=None, seed=0, chunk_size=500, progress=None, book_path=None, level="greedy"):
+    """
+    用jobs个进程对弈games局，progress(stats, elapsed)在每块完成后回调；返回（统计, 耗时秒）
+    book_path为开局库文件时各进程以只读mmap打开同一文件（共享页缓存）；
+    level为GREEDY_LEVELS或AI_LEVELS中的难度等级
+    """
+    jobs = jobs or os.cpu_count() or 1
+    total = SimStats()
+    start = time.perf_counter()
+    chunks = iter_chunks(seed, games, chunk_size, book_path, level)
+    if jobs == 1:
+        results = map(play_chunk, chunks)
+        for stats in results:
+            total.merge(stats)
+            if progress:
+                progress(total, time.perf_counter() - start)
+    else:
+        with Pool(jobs) as pool:
+            for stats in pool.imap_unordered(play_chunk, chunks):
+                total.merge(stats)
+                if progress:
+                    progress(total, time.perf_counter() - start)
+    return total, time.perf_counter() - start
+
+# ---------------------- 报告 ----------------------
+def _rate(part, whole):
+    return part / whole * 100 if whole else 0.0
+
+def format_report(stats, elapsed):
+    elapsed = max(elapsed, 1e-9)
+    games = stats.games
+    lines = [
+        f"对局数: {games}  耗时: {elapsed:.2f}s",
+        f"吞吐: {games / elapsed:.1f} 局/秒  {stats.moves / elapsed:.1f} 步/秒  （重新发牌 {stats.redeals} 次）",
+        f"地主胜率: {_rate(stats.landlord_wins, games):.2f}%  农民胜率: {_rate(games - stats.landlord_wins, games):.2f}%",
+    ]
+    for seat in range(SEAT_COUNT):
+        landlord_games = stats.seat_landlord[seat]
+        farmer_games = games - landlord_games
+        farmer_wins = stats.seat_wins[seat] - stats.seat_landlord_wins[seat]
+        lines.append(
+            f"座位{seat}: 胜率 {_rate(stats.seat_wins[seat], games):.2f}%  "
+            f"地主 {landlord_games} 局 胜率 {_rate(stats.seat_landlord_wins[seat], landlord_games):.2f}%  "
+            f"农民 {farmer_games} 局 胜率 {_rate(farmer_wins, farmer_games):.2f}%"
+        )
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="斗地主AI自对弈模拟器")
+    parser.add_argument("-n", "--games", type=int, default=10000, help="对局总数")
+    parser.add_argument("-j", "--jobs", type=int, default=0, help="进程数（默认CPU核数）")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子（相同种子与分块结果可复现）")
+    parser.add_argument("--chunk", type=int, default=500, help="每个任务块的对局数")
+    parser.add_argument("--book", default=None, help="开局库文件（见opening_book.py）")
+    parser.add_argument("--level", default="greedy", choices=[*GREEDY_LEVELS, *AI_LEVELS], help="AI难度等级")
+    parser.add_argument("--latency", default=None, help="把决策耗时统计（JSON）写入该文件")
+    parser.add_argument("-q", "--quiet", action="store_true", help="不输出进度")
+    args = parser.parse_args(argv)
+
+    def progress(stats, elapsed):
+        print(f"\r已完成 {stats.games}/{args.games} 局  {stats.games / max(elapsed, 1e-9):.1f} 局/秒", end="", flush=True)
+
+    stats, elapsed = simulate(args.games, args.jobs or None, args.seed, args.chunk, None if args.quiet else progress,
+                              args.book, args.level)
+    if not args.quiet:
+        print()
+    print(format_report(stats, elapsed))
+    if args.latency:
+        stats.latency.dump(args.latency)
+
+if __name__ == "__main__":
+    main()
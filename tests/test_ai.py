@@ -0,0 +1,61 @@
+# test_ai.py
+"""玩家思考期间的预计算：每个预计算带截止时刻，未命中时排队中的预计算不再运行"""
+import random
+import threading
+import time
+from logic_game import GameEngine, PHASE_PLAYING, SEAT_COUNT, greedy_play
+from logic_ai import SpeculativePlanner
+
+class RecordingAgent:
+    """记录每次预计算的截止时刻，第一次调用阻塞到release"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.deadlines = []
+
+    def play(self, engine, seat, deadline=None):
+        self.deadlines.append((time.perf_counter(), deadline))
+        self.release.wait(5)
+        return greedy_play(engine.hands[seat], engine.last_play)
+
+def player_turn(seed):
+    engine = GameEngine(agents=[None] * SEAT_COUNT, rng=random.Random(seed))
+    engine.deal()
+    engine.bid(0, True)
+    assert engine.phase == PHASE_PLAYING and engine.current == 0
+    return engine
+
+def play_greedy(engine):
+    engine.play(0, greedy_play(engine.hands[0], engine.last_play))
+    return engine
+
+def test_speculation_has_a_deadline_and_queued_ones_stop_after_a_miss():
+    engine = player_turn(1)
+    agent = RecordingAgent()
+    planner = SpeculativePlanner([None, agent, None], time_budget=0.25)
+    planner.start(engine, 0)
+    assert len(planner._futures) > 1
+    while not agent.deadlines:
+        time.sleep(0.001)
+    started, deadline = agent.deadlines[0]
+    assert 0 < deadline - started <= 0.25
+    # 另一副牌的局面不在预计算之列：未命中，排队中的预计算全部取消
+    assert planner.take(play_greedy(player_turn(2))) is None
+    assert planner.misses == 1 and not planner._futures
+    agent.release.set()
+    planner.close()
+    time.sleep(0.05)
+    assert len(agent.deadlines) == 1
+
+def test_running_speculation_is_taken_on_a_hit():
+    engine = player_turn(1)
+    agent = RecordingAgent()
+    planner = SpeculativePlanner([None, agent, None], time_budget=0.25)
+    planner.start(engine, 0)
+    while not agent.deadlines:
+        time.sleep(0.001)
+    future = planner.take(play_greedy(engine))
+    assert future is not None and planner.hits == 1
+    agent.release.set()
+    assert future.result(5) is not None
+    planner.close()
@@ -0,0 +1,74 @@
+# test_batch.py
+"""批量环境：向量化牌型判定、可复现发牌、批量对局与单局引擎一致（需要NumPy）"""
+import random
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from logic_card import *
+from logic_game import GameEngine, PHASE_OVER, SEAT_COUNT, greedy_play
+from logic_batch import (BATCH_TYPE_CODE, CODE_PASS, BatchEnv, batch_deals, deal_at, greedy_actions, iter_deals,
+                         judge_rank_counts_batch)
+
+def sample_patterns(count, seed=0):
+    """各种合法出牌，加上随机的（大多非法的）点数组合"""
+    rng = random.Random(seed)
+    deck = create_deck()
+    patterns = []
+    while len(patterns) < count:
+        counts = rank_count_vector(rng.sample(deck, rng.randint(1, 20)))
+        moves = list(generate_moves(counts))
+        patterns.extend(rng.sample(moves, min(8, len(moves))))
+        patterns.append(tuple(rng.randint(0, have) for have in counts))
+    return [pattern for pattern in patterns if any(pattern)]
+
+def test_judge_batch_matches_judge_rank_counts():
+    patterns = sample_patterns(3000)
+    types, priority, count = judge_rank_counts_batch(np.array(patterns, dtype=np.int8))
+    for row, pattern in enumerate(patterns):
+        card_type, expected_priority, expected_count = judge_rank_counts(pattern)
+        assert types[row] == BATCH_TYPE_CODE[card_type], pattern
+        if card_type != CARD_TYPE_INVALID:
+            assert (priority[row], count[row]) == (expected_priority, expected_count), pattern
+
+def test_judge_batch_treats_empty_rows_as_pass():
+    types, priority, count = judge_rank_counts_batch(np.zeros((2, RANK_SLOT_COUNT), dtype=np.int8))
+    assert (types == CODE_PASS).all() and not priority.any() and not count.any()
+
+def test_deal_at_replays_batch_rows():
+    deals = batch_deals(7, 50, start=100, stream=2)
+    for offset in (0, 13, 49):
+        assert (deal_at(7, 100 + offset, stream=2) == deals[offset]).all()
+    assert sorted(deals[0].tolist()) == list(range(DECK_SIZE))
+    assert not (batch_deals(7, 50, start=100, stream=3) == deals).all()
+
+def test_iter_deals_matches_one_batch():
+    chunks = list(iter_deals(3, 25, start=5, chunk=10))
+    assert [begin for begin, _ in chunks] == [5, 15, 25]
+    assert (np.concatenate([deals for _, deals in chunks]) == batch_deals(3, 25, start=5)).all()
+
+def random_decks(count, seed=0):
+    """牌编号排列（前51张轮流发给三个座位，后3张为底牌）"""
+    rng = random.Random(seed)
+    decks = []
+    for _ in range(count):
+        deck = create_deck(encoded=True)
+        rng.shuffle(deck)
+        decks.append(deck)
+    return decks
+
+def test_greedy_batch_matches_engine():
+    decks = random_decks(40, seed=11)
+    env = BatchEnv(len(decks))
+    env.reset(np.array(decks, dtype=np.int8), landlord=0)
+    while not env.done.all():
+        env.step(greedy_actions(env))
+    for table, deck in enumerate(decks):
+        engine = GameEngine(agents=[None] * SEAT_COUNT)
+        engine.deal(decode_cards(deck))
+        engine.bid(0, True)
+        while engine.phase != PHASE_OVER:
+            seat = engine.current
+            assert engine.play(seat, greedy_play(engine.hands[seat], engine.last_play))[0]
+        assert engine.winner == env.winner[table]
+        assert len(engine.history) == env.moves[table]
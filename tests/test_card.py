@@ -0,0 +1,42 @@
+# test_card.py
+"""手牌容器：计数与掩码为准，按点数升序的视图在增删后按需重建"""
+import random
+import pytest
+from logic_card import *
+
+def test_views_follow_random_adds_and_removes():
+    rng = random.Random(0)
+    deck = create_deck(encoded=True)
+    for encoded in (False, True):
+        hand = Hand(encoded=encoded)
+        model = set()
+        for _ in range(2000):
+            card = rng.choice(deck)
+            if card in model:
+                hand.remove(card if encoded else decode(card))
+                model.remove(card)
+            else:
+                hand.add(card)
+                model.add(card)
+            if rng.random() < 0.3:
+                expected = sorted(model)
+                assert hand.card_ids == expected
+                assert list(hand) == (expected if encoded else decode_cards(expected))
+                assert hand.counts == rank_count_vector(expected)
+            assert len(hand) == len(model)
+
+def test_copy_is_independent():
+    hand = Hand(['♠3', '♥3', '大王'])
+    other = hand.copy()
+    other.remove('♥3')
+    other.add('♠2')
+    assert hand.cards == ['♠3', '♥3', '大王']
+    assert other.cards == ['♠3', '♠2', '大王']
+    assert hand.counts != other.counts
+
+def test_duplicate_and_missing_cards_raise():
+    hand = Hand(['♠3'])
+    with pytest.raises(ValueError):
+        hand.add('♠3')
+    with pytest.raises(ValueError):
+        hand.remove('♥3')
@@ -0,0 +1,39 @@
+# test_game.py
+"""贪心策略：默认为廉价策略，decompose为True时参考最少手数拆分"""
+import random
+from logic_card import *
+from logic_game import greedy_move, ordered_legal_plays
+
+def random_states(count, seed=0):
+    rng = random.Random(seed)
+    deck = create_deck()
+    for index in range(count):
+        counts = rank_count_vector(rng.sample(deck, rng.randint(1, 20)))
+        if index % 2:
+            yield counts, NO_PLAY
+        else:
+            yield counts, rng.choice(ordered_legal_plays(Hand(rng.sample(deck, 8))))
+
+def test_default_response_is_the_smallest_beating_play():
+    for counts, last_play in random_states(400):
+        if last_play.is_lead:
+            continue
+        expected = next(iter(iter_beating_moves(counts, last_play)), None)
+        assert greedy_move(counts, last_play) == expected
+
+def test_default_lead_plays_the_lowest_top_card():
+    for counts, last_play in random_states(400):
+        if not last_play.is_lead:
+            continue
+        pattern, result = greedy_move(counts, last_play)
+        assert judge_rank_counts(pattern) == result
+        top = max(slot for slot, count in enumerate(pattern) if count)
+        assert top == min(slot for slot, count in enumerate(counts) if count)
+
+def test_decomposed_lead_keeps_a_minimum_split():
+    for counts, last_play in random_states(200):
+        if not last_play.is_lead:
+            continue
+        pattern, _ = greedy_move(counts, last_play, decompose=True)
+        rest = [have - used for have, used in zip(counts, pattern)]
+        assert min_play_count(rest) == min_play_count(counts) - 1
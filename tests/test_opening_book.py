@@ -0,0 +1,55 @@
+# test_opening_book.py
+"""开局库：特征键与首出编码，构建后按特征键命中"""
+import random
+from logic_card import *
+from logic_game import GameEngine, SEAT_COUNT, book_opening_play
+from opening_book import (OpeningBook, book_rng, build_book, write_book, feature_key, hand_features,
+                          pack_lead, unpack_lead)
+
+def landlord_counts(seed):
+    engine = GameEngine(agents=[None] * SEAT_COUNT, rng=random.Random(seed))
+    engine.deal()
+    engine.bid(0, True)
+    return engine.hands[0].counts
+
+def test_lead_round_trips_within_the_same_hand():
+    for seed in range(20):
+        counts = landlord_counts(seed)
+        for pattern, result in generate_moves(counts).items():
+            replayed = unpack_lead(counts, pack_lead(counts, pattern))
+            assert judge_rank_counts(replayed) == result
+            assert not [slot for slot, count in enumerate(replayed) if count > counts[slot]]
+
+def test_lead_applies_to_other_hands_with_the_same_kind_of_play():
+    counts = rank_count_vector(['♠3', '♥3', '♠4', '♥4', '♠5', '♥5', '♠9'])
+    other = rank_count_vector(['♠7', '♥7', '♠8', '♥8', '♠9', '♥9', '♠J'])
+    lead = pack_lead(counts, rank_count_vector(['♠3', '♥3', '♠4', '♥4', '♠5', '♥5']))
+    assert unpack_lead(other, lead) == tuple(rank_count_vector(['♠7', '♥7', '♠8', '♥8', '♠9', '♥9']))
+    assert unpack_lead(rank_count_vector(['♠3', '♠9']), lead) is None
+
+def test_replayed_triple_keeps_the_smallest_kicker():
+    counts = rank_count_vector(['♠3', '♠4', '♠6', '♠8', '♥8', '♣8', '♠2', '小王'])
+    other = rank_count_vector(['♠3', '♠4', '♠7', '♠9', '♠10', '♥10', '♣10', '♠Q', '♠2', '小王'])
+    assert hand_features(counts) == hand_features(other)
+    lead = pack_lead(counts, rank_count_vector(['♠8', '♥8', '♣8', '小王']))
+    assert unpack_lead(other, lead) == tuple(rank_count_vector(['♠3', '♠10', '♥10', '♣10']))
+
+def test_feature_key_ignores_exact_low_ranks():
+    counts = rank_count_vector(['♠3', '♥3', '♣3', '♠7', '♥7', '♠2', '大王'])
+    moved = rank_count_vector(['♠4', '♥4', '♣4', '♠8', '♥8', '♠2', '大王'])
+    assert hand_features(counts) == hand_features(moved)
+    assert feature_key(counts) == feature_key(moved)
+
+def test_built_book_covers_its_own_deals(tmp_path):
+    bids, leads = build_book(3, jobs=1, seed=1, bid_samples=5, lead_samples=2)
+    path = str(tmp_path / "book.bin")
+    write_book(path, bids, leads)
+    with OpeningBook(path) as book:
+        for index in range(3):
+            engine = GameEngine(agents=[None] * SEAT_COUNT, rng=book_rng(1, index))
+            engine.deal()
+            rate, _ = bids[feature_key(engine.hands[0].counts)]
+            assert abs(book.bid_rate(engine.hands[0].counts) - rate) < 1e-4
+            engine.bid(0, True)
+            play = book_opening_play(book, engine, 0)
+            assert play is not None and engine.check_play(0, play)[0]
@@ -0,0 +1,22 @@
+# test_solver.py
+"""残局求解器：置换表在地主变化后不能复用上一位地主的结论"""
+import random
+from logic_card import *
+from logic_solver import EndgameSolver
+
+def random_positions(count, cards_each=3, seed=0):
+    rng = random.Random(seed)
+    deck = create_deck(encoded=True)
+    positions = []
+    for _ in range(count):
+        cards = rng.sample(deck, cards_each * 3)
+        positions.append([rank_count_vector(cards[seat::3]) for seat in range(3)])
+    return positions
+
+def test_shared_solver_matches_fresh_solver_after_landlord_changes():
+    positions = random_positions(300)
+    shared = EndgameSolver(table_bits=14)
+    for hands in positions:
+        shared.solve(hands, 0, landlord=0)
+    for hands in positions:
+        assert shared.solve(hands, 0, landlord=1) == EndgameSolver(table_bits=14).solve(hands, 0, landlord=1)
@@ -0,0 +1,103 @@
+# test_tracker.py
+"""记牌器：过牌推断不排除被保留的炸弹、王炸；同一局的局面副本增量同步"""
+import copy
+import random
+from logic_card import *
+from logic_game import GameEngine, PHASE_PLAYING
+from logic_tracker import CardTracker
+
+JOKERS = (RANK_SLOT['小王'], RANK_SLOT['大王'])
+
+def test_pass_over_single_keeps_bombs_and_jokers_possible():
+    tracker = CardTracker()
+    tracker.observe(0, classify_play(['♠9']))
+    tracker.observe(1, pass_play())
+    allowed = tracker.allowed_counts(1)
+    for slot in range(RANK_SLOT['10'], RANK_SLOT['2'] + 1):
+        assert allowed[slot] == 0b10001  # 没有这个点数，或保留着炸弹
+    for slot in JOKERS:
+        assert allowed[slot] & 0b10
+    assert allowed[RANK_SLOT['9']] == 0b11111
+
+def test_pass_over_bomb_rules_out_higher_bombs():
+    tracker = CardTracker()
+    tracker.observe(0, classify_play(['♠9', '♥9', '♣9', '♦9']))
+    tracker.observe(1, pass_play())
+    allowed = tracker.allowed_counts(1)
+    assert allowed[RANK_SLOT['10']] == 0b01111
+    assert allowed[RANK_SLOT['8']] == 0b11111
+    for slot in JOKERS:
+        assert allowed[slot] & 0b10
+
+def test_playing_a_bomb_lifts_the_inference():
+    tracker = CardTracker()
+    tracker.observe(0, classify_play(['♠9']))
+    tracker.observe(1, pass_play())
+    tracker.observe(2, pass_play())
+    tracker.observe(0, classify_play(['♠3']))
+    tracker.observe(1, classify_play(['♠K', '♥K', '♣K', '♦K']))
+    assert tracker.allowed_counts(1)[RANK_SLOT['K']] == 0b11111
+
+def play_some_turns(engine, turns):
+    for _ in range(turns):
+        if engine.phase != PHASE_PLAYING:
+            break
+        engine.step()
+
+def branch_of(engine):
+    """局面副本：手牌与历史独立（与后台决策拿到的副本一样，历史条目与原局共用）"""
+    other = copy.copy(engine)
+    other.hands = [hand.copy() for hand in engine.hands]
+    other.bottom_cards = list(engine.bottom_cards)
+    other.history = list(engine.history)
+    return other
+
+def test_sync_on_copies_of_the_same_round_is_incremental():
+    engine = GameEngine(rng=random.Random(3))
+    engine.deal()
+    while engine.phase != PHASE_PLAYING:
+        engine.step()
+    play_some_turns(engine, 4)
+    tracker = CardTracker()
+    tracker.sync(branch_of(engine))
+    resets = []
+    tracker.reset = lambda: resets.append(True)
+    play_some_turns(engine, 3)
+    tracker.sync(branch_of(engine))
+    assert not resets
+    assert tracker._seen == len(engine.history)
+
+def test_sync_resets_on_new_round_and_diverged_branch():
+    engine = GameEngine(rng=random.Random(5))
+    engine.deal()
+    while engine.phase != PHASE_PLAYING:
+        engine.step()
+    play_some_turns(engine, 2)
+    tracker = CardTracker()
+    branch = branch_of(engine)
+    play_some_turns(branch, 1)
+    tracker.sync(branch)
+    play_some_turns(engine, 1)
+    tracker.sync(engine)
+    expected = CardTracker()
+    expected.sync(engine)
+    assert tracker.played == expected.played and tracker.limits == expected.limits
+    engine.deal()
+    tracker.sync(engine)
+    assert tracker.played == 0 and tracker._seen == 0
+
+def test_sampler_respects_allowed_counts():
+    engine = GameEngine(rng=random.Random(7))
+    engine.deal()
+    while engine.phase != PHASE_PLAYING:
+        engine.step()
+    play_some_turns(engine, 12)
+    tracker = CardTracker()
+    sampler = tracker.sampler(engine, 0)
+    rng = random.Random(0)
+    for _ in range(200):
+        hands = sampler.sample(rng)
+        for seat in (1, 2):
+            assert sum(hands[seat]) == len(engine.hands[seat])
+            allowed = tracker.allowed_counts(seat)
+            assert all(counts >> count & 1 for counts, count in zip(allowed, hands[seat]))
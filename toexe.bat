@@ -1 +1 @@
-nuitka --standalone --onefile --include-module=logic_card --include-data-files=fonts.ttf=fonts.ttf --windows-console-mode=disable --windows-file-version=1.2.0.0 --windows-file-description="斗地主游戏" main.py
\ No newline at end of file
+nuitka --standalone --onefile --include-module=logic_card --include-module=logic_game --include-module=logic_ai --include-module=logic_solver --include-module=logic_tracker --include-module=logic_latency --include-module=logic_timeline --include-module=opening_book --include-data-files=fonts.ttf=fonts.ttf --windows-console-mode=disable --windows-file-version=1.2.0.0 --windows-file-description="斗地主游戏" main.py
\ No newline at end of file